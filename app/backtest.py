@@ -0,0 +1,525 @@
+# app/backtest.py
+"""
+알림 재생(백테스트) 엔진 — 과거 웹훅 알림 로그 + 봉(kline/마크가격) 데이터로
+라이브와 같은 프로필 규칙을 재현해 TP/SL/레버리지 조합을 한 번에 평가한다.
+
+    python -m app.backtest --alerts alerts.csv --klines klines.parquet \
+        --tp 1.005,1.01,none --sl 0.995,0.99,none --leverage 2,5,none --top 10
+
+재현하는 규칙:
+- PnL / 수수료 / 복리: app.services.pnl (라이브 청산과 같은 식, 수수료는 FEE_RATE 추정치)
+- webhook1~4 (one-way): BUY/SELL 스위칭(반대 포지션 청산 후 진입, 같은 방향이면 스킵), *_STOP 청산
+- webhook5/6 (hedge): BUY/SELL은 LONG/SHORT 추가진입(평단 갱신), *_STOP은 해당 방향만 청산,
+  레버리지는 양방향 모두 비어 있을 때 요청값으로 고정 (switching_hedge 정책과 동일)
+- 복리(capital) vs 고정(initial_capital) 사이징 / 프로필별 레버리지 (app.profiles.PROFILES, 라이브와 같은 표)
+
+체결 가정:
+- 알림은 봉 마감 시 발생 → 알림 시각 이후 처음 열리는 봉의 시가로 체결
+- TP/SL(선택): 진입가 × 비율에 봉 고가/저가가 닿으면 그 가격(갭이면 시가)으로 청산,
+  같은 봉에서 둘 다 닿으면 SL 우선 (보수적). 기본값은 없음 = 라이브처럼 알림으로만 청산
+- LOT_SIZE / MIN_NOTIONAL 보정과 슬리피지는 반영하지 않음
+
+벡터화:
+- 상태는 (파라미터 조합 P × 레인 L) 배열, 레인 = profile:symbol (라이브 state 키와 동일).
+  알림 순번 k마다 전 레인·전 조합을 numpy 연산 한 번으로 진행 → 파이썬 루프는 레인당 최대 알림 수만큼
+- "구간 내 처음으로 X 이상/이하가 되는 봉" 조회는 _FirstHit의 searchsorted 한 번으로 처리
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.config import BUY_PCT, TRADE_LEVERAGE
+from app.profiles import PROFILES
+from app.services import pnl
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# 알림 action 코드 (0 = 해당 순번에 알림 없음)
+_ACTIONS = {"BUY": 1, "SELL": 2, "BUY_STOP": 3, "SELL_STOP": 4}
+BUY, SELL, BUY_STOP, SELL_STOP = 1, 2, 3, 4
+
+# state 기본값과 동일 (app.state._default_state)
+DEFAULT_CAPITAL = 50.0
+
+
+# ── 입력 ────────────────────────────────────────────
+def _read_table(path: str) -> dict[str, list]:
+    """CSV 또는 Parquet(pyarrow 필요) → 컬럼별 리스트"""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet input requires pyarrow (pip install pyarrow)") from e
+        return pq.read_table(path).to_pydict()
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        return {}
+    return {k: [r[k] for r in rows] for k in rows[0]}
+
+
+def _column(table: dict[str, list], *names: str) -> list:
+    for name in names:
+        if name in table:
+            return table[name]
+    raise KeyError(f"missing column: one of {names}")
+
+
+def _to_ms(values) -> np.ndarray:
+    """epoch(초/밀리초) 숫자 또는 ISO 문자열 → epoch ms (int64)"""
+    try:
+        arr = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = []
+        for v in values:
+            dt = v if isinstance(v, datetime) else datetime.fromisoformat(str(v).replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            out.append(dt.timestamp() * 1000)
+        arr = np.asarray(out, dtype=np.float64)
+    if len(arr) and np.nanmax(arr) < 1e11:
+        arr = arr * 1000  # 초 단위
+    return arr.astype(np.int64)
+
+
+class Klines:
+    """
+    심볼별 봉 (open_time 오름차순, 심볼끼리 이어 붙인 평면 배열).
+    마크가격 kline을 넣으면 라이브 사이징(마크가격)과 같은 기준.
+    """
+
+    def __init__(self, symbols, open_time, open_, high, low):
+        symbols = np.asarray(symbols)
+        open_time = np.asarray(open_time, dtype=np.int64)
+        order = np.lexsort((open_time, symbols))
+        self.symbols = symbols[order]
+        self.time = open_time[order]
+        self.open = np.asarray(open_, dtype=np.float64)[order]
+        self.high = np.asarray(high, dtype=np.float64)[order]
+        self.low = np.asarray(low, dtype=np.float64)[order]
+
+        names, starts = np.unique(self.symbols, return_index=True)
+        ends = np.append(starts[1:], len(self.symbols))
+        self.ranges: dict[str, tuple[int, int]] = {
+            str(n): (int(s), int(e)) for n, s, e in zip(names, starts, ends)
+        }
+
+    @classmethod
+    def load(cls, path: str, symbol: str | None = None) -> "Klines":
+        """컬럼: symbol, open_time|time, open, high, low (symbol 컬럼이 없으면 symbol 인자 사용)"""
+        t = _read_table(path)
+        times = _to_ms(_column(t, "open_time", "time", "timestamp"))
+        symbols = t.get("symbol") or [symbol] * len(times)
+        if symbols and symbols[0] is None:
+            raise KeyError("missing column: symbol (or pass symbol=)")
+        return cls(
+            [str(s).upper() for s in symbols], times,
+            _column(t, "open"), _column(t, "high"), _column(t, "low"),
+        )
+
+
+@dataclass(slots=True)
+class Alerts:
+    time: np.ndarray        # epoch ms
+    symbol: list[str]
+    action: list[str]
+    profile: list[str]
+    leverage: np.ndarray    # 0 = 없음
+
+    @classmethod
+    def load(cls, path: str, profile: str | None = None) -> "Alerts":
+        """컬럼: time|timestamp, symbol, action, [profile], [leverage]"""
+        t = _read_table(path)
+        times = _to_ms(_column(t, "time", "timestamp"))
+        n = len(times)
+        profiles = t.get("profile") or [profile] * n
+        if n and profiles[0] is None:
+            raise KeyError("missing column: profile (or pass profile=)")
+        leverage = [int(float(v)) if v not in (None, "") else 0 for v in t.get("leverage", [0] * n)]
+        return cls(
+            time=times,
+            symbol=[str(s).upper().replace("/", "") for s in _column(t, "symbol")],
+            action=[str(a).upper() for a in _column(t, "action")],
+            profile=[str(p) for p in profiles],
+            leverage=np.asarray(leverage, dtype=np.int64),
+        )
+
+
+# ── 구간 내 첫 도달 봉 조회 ───────────────────────────
+class _FirstHit:
+    """
+    세그먼트(알림 사이 봉 구간)별 "처음으로 값이 X 이상(above) / 이하가 되는 봉"을
+    임의 개수의 (세그먼트, X) 질의에 대해 searchsorted 한 번으로 찾는다.
+
+    값을 순위(rank)로 바꾸고 rank + seg_id × U 를 누적 최대값으로 만들면
+    세그먼트마다 초기화된 누적 최대값이 전체적으로 단조 증가 → 질의 키로 이진 탐색.
+    """
+
+    def __init__(self, values: np.ndarray, seg_ids: np.ndarray, seg_start: np.ndarray,
+                 seg_end: np.ndarray, above: bool):
+        self._uniq = np.unique(values)
+        self._u = max(len(self._uniq), 1)
+        ranks = np.searchsorted(self._uniq, values).astype(np.int64)
+        if not above:
+            ranks = self._u - 1 - ranks
+        self._above = above
+        self._cum = np.maximum.accumulate(ranks + seg_ids.astype(np.int64) * self._u) if len(values) else ranks
+        self._start = seg_start
+        self._end = seg_end
+
+    def query(self, seg: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        """반환: 첫 도달 봉의 전역 인덱스 (구간 안에서 도달 못 하면 -1)"""
+        u = self._u
+        if self._above:
+            r = np.searchsorted(self._uniq, threshold, "left")       # 값 >= X ⇔ rank >= r
+            never = r >= len(self._uniq)
+        else:
+            r = np.searchsorted(self._uniq, threshold, "right") - 1  # 값 <= X ⇔ rank <= r
+            never = r < 0
+            r = u - 1 - r
+        key = np.where(never, 0, r) + seg * u
+        pos = np.searchsorted(self._cum, key, "left")
+        hit = ~never & (pos < self._end[seg])
+        return np.where(hit, pos, -1)
+
+
+# ── 결과 ────────────────────────────────────────────
+class BacktestResult:
+    """(파라미터 조합 P × 레인 L) 결과 배열 + 조합별 요약"""
+
+    FIELDS = ("capital", "equity", "pnl_pct", "trades", "wins", "tp_hits", "sl_hits", "max_drawdown", "open_at_end")
+
+    def __init__(self, grid: list[dict], lanes: list[tuple[str, str]], elapsed: float, **arrays: np.ndarray):
+        self.grid = grid
+        self.lanes = lanes
+        self.elapsed = elapsed
+        for name in self.FIELDS:
+            setattr(self, name, arrays[name])
+
+    def summary(self) -> list[dict]:
+        trades = self.trades.sum(axis=1)
+        wins = self.wins.sum(axis=1)
+        pnl_sum = self.pnl_pct.sum(axis=1)
+        out = []
+        for i, params in enumerate(self.grid):
+            out.append({
+                **params,
+                "trades": int(trades[i]),
+                "win_rate": round(float(wins[i] / trades[i]), 4) if trades[i] else None,
+                "pnl_pct": round(float(pnl_sum[i]), 4),
+                "mean_lane_pnl_pct": round(float(pnl_sum[i] / max(len(self.lanes), 1)), 4),
+                "equity": round(float(self.equity[i].sum()), 4),
+                "max_drawdown": round(float(self.max_drawdown[i].max(initial=0.0)), 4),
+                "tp_hits": int(self.tp_hits[i].sum()),
+                "sl_hits": int(self.sl_hits[i].sum()),
+                "open_at_end": int(self.open_at_end[i].sum()),
+            })
+        return out
+
+    def lane_rows(self, index: int) -> list[dict]:
+        """조합 index의 레인별(profile:symbol) 결과"""
+        return [
+            {"profile": p, "symbol": s, **{f: self._value(f, index, j) for f in self.FIELDS}}
+            for j, (p, s) in enumerate(self.lanes)
+        ]
+
+    def _value(self, name: str, i: int, j: int):
+        v = getattr(self, name)[i, j]
+        return int(v) if np.issubdtype(type(v), np.integer) or isinstance(v, np.bool_) else round(float(v), 6)
+
+
+def make_grid(
+    tp_ratios: list[float | None] | None = None,
+    sl_ratios: list[float | None] | None = None,
+    leverages: list[int | None] | None = None,
+) -> list[dict]:
+    """TP/SL/레버리지 후보의 데카르트 곱 (None = TP/SL 없음 / 프로필 기본 레버리지)"""
+    return [
+        {"tp_ratio": tp, "sl_ratio": sl, "leverage": lev}
+        for tp, sl, lev in itertools.product(tp_ratios or [None], sl_ratios or [None], leverages or [None])
+    ]
+
+
+# ── 엔진 ────────────────────────────────────────────
+class _Lanes:
+    """알림을 profile:symbol 레인으로 묶고 (L × 최대 알림 수) 이벤트 배열 + 봉 세그먼트를 구성"""
+
+    def __init__(self, alerts: Alerts, klines: Klines):
+        groups: dict[tuple[str, str], list[int]] = {}
+        skipped = 0
+        for i, (sym, action, profile) in enumerate(zip(alerts.symbol, alerts.action, alerts.profile)):
+            if action not in _ACTIONS or profile not in PROFILES or sym not in klines.ranges:
+                skipped += 1
+                continue
+            groups.setdefault((profile, sym), []).append(i)
+
+        lanes, events = [], []
+        for (profile, sym), idx in sorted(groups.items()):
+            idx = np.asarray(idx)
+            idx = idx[np.argsort(alerts.time[idx], kind="stable")]
+            start, end = klines.ranges[sym]
+            bars = start + np.searchsorted(klines.time[start:end], alerts.time[idx], "left")
+            keep = bars < end  # 마지막 봉 이후 알림은 체결 불가
+            skipped += int((~keep).sum())
+            if keep.any():
+                lanes.append((profile, sym))
+                events.append((idx[keep], bars[keep], end))
+        if skipped:
+            logger.warning("[Backtest] Skipped %s alerts (unknown action/profile/symbol or after last bar)", skipped)
+
+        self.keys = lanes
+        n_lanes = len(lanes)
+        self.steps = max((len(e[0]) for e in events), default=0)
+        self.count = np.asarray([len(e[0]) for e in events], dtype=np.int64)
+
+        specs = [PROFILES[p] for p, _ in lanes]
+        self.hedge = np.asarray([s.hedge for s in specs], dtype=bool)
+        self.use_initial = np.asarray([s.use_initial_capital for s in specs], dtype=bool)
+
+        shape = (n_lanes, self.steps)
+        self.action = np.zeros(shape, dtype=np.int8)
+        self.price = np.ones(shape, dtype=np.float64)
+        self.leverage = np.ones(shape, dtype=np.int64)
+        self.seg_base = np.zeros(n_lanes, dtype=np.int64)
+
+        seg_start, seg_end, seg_ids, highs, lows, opens = [], [], [], [], [], []
+        cursor = 0
+        n_seg = 0
+        for j, ((idx, bars, end), spec) in enumerate(zip(events, specs)):
+            k = len(idx)
+            self.action[j, :k] = [_ACTIONS[alerts.action[i]] for i in idx]
+            self.price[j, :k] = klines.open[bars]
+            alert_lev = alerts.leverage[idx]
+            self.leverage[j, :k] = spec.leverage if spec.leverage is not None else np.where(alert_lev > 0, alert_lev, TRADE_LEVERAGE)
+
+            # 세그먼트 k = [k번째 체결 봉, k+1번째 체결 봉), 마지막은 데이터 끝까지
+            bounds = np.append(bars, end)
+            self.seg_base[j] = n_seg
+            seg_start.append(cursor + bars - bars[0])
+            seg_end.append(cursor + bounds[1:] - bars[0])
+            seg_ids.append(np.repeat(np.arange(n_seg, n_seg + k), np.diff(bounds)))
+            highs.append(klines.high[bars[0]:end])
+            lows.append(klines.low[bars[0]:end])
+            opens.append(klines.open[bars[0]:end])
+            cursor += end - bars[0]
+            n_seg += k
+
+        def cat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        self.seg_start = cat(seg_start, np.int64)
+        self.seg_end = cat(seg_end, np.int64)
+        seg_ids = cat(seg_ids, np.int64)
+        self.bar_open = cat(opens, np.float64)
+        self.high_hit = _FirstHit(cat(highs, np.float64), seg_ids, self.seg_start, self.seg_end, above=True)
+        self.low_hit = _FirstHit(cat(lows, np.float64), seg_ids, self.seg_start, self.seg_end, above=False)
+
+
+class _Book:
+    """(P × L) 포지션/자본 상태 + 누적 통계. one-way 레인은 한 방향만 보유"""
+
+    def __init__(self, n_params: int, lanes: _Lanes, initial_capital: float):
+        shape = (n_params, len(lanes.keys))
+        self.use_initial = lanes.use_initial[None, :]
+        self.initial_capital = initial_capital
+        self.capital = np.full(shape, initial_capital)
+        self.fixed_pnl = np.zeros(shape)   # 고정자본 프로필의 누적 net_pnl (equity 계산용)
+        self.long_qty = np.zeros(shape)
+        self.long_entry = np.zeros(shape)
+        self.short_qty = np.zeros(shape)
+        self.short_entry = np.zeros(shape)
+        self.leverage = np.zeros(shape, dtype=np.int64)
+
+        self.pnl_pct = np.zeros(shape)
+        self.trades = np.zeros(shape, dtype=np.int64)
+        self.wins = np.zeros(shape, dtype=np.int64)
+        self.tp_hits = np.zeros(shape, dtype=np.int64)
+        self.sl_hits = np.zeros(shape, dtype=np.int64)
+        self.peak = np.full(shape, initial_capital)
+        self.max_drawdown = np.zeros(shape)
+
+    def equity(self) -> np.ndarray:
+        return np.where(self.use_initial, self.initial_capital * (1.0 + self.fixed_pnl), self.capital)
+
+    def close(self, mask: np.ndarray, long_side: bool, exit_price: np.ndarray) -> None:
+        """mask 위치의 한 방향 포지션 청산: pnl.exit_pnl + 복리 (라이브 청산과 같은 식)"""
+        if not mask.any():
+            return
+        qty = self.long_qty if long_side else self.short_qty
+        entry = self.long_entry if long_side else self.short_entry
+        with np.errstate(divide="ignore", invalid="ignore"):
+            _, _, net = pnl.exit_pnl(entry, exit_price, qty, self.leverage, long_side)
+        net = np.where(mask, net, 0.0)
+
+        self.capital = np.where(mask & ~self.use_initial, pnl.compound(self.capital, net), self.capital)
+        self.fixed_pnl += np.where(self.use_initial, net, 0.0)
+        self.pnl_pct += net * 100.0
+        self.trades += mask
+        self.wins += mask & (net > 0)
+        qty[mask] = 0.0
+        entry[mask] = 0.0
+
+        eq = self.equity()
+        self.peak = np.maximum(self.peak, eq)
+        self.max_drawdown = np.maximum(self.max_drawdown, np.where(self.peak > 0, 1.0 - eq / self.peak, 0.0))
+
+    def open(self, mask: np.ndarray, long_side: bool, price: np.ndarray) -> None:
+        """mask 위치에 진입/추가진입: sizing.entry_quantity와 같은 식 (LOT_SIZE 보정 제외), 평단 갱신"""
+        base = np.where(self.use_initial, self.initial_capital, self.capital)
+        mask = mask & (base > 0)
+        qty = self.long_qty if long_side else self.short_qty
+        entry = self.long_entry if long_side else self.short_entry
+        add = np.where(mask, base * BUY_PCT * self.leverage / price, 0.0)
+        total = qty + add
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg = np.where(total > 0, (qty * entry + add * price) / total, 0.0)
+        entry[mask] = avg[mask]
+        qty[mask] = total[mask]
+
+
+def run(
+    alerts: Alerts,
+    klines: Klines,
+    grid: list[dict] | None = None,
+    initial_capital: float = DEFAULT_CAPITAL,
+) -> BacktestResult:
+    """알림 재생: grid의 모든 조합 × 모든 레인을 동시에 진행"""
+    started = time.perf_counter()
+    grid = grid or make_grid()
+    lanes = _Lanes(alerts, klines)
+    book = _Book(len(grid), lanes, initial_capital)
+
+    # (P, 1) 파라미터: TP 없음 = inf, SL 없음 = 0 → 임계가가 도달 불가능한 값이 됨
+    tp = np.asarray([g["tp_ratio"] or np.inf for g in grid], dtype=np.float64)[:, None]
+    sl = np.asarray([g["sl_ratio"] or 0.0 for g in grid], dtype=np.float64)[:, None]
+    lev_override = np.asarray([g["leverage"] or 0 for g in grid], dtype=np.int64)[:, None]
+
+    oneway = ~lanes.hedge[None, :]
+    for k in range(lanes.steps):
+        valid = (k < lanes.count)[None, :]
+        action = lanes.action[:, k][None, :]
+        price = lanes.price[:, k][None, :]
+
+        # 1) 청산: *_STOP, one-way 반대 방향 알림(스위칭)
+        book.close(valid & (book.long_qty > 0) & ((action == BUY_STOP) | (oneway & (action == SELL))), True, price)
+        book.close(valid & (book.short_qty > 0) & ((action == SELL_STOP) | (oneway & (action == BUY))), False, price)
+
+        # 2) 레버리지: 포지션이 모두 비어 있을 때만 요청값으로 (hedge 정책 / one-way는 항상 flat 상태에서 진입)
+        is_buy = valid & (action == BUY)
+        is_sell = valid & (action == SELL)
+        requested = np.where(lev_override > 0, lev_override, lanes.leverage[:, k][None, :])
+        flat = (book.long_qty == 0) & (book.short_qty == 0)
+        book.leverage = np.where((is_buy | is_sell) & flat, requested, book.leverage)
+
+        # 3) 진입: one-way는 같은 방향 보유 시 스킵, hedge는 추가진입
+        book.open(is_buy & ~(oneway & (book.long_qty > 0)), True, price)
+        book.open(is_sell & ~(oneway & (book.short_qty > 0)), False, price)
+
+        # 4) 다음 알림 전까지 TP/SL
+        seg = lanes.seg_base + np.minimum(k, lanes.count - 1)
+        _apply_exits(book, lanes, seg, valid, tp, sl)
+
+    open_at_end = (book.long_qty > 0) | (book.short_qty > 0)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "[Backtest] %s params × %s lanes × %s steps in %.3fs", len(grid), len(lanes.keys), lanes.steps, elapsed
+    )
+    return BacktestResult(
+        grid, lanes.keys, elapsed,
+        capital=book.capital, equity=book.equity(), pnl_pct=book.pnl_pct, trades=book.trades,
+        wins=book.wins, tp_hits=book.tp_hits, sl_hits=book.sl_hits, max_drawdown=book.max_drawdown,
+        open_at_end=open_at_end,
+    )
+
+
+def _apply_exits(book: _Book, lanes: _Lanes, seg: np.ndarray, valid: np.ndarray,
+                 tp: np.ndarray, sl: np.ndarray) -> None:
+    """세그먼트 안에서 TP/SL 임계가 첫 도달 봉을 찾아 청산 (같은 봉이면 SL 우선)"""
+    for long_side in (True, False):
+        qty = book.long_qty if long_side else book.short_qty
+        entry = book.long_entry if long_side else book.short_entry
+        is_open = valid & (qty > 0)
+        if not is_open.any():
+            continue
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if long_side:
+                tp_px, sl_px = entry * tp, entry * sl
+            else:
+                tp_px, sl_px = entry / tp, entry / sl
+
+        if long_side:
+            tp_pos = lanes.high_hit.query(seg, np.where(is_open, tp_px, np.inf))
+            sl_pos = lanes.low_hit.query(seg, np.where(is_open, sl_px, -np.inf))
+        else:
+            tp_pos = lanes.low_hit.query(seg, np.where(is_open, tp_px, -np.inf))
+            sl_pos = lanes.high_hit.query(seg, np.where(is_open, sl_px, np.inf))
+
+        sl_first = (sl_pos >= 0) & ((tp_pos < 0) | (sl_pos <= tp_pos))
+        tp_first = (tp_pos >= 0) & ~sl_first
+        hit_open = lanes.bar_open[np.maximum(np.where(sl_first, sl_pos, tp_pos), 0)]
+
+        # 갭: 봉 시가가 이미 임계가를 넘었으면 시가 체결
+        if long_side:
+            exit_px = np.where(sl_first, np.minimum(sl_px, hit_open), np.maximum(tp_px, hit_open))
+        else:
+            exit_px = np.where(sl_first, np.maximum(sl_px, hit_open), np.minimum(tp_px, hit_open))
+
+        book.tp_hits += tp_first
+        book.sl_hits += sl_first
+        book.close(tp_first | sl_first, long_side, exit_px)
+
+
+# ── CLI ─────────────────────────────────────────────
+def _parse_list(value: str | None, cast) -> list | None:
+    if not value:
+        return None
+    return [None if v.strip().lower() == "none" else cast(v) for v in value.split(",")]
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description="webhook alert replay / backtest")
+    parser.add_argument("--alerts", required=True, help="알림 로그 (CSV/Parquet: time, symbol, action, [profile], [leverage])")
+    parser.add_argument("--klines", required=True, help="봉 데이터 (CSV/Parquet: symbol, open_time, open, high, low)")
+    parser.add_argument("--profile", default=None, help="알림 로그에 profile 컬럼이 없을 때 사용할 프로필")
+    parser.add_argument("--symbol", default=None, help="봉 데이터에 symbol 컬럼이 없을 때 사용할 심볼")
+    parser.add_argument("--tp", default=None, help="TP 비율 후보 (예: 1.005,1.01,none)")
+    parser.add_argument("--sl", default=None, help="SL 비율 후보 (예: 0.995,0.99,none)")
+    parser.add_argument("--leverage", default=None, help="레버리지 후보 (none = 프로필 기본값)")
+    parser.add_argument("--initial-capital", type=float, default=DEFAULT_CAPITAL)
+    parser.add_argument("--sort", default="pnl_pct", help="요약 정렬 기준 필드")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", default=None, help="전체 요약 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    alerts = Alerts.load(args.alerts, profile=args.profile)
+    klines = Klines.load(args.klines, symbol=args.symbol)
+    grid = make_grid(_parse_list(args.tp, float), _parse_list(args.sl, float), _parse_list(args.leverage, int))
+
+    result = run(alerts, klines, grid, initial_capital=args.initial_capital)
+    summary = sorted(result.summary(), key=lambda r: r.get(args.sort) or 0.0, reverse=True)
+    for row in summary[: args.top]:
+        print(json.dumps(row))
+    print(f"\n{len(grid)} params × {len(result.lanes)} lanes in {result.elapsed:.3f}s")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"elapsed": result.elapsed, "lanes": len(result.lanes), "summary": summary}, f, indent=2)
+        print(f"wrote {args.out}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
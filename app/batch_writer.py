@@ -0,0 +1,130 @@
+# app/batch_writer.py
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class BatchWriter:
+    """
+    큐 + 전용 스레드 SQLite 배치 커밋 (StateStore 저널 / TradeLedger 공용).
+
+    - put(): 호출(주문) 스레드는 큐에 넣기만 하고 디스크를 기다리지 않음
+    - 스레드가 flush_interval 동안 모은 항목을 commit(conn, batch) 한 번으로 커밋
+    - commit 실패 시 연결을 다시 열고 같은 배치를 retries번까지 재시도 → 그래도 실패하면 그 배치만 버리고 계속
+      (스레드는 죽지 않음, 실패/버림 횟수와 마지막 오류는 stats()로 노출)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], sqlite3.Connection],
+        commit: Callable[[sqlite3.Connection, list], None],
+        flush_interval: float,
+        retries: int = 3,
+        retry_delay: float = 1.0,
+    ):
+        self._name = name
+        self._connect = connect
+        self._commit = commit
+        self._flush_interval = flush_interval
+        self._retries = retries
+        self._retry_delay = retry_delay
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+        self._written = 0
+        self._errors = 0
+        self._dropped = 0
+        self._failing = False
+        self._last_error: str | None = None
+
+    def put(self, item) -> None:
+        self._queue.put(item)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        """큐에 남은 항목을 커밋한 뒤 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        conn: sqlite3.Connection | None = None
+        batch: list = []
+        attempts = 0
+        while True:
+            if not batch:
+                if self._stop.is_set() and self._queue.empty():
+                    break
+                batch = self._drain()
+                if not batch:
+                    continue
+            try:
+                if conn is None:
+                    conn = self._connect()
+                self._commit(conn, batch)
+            except Exception as e:
+                attempts += 1
+                self._errors += 1
+                self._failing = True
+                self._last_error = f"{type(e).__name__}: {e}"
+                logger.exception("[%s] commit of %s items failed (%s/%s)", self._name, len(batch), attempts, self._retries)
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                if attempts >= self._retries:
+                    logger.error("[%s] dropping %s items after %s failed commits", self._name, len(batch), attempts)
+                    self._dropped += len(batch)
+                    batch, attempts = [], 0
+                else:
+                    self._stop.wait(self._retry_delay * attempts)
+                continue
+
+            self._written += len(batch)
+            self._failing = False
+            batch, attempts = [], 0
+
+        if conn is not None:
+            conn.close()
+
+    def _drain(self) -> list:
+        try:
+            first = self._queue.get(timeout=self._flush_interval)
+        except queue.Empty:
+            return []
+
+        # 잠깐 모아서 한 번에 커밋
+        time.sleep(self._flush_interval)
+        batch = [first]
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "healthy": not self._failing,
+            "pending": self._queue.qsize(),
+            "written": self._written,
+            "errors": self._errors,
+            "dropped": self._dropped,
+            "last_error": self._last_error,
+        }
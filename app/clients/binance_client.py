@@ -1,65 +1,192 @@
 # app/clients/binance_client.py
 
+import asyncio
 import logging
+import threading
+import aiohttp
+from requests.adapters import HTTPAdapter
 from binance.client import Client
-from binance.exceptions import BinanceAPIException
-from app.config import EX_API_KEY, EX_API_SECRET
+from binance.async_client import AsyncClient
+from app.clients.rate_limiter import RateLimitedClient, AsyncRateLimitedClient, capture_async_response
+from app.services.account_config import account_config
+from app.config import (
+    EX_API_KEY, EX_API_SECRET,
+    HTTP_POOL_SIZE, HTTP_POOL_PER_HOST, HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE, HTTP_DNS_TTL,
+    EXCHANGE_BACKEND, FAKE_EXCHANGE_URL,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 # 싱글톤으로 Client 인스턴스 관리
+# (동기/비동기 둘 다 RateLimitedClient 프록시로 감싸서 weight 한도를 공유)
 _binance_client: Client | None = None
+_async_client: AsyncClient | None = None
+_async_lock: asyncio.Lock | None = None
+# set_binance_client()로 주입된 동기 Client (비동기 Client는 같은 거래소를 가리킬 수 없으므로 사용 안 함)
+_injected = False
+# warmup 스레드 / 스트림 스레드 / 워커가 동시에 첫 생성을 시도해도 한 번만 생성
+_client_lock = threading.Lock()
 
 
-def _ensure_hedge_mode(client: Client) -> None:
+def _check_credentials() -> None:
+    if not EX_API_KEY or not EX_API_SECRET:
+        logger.error("Binance API 키/시크릿이 .env에 설정되지 않았습니다.")
+        raise RuntimeError("Missing Binance API credentials.")
+
+
+def _mount_pool(client: Client) -> None:
+    """
+    동기 Client의 requests 세션에 커넥션 풀 확장.
+    (기본 풀 10개 → 실행기 워커 여러 개가 동시에 쓰면 연결을 새로 맺게 됨)
     """
-    Binance Futures 계정을 Hedge Mode(dualSidePosition=True)로 설정합니다.
-    이미 Hedge Mode면 아무 작업도 하지 않습니다.
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    client.session.mount("https://", adapter)
+
+
+def _async_session_params() -> dict:
+    """
+    AsyncClient용 aiohttp 세션 설정.
+    - keep-alive 커넥션 풀 (limit / limit_per_host)
+    - DNS 캐시 + aiodns 리졸버(설치된 경우)
+    - 응답 헤더는 trace로 요청별로 잡음 (client.response는 동시 요청끼리 공유)
     """
     try:
-        mode = client.futures_get_position_mode()
+        resolver = aiohttp.AsyncResolver()
+    except Exception:
+        resolver = None  # aiodns 없으면 기본(스레드) 리졸버
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        resolver=resolver,
+    )
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(capture_async_response)
+    return {"connector": connector, "timeout": timeout, "trace_configs": [trace]}
+
+
+def set_binance_client(client) -> None:
+    """
+    get_binance_client()가 돌려줄 Client를 직접 주입합니다 (가짜 거래소 / 벤치마크용).
+    RateLimitedClient로 감싸서 실거래와 같은 경로를 타게 함. None이면 초기화.
+    주입된 동안은 비동기 Client를 쓰지 않음 (async_client_available() == False).
+    """
+    global _binance_client, _injected
+    _binance_client = RateLimitedClient(client) if client is not None else None
+    _injected = client is not None
 
-        if mode.get("dualSidePosition") is True:
-            logger.info("Binance account already in Hedge Mode.")
-            return
 
-        logger.info("Switching Binance account to Hedge Mode...")
-        client.futures_change_position_mode(dualSidePosition=True)
+def async_client_available() -> bool:
+    """get_binance_client(async_=True)를 쓸 수 있는지 (인프로세스 가짜 거래소 / 주입된 Client는 동기 전용)"""
+    return EXCHANGE_BACKEND != "fake" and not _injected
 
-        # 변경 확인
-        confirm = client.futures_get_position_mode()
-        if confirm.get("dualSidePosition") is not True:
-            raise RuntimeError("Failed to enable Hedge Mode.")
 
-        logger.info("Hedge Mode enabled successfully.")
+def _create_fake_client():
+    """EXCHANGE_BACKEND=fake / fake_http 용 Client"""
+    from app.clients.fake_binance import FakeBinanceClient, attach_position_cache, make_http_client
+    from app.services.position_cache import position_cache
+    from app.services.open_orders import open_order_book
 
-    except BinanceAPIException as e:
-        # 이미 Hedge Mode거나 변경 불가능한 상태일 수 있음
-        logger.warning("Binance API exception while setting Hedge Mode: %s", e)
-    except Exception as e:
-        logger.error("Unexpected error while enabling Hedge Mode: %s", e)
-        raise
+    if EXCHANGE_BACKEND == "fake_http":
+        logger.info("Using fake Binance HTTP exchange at %s.", FAKE_EXCHANGE_URL)
+        return make_http_client(FAKE_EXCHANGE_URL)
+    logger.info("Using in-process fake Binance exchange.")
+    fake = FakeBinanceClient()
+    attach_position_cache(fake, position_cache, open_order_book)
+    return fake
 
 
-def get_binance_client() -> Client:
+def get_binance_client(async_: bool = False):
     """
     실거래용 Binance Client를 반환합니다.
     EX_API_KEY/EX_API_SECRET 환경변수가 설정되어 있지 않으면 에러를 발생시킵니다.
     최초 생성 시 Hedge Mode를 자동으로 활성화합니다.
+    EXCHANGE_BACKEND가 fake / fake_http면 로컬 가짜 거래소를 사용합니다.
+
+    async_=True면 aiohttp 기반 AsyncClient를 돌려주는 코루틴 (이벤트 루프에서 사용):
+        client = await get_binance_client(async_=True)
+        positions = await client.futures_position_information()
     """
+    if async_:
+        return _get_async_client()
+
+    if _binance_client is not None:
+        return _binance_client
+
+    with _client_lock:
+        return _build_binance_client()
+
+
+def _build_binance_client() -> Client:
     global _binance_client
 
+    if _binance_client is None and EXCHANGE_BACKEND in ("fake", "fake_http"):
+        _binance_client = RateLimitedClient(_create_fake_client())
+        account_config.ensure_hedge_mode(_binance_client)
+
     if _binance_client is None:
-        if not EX_API_KEY or not EX_API_SECRET:
-            logger.error("Binance API 키/시크릿이 .env에 설정되지 않았습니다.")
-            raise RuntimeError("Missing Binance API credentials.")
+        _check_credentials()
 
         # 실제 거래용 Client 생성
-        _binance_client = Client(EX_API_KEY, EX_API_SECRET)
+        client = Client(
+            EX_API_KEY,
+            EX_API_SECRET,
+            requests_params={"timeout": (HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT)},
+        )
+        _mount_pool(client)
+        _binance_client = RateLimitedClient(client)
         logger.info("Initialized live Binance Client.")
 
         # ⭐ 여기서 Hedge Mode 보장
-        _ensure_hedge_mode(_binance_client)
+        account_config.ensure_hedge_mode(_binance_client)
 
-    return _binance_client
\ No newline at end of file
+    return _binance_client
+
+
+async def _get_async_client() -> AsyncClient:
+    """
+    get_binance_client(async_=True)의 본체 (같은 키/설정, 이벤트 루프에서 await 가능).
+    - aiohttp 커넥션 풀 공유, 최초 1회만 생성
+    - Hedge Mode 보장은 동기 클라이언트 쪽에서 이미 처리하므로 여기서는 생략
+    """
+    global _async_client, _async_lock
+
+    if _async_client is not None:
+        return _async_client
+
+    if not async_client_available():
+        raise RuntimeError("Async client is not available with EXCHANGE_BACKEND=fake or an injected client.")
+
+    if _async_lock is None:
+        _async_lock = asyncio.Lock()
+
+    async with _async_lock:
+        if _async_client is None and EXCHANGE_BACKEND == "fake_http":
+            client = AsyncClient("fake-key", "fake-secret", session_params=_async_session_params())
+            client.FUTURES_URL = f"{FAKE_EXCHANGE_URL.rstrip('/')}/fapi"
+            _async_client = AsyncRateLimitedClient(client)
+            logger.info("Initialized async client for fake exchange at %s.", FAKE_EXCHANGE_URL)
+
+        if _async_client is None:
+            _check_credentials()
+            client = await AsyncClient.create(
+                EX_API_KEY,
+                EX_API_SECRET,
+                session_params=_async_session_params(),
+            )
+            _async_client = AsyncRateLimitedClient(client)
+            logger.info("Initialized async Binance Client.")
+
+    return _async_client
+
+
+async def close_async_binance_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close_connection()
+        _async_client = None
@@ -0,0 +1,606 @@
+# app/clients/fake_binance.py
+
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import unquote
+
+from binance.exceptions import BinanceAPIException
+
+
+class _FakeResponse:
+    """python-binance가 client.response / 예외에서 읽는 최소한의 응답 객체"""
+
+    def __init__(self, status_code: int = 200, text: str = "", headers: dict | None = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.request = None
+
+
+class FakeBinanceClient:
+    """
+    로컬 가짜 Binance USDⓈ-M Futures (python-binance Client와 같은 메서드 이름/응답 형식).
+
+    - latency: 호출당 지연(초) 또는 (최소, 최대) 범위
+    - fill_delay: 시장가 주문이 포지션에 반영되기까지의 지연(초) → _wait_for 타임아웃 재현
+    - partial_fill: 주문 직후 체결 비율(0~1, 나머지는 fill_delay 후 체결)
+    - inject_error(): 엔드포인트별 예외 주입 (429, -2019 등)
+    - subscribe(fn) / unsubscribe(fn): User Data Stream 형식(ORDER_TRADE_UPDATE / ACCOUNT_UPDATE) 이벤트 수신
+      (WebSocket으로 받으려면 serve_user_stream)
+    - calls: 엔드포인트별 호출 수 (알림당 REST 호출 수 측정용)
+    """
+
+    def __init__(
+        self,
+        prices: dict[str, float] | None = None,
+        latency: float | tuple[float, float] = 0.0,
+        fill_delay: float = 0.0,
+        partial_fill: float = 1.0,
+        fee_rate: float = 0.0004,
+        dual_side: bool = True,
+        step_size: float = 0.001,
+        tick_size: float = 0.01,
+        min_notional: float = 5.0,
+    ):
+        self.prices = dict(prices or {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0})
+        self.latency = latency
+        self.fill_delay = fill_delay
+        self.partial_fill = partial_fill
+        self.fee_rate = fee_rate
+        self.dual_side = dual_side
+        self.multi_assets = False
+        self.step_size = step_size
+        self.tick_size = tick_size
+        self.min_notional = min_notional
+
+        self._lock = threading.RLock()
+        self._order_ids = itertools.count(1)
+        self._positions: dict[tuple[str, str], dict] = {}
+        self._orders: dict[int, dict] = {}
+        self._leverage: dict[str, int] = defaultdict(lambda: 20)
+        self._errors: dict[str, list[BinanceAPIException]] = defaultdict(list)
+        self._listeners: list = []
+        self._listen_key_seq = 0
+        self._used_weight = 0
+
+        self.calls: dict[str, int] = defaultdict(int)
+        self.response = _FakeResponse()
+
+    # ── 시뮬레이터 제어 ──────────────────────────────
+    def set_price(self, symbol: str, price: float) -> None:
+        self.prices[symbol] = price
+
+    def inject_error(self, endpoint: str, status_code: int = 400, code: int = -1000,
+                     msg: str = "Injected error", times: int = 1) -> None:
+        text = json.dumps({"code": code, "msg": msg})
+        headers = {"Retry-After": "1"} if status_code in (418, 429) else {}
+        for _ in range(times):
+            self._errors[endpoint].append(
+                BinanceAPIException(_FakeResponse(status_code, text, headers), status_code, text)
+            )
+
+    def subscribe(self, fn) -> None:
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def expire_listen_key(self) -> None:
+        """listenKey 만료 재현: 접속 중인 스트림에 listenKeyExpired 전송, 이후 새 키 발급"""
+        self._listen_key_seq += 1
+        self._emit({"e": "listenKeyExpired", "E": int(time.time() * 1000)})
+
+    def add_open_order(self, symbol: str, side: str, qty: float, price: float,
+                       reduce_only: bool = True, position_side: str = "BOTH") -> int:
+        """TP/SL 같은 미체결 지정가 주문을 심어 둠 (정리 로직 테스트용)"""
+        with self._lock:
+            order_id = next(self._order_ids)
+            order = self._order_record(
+                order_id, symbol, side, "LIMIT", qty, position_side, reduce_only,
+                status="NEW", price=price,
+            )
+            self._orders[order_id] = order
+        now = int(time.time() * 1000)
+        self._emit({
+            "e": "ORDER_TRADE_UPDATE", "E": now, "T": now,
+            "o": {"s": symbol, "S": side, "o": "LIMIT", "q": str(qty), "ap": "0", "x": "NEW", "X": "NEW",
+                  "i": order_id, "z": "0", "R": reduce_only, "ps": position_side},
+        })
+        return order_id
+
+    def reset_calls(self) -> None:
+        self.calls.clear()
+
+    # ── 내부 ────────────────────────────────────────
+    def _call(self, endpoint: str, weight: int = 1) -> None:
+        self.calls[endpoint] += 1
+        if isinstance(self.latency, tuple):
+            delay = random.uniform(*self.latency)
+        else:
+            delay = self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self._used_weight += weight
+            self.response = _FakeResponse(headers={"X-MBX-USED-WEIGHT-1M": str(self._used_weight)})
+            if self._errors[endpoint]:
+                raise self._errors[endpoint].pop(0)
+
+    def _emit(self, event: dict) -> None:
+        for fn in list(self._listeners):
+            fn(event)
+
+    def _price(self, symbol: str) -> float:
+        try:
+            return self.prices[symbol]
+        except KeyError:
+            text = json.dumps({"code": -1121, "msg": "Invalid symbol."})
+            raise BinanceAPIException(_FakeResponse(400, text), 400, text)
+
+    def _order_record(self, order_id, symbol, side, order_type, qty, position_side,
+                      reduce_only, status="NEW", price=0.0) -> dict:
+        return {
+            "orderId": order_id,
+            "symbol": symbol,
+            "status": status,
+            "clientOrderId": f"fake-{order_id}",
+            "price": str(price),
+            "avgPrice": "0",
+            "origQty": str(qty),
+            "executedQty": "0",
+            "cumQuote": "0",
+            "type": order_type,
+            "side": side,
+            "positionSide": position_side,
+            "reduceOnly": reduce_only,
+            "updateTime": int(time.time() * 1000),
+            "_commission": 0.0,
+        }
+
+    def _fill(self, order: dict, qty: float) -> None:
+        """qty만큼 체결 → 포지션/주문 상태 갱신 + 이벤트 발행"""
+        symbol = order["symbol"]
+        price = self._price(symbol)
+        signed = qty if order["side"] == "BUY" else -qty
+        commission = price * qty * self.fee_rate
+
+        with self._lock:
+            key = (symbol, order["positionSide"])
+            pos = self._positions.setdefault(key, {"amt": 0.0, "entry": 0.0})
+            old = pos["amt"]
+            new = old + signed
+            if old == 0 or (old > 0) == (signed > 0):
+                # 신규/추가 진입 → 가중평균 진입가
+                total = abs(old) + qty
+                pos["entry"] = (pos["entry"] * abs(old) + price * qty) / total if total else 0.0
+            if abs(new) < 1e-12 or (old != 0 and (old > 0) != (new > 0) and order["reduceOnly"]):
+                new = 0.0
+            pos["amt"] = round(new, 8)
+            if pos["amt"] == 0:
+                pos["entry"] = 0.0
+
+            executed = float(order["executedQty"]) + qty
+            cum_quote = float(order["cumQuote"]) + price * qty
+            order["executedQty"] = str(executed)
+            order["cumQuote"] = str(cum_quote)
+            order["avgPrice"] = str(cum_quote / executed)
+            order["_commission"] += commission
+            order["status"] = "FILLED" if executed >= float(order["origQty"]) - 1e-12 else "PARTIALLY_FILLED"
+            order["updateTime"] = int(time.time() * 1000)
+            position = dict(pos)
+
+        now = int(time.time() * 1000)
+        self._emit({
+            "e": "ORDER_TRADE_UPDATE", "E": now, "T": now,
+            "o": {
+                "s": symbol, "S": order["side"], "o": order["type"], "q": order["origQty"],
+                "ap": order["avgPrice"], "x": "TRADE", "X": order["status"], "i": order["orderId"],
+                "l": str(qty), "z": order["executedQty"], "L": str(price),
+                "N": "USDT", "n": str(commission), "R": order["reduceOnly"],
+                "ps": order["positionSide"], "rp": "0",
+            },
+        })
+        self._emit({
+            "e": "ACCOUNT_UPDATE", "E": now, "T": now,
+            "a": {"m": "ORDER", "B": [], "P": [{
+                "s": symbol, "pa": str(position["amt"]), "ep": str(position["entry"]),
+                "up": "0", "mt": "cross", "iw": "0", "ps": order["positionSide"],
+            }]},
+        })
+
+    def _public_order(self, order: dict) -> dict:
+        return {k: v for k, v in order.items() if not k.startswith("_")}
+
+    # ── 시세 / 거래 규칙 ──────────────────────────────
+    def ping(self) -> dict:
+        return {}
+
+    def futures_ping(self) -> dict:
+        self._call("futures_ping")
+        return {}
+
+    def futures_exchange_info(self, **params) -> dict:
+        self._call("futures_exchange_info")
+        step_prec = max(0, len(f"{self.step_size:f}".rstrip("0").split(".")[1]))
+        return {
+            "symbols": [
+                {
+                    "symbol": symbol,
+                    "quantityPrecision": step_prec,
+                    "filters": [
+                        {"filterType": "PRICE_FILTER", "tickSize": str(self.tick_size),
+                         "minPrice": "0.01", "maxPrice": "1000000"},
+                        {"filterType": "LOT_SIZE", "stepSize": str(self.step_size),
+                         "minQty": str(self.step_size), "maxQty": "100000"},
+                        {"filterType": "MIN_NOTIONAL", "notional": str(self.min_notional)},
+                    ],
+                }
+                for symbol in self.prices
+            ]
+        }
+
+    def futures_mark_price(self, **params):
+        symbol = params.get("symbol")
+        self._call("futures_mark_price", 1 if symbol else 10)
+        if symbol:
+            return {"symbol": symbol, "markPrice": str(self._price(symbol))}
+        return [{"symbol": s, "markPrice": str(p)} for s, p in self.prices.items()]
+
+    # ── 계정 설정 ────────────────────────────────────
+    def futures_get_position_mode(self, **params) -> dict:
+        self._call("futures_get_position_mode", 30)
+        return {"dualSidePosition": self.dual_side}
+
+    def futures_change_position_mode(self, **params) -> dict:
+        self._call("futures_change_position_mode")
+        value = params.get("dualSidePosition")
+        self.dual_side = value in (True, "true", "True")
+        return {"code": 200, "msg": "success"}
+
+    def futures_get_multi_assets_mode(self) -> dict:
+        self._call("futures_get_multi_assets_mode", 30)
+        return {"multiAssetsMargin": self.multi_assets}
+
+    def futures_account_config(self, **params) -> dict:
+        self._call("futures_account_config", 5)
+        return {
+            "feeTier": 0, "canTrade": True, "canDeposit": True, "canWithdraw": True,
+            "dualSidePosition": self.dual_side, "multiAssetsMargin": self.multi_assets,
+            "tradeGroupId": -1, "updateTime": 0,
+        }
+
+    def futures_symbol_config(self, **params) -> list[dict]:
+        self._call("futures_symbol_config", 5)
+        symbols = [params["symbol"]] if params.get("symbol") else list(self.prices)
+        return [
+            {"symbol": s, "marginType": "CROSSED", "isAutoAddMargin": "false",
+             "leverage": self._leverage[s], "maxNotionalValue": "1000000"}
+            for s in symbols
+        ]
+
+    def futures_change_leverage(self, **params) -> dict:
+        self._call("futures_change_leverage")
+        symbol = params["symbol"]
+        self._price(symbol)
+        self._leverage[symbol] = int(params["leverage"])
+        self._emit({"e": "ACCOUNT_CONFIG_UPDATE", "E": int(time.time() * 1000),
+                    "ac": {"s": symbol, "l": self._leverage[symbol]}})
+        return {"symbol": symbol, "leverage": self._leverage[symbol], "maxNotionalValue": "1000000"}
+
+    # ── 포지션 ──────────────────────────────────────
+    def futures_position_information(self, **params) -> list[dict]:
+        self._call("futures_position_information", 5)
+        symbol = params.get("symbol")
+        with self._lock:
+            rows = []
+            for (sym, side), pos in sorted(self._positions.items()):
+                if symbol and sym != symbol:
+                    continue
+                if pos["amt"] == 0:
+                    continue  # v3 positionRisk: 열린 포지션만 내려옴
+                rows.append({
+                    "symbol": sym,
+                    "positionSide": side,
+                    "positionAmt": str(pos["amt"]),
+                    "entryPrice": str(pos["entry"]),
+                    "markPrice": str(self.prices.get(sym, 0.0)),
+                    "unRealizedProfit": str((self.prices.get(sym, 0.0) - pos["entry"]) * pos["amt"]),
+                    "leverage": str(self._leverage[sym]),
+                    "marginType": "cross",
+                })
+            return rows
+
+    # ── 주문 ────────────────────────────────────────
+    def futures_create_order(self, **params) -> dict:
+        self._call("futures_create_order", 0)
+        return self._create_order(params)
+
+    def _create_order(self, params: dict) -> dict:
+        symbol = params["symbol"]
+        side = params["side"]
+        qty = float(params["quantity"])
+        position_side = params.get("positionSide") or "BOTH"
+        reduce_only = params.get("reduceOnly") in (True, "true", "True")
+        self._price(symbol)
+
+        with self._lock:
+            order_id = next(self._order_ids)
+            order = self._order_record(
+                order_id, symbol, side, params.get("type", "MARKET"), qty, position_side, reduce_only,
+            )
+            self._orders[order_id] = order
+
+        if order["type"] != "MARKET":
+            order["price"] = str(params.get("price", 0))
+            return self._public_order(order)
+
+        first = qty * self.partial_fill if self.fill_delay > 0 else qty
+        if self.fill_delay <= 0:
+            self._fill(order, qty)
+        else:
+            if first > 0:
+                self._fill(order, first)
+            rest = qty - first
+            if rest > 0:
+                threading.Timer(self.fill_delay, self._fill, args=(order, rest)).start()
+
+        if params.get("newOrderRespType") == "RESULT":
+            return self._public_order(order)
+        # ACK 응답: 체결 정보 없음
+        return {k: v for k, v in self._public_order(order).items()
+                if k in ("orderId", "symbol", "status", "clientOrderId", "side", "positionSide")}
+
+    def futures_place_batch_order(self, **params) -> list[dict]:
+        self._call("futures_place_batch_order", 5)
+        orders = params["batchOrders"]
+        if isinstance(orders, str):
+            orders = json.loads(orders)
+        results = []
+        for o in orders:
+            try:
+                results.append(self._create_order(dict(o)))
+            except BinanceAPIException as e:
+                results.append({"code": e.code, "msg": e.message})
+        return results
+
+    def futures_get_order(self, **params) -> dict:
+        self._call("futures_get_order")
+        order = self._orders.get(int(params["orderId"]))
+        if order is None:
+            text = json.dumps({"code": -2013, "msg": "Order does not exist."})
+            raise BinanceAPIException(_FakeResponse(400, text), 400, text)
+        return self._public_order(order)
+
+    def futures_get_open_orders(self, **params) -> list[dict]:
+        symbol = params.get("symbol")
+        self._call("futures_get_open_orders", 1 if symbol else 40)
+        with self._lock:
+            return [
+                self._public_order(o) for o in self._orders.values()
+                if o["status"] in ("NEW", "PARTIALLY_FILLED") and (not symbol or o["symbol"] == symbol)
+            ]
+
+    def _cancel(self, order_id: int) -> dict:
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or order["status"] not in ("NEW", "PARTIALLY_FILLED"):
+                return {"code": -2011, "msg": "Unknown order sent."}
+            order["status"] = "CANCELED"
+        now = int(time.time() * 1000)
+        self._emit({
+            "e": "ORDER_TRADE_UPDATE", "E": now, "T": now,
+            "o": {"s": order["symbol"], "S": order["side"], "o": order["type"], "q": order["origQty"],
+                  "ap": order["avgPrice"], "x": "CANCELED", "X": "CANCELED", "i": order_id,
+                  "z": order["executedQty"], "R": order["reduceOnly"], "ps": order["positionSide"]},
+        })
+        return self._public_order(order)
+
+    def futures_cancel_order(self, **params) -> dict:
+        self._call("futures_cancel_order")
+        res = self._cancel(int(params["orderId"]))
+        if "code" in res:
+            text = json.dumps(res)
+            raise BinanceAPIException(_FakeResponse(400, text), 400, text)
+        return res
+
+    def futures_cancel_orders(self, **params) -> list[dict]:
+        self._call("futures_cancel_orders")
+        ids = params.get("orderidlist") or params.get("orderIdList") or []
+        if isinstance(ids, str):
+            ids = json.loads(unquote(ids))
+        return [self._cancel(int(i)) for i in ids]
+
+    # ── User Data Stream ─────────────────────────────
+    @property
+    def listen_key(self) -> str:
+        return f"fake-listen-key-{self._listen_key_seq}"
+
+    def futures_stream_get_listen_key(self) -> str:
+        self._call("futures_stream_get_listen_key")
+        return self.listen_key
+
+    def futures_stream_keepalive(self, listenKey) -> dict:
+        self._call("futures_stream_keepalive")
+        return {}
+
+    def futures_stream_close(self, listenKey) -> dict:
+        self._call("futures_stream_close")
+        return {}
+
+
+def attach_position_cache(fake: FakeBinanceClient, cache, order_book=None) -> None:
+    """
+    가짜 거래소 이벤트를 PositionCache(+ 미체결 주문 장부)에 직접 흘려 넣음
+    (User Data Stream 없이도 스트림이 살아있는 것과 같은 경로 재현)
+    """
+    def on_event(event: dict) -> None:
+        if event["e"] == "ORDER_TRADE_UPDATE":
+            cache.apply_order_update(event)
+            if order_book is not None:
+                order_book.apply_order_update(event)
+        elif event["e"] == "ACCOUNT_UPDATE":
+            cache.apply_account_update(event)
+
+    fake.subscribe(on_event)
+    cache.set_live(True)
+    if order_book is not None:
+        order_book.set_live(True)
+
+
+async def serve_mark_prices(fake: FakeBinanceClient, host: str = "127.0.0.1", port: int = 9101,
+                            interval: float = 1.0) -> None:
+    """
+    markPrice WebSocket 스탠드인: 접속한 클라이언트에 interval초마다
+    fake.prices 전체를 !markPrice@arr 형식으로 전송 (SUBSCRIBE 요청에는 응답만)
+    MarkPriceStream(base_url=f"ws://{host}:{port}/ws")로 연결해서 사용
+    """
+    import asyncio
+    import websockets
+
+    async def handler(ws):
+        async def reader():
+            async for raw in ws:
+                req = json.loads(raw)
+                await ws.send(json.dumps({"result": None, "id": req.get("id")}))
+
+        read_task = asyncio.create_task(reader())
+        try:
+            while True:
+                now = int(time.time() * 1000)
+                await ws.send(json.dumps([
+                    {"e": "markPriceUpdate", "E": now, "s": symbol, "p": str(price)}
+                    for symbol, price in list(fake.prices.items())
+                ]))
+                await asyncio.sleep(interval)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            read_task.cancel()
+
+    async with websockets.serve(handler, host, port):
+        await asyncio.Future()
+
+
+async def serve_user_stream(fake: FakeBinanceClient, host: str = "127.0.0.1", port: int = 9102) -> None:
+    """
+    User Data Stream WebSocket 스탠드인: /ws/{listenKey}로 접속한 클라이언트에
+    가짜 거래소가 발행하는 이벤트(ORDER_TRADE_UPDATE / ACCOUNT_UPDATE / ACCOUNT_CONFIG_UPDATE /
+    listenKeyExpired)를 그대로 전송. 현재 listenKey가 아니면 접속 거부(1008).
+    UserDataStream(client=fake, base_url=f"ws://{host}:{port}/ws")로 연결해서 사용
+    """
+    import asyncio
+    import websockets
+
+    loop = asyncio.get_running_loop()
+
+    async def handler(ws):
+        if ws.request.path.rstrip("/").rsplit("/", 1)[-1] != fake.listen_key:
+            await ws.close(code=1008, reason="invalid listenKey")
+            return
+
+        events: asyncio.Queue = asyncio.Queue()
+
+        def forward(event: dict) -> None:
+            # 주문 스레드에서 호출됨 → 서버 루프로 넘김
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        fake.subscribe(forward)
+        try:
+            while True:
+                event = await events.get()
+                await ws.send(json.dumps(event))
+                if event["e"] == "listenKeyExpired":
+                    break
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            fake.unsubscribe(forward)
+
+    async with websockets.serve(handler, host, port):
+        await asyncio.Future()
+
+
+# ── HTTP 스탠드인 ─────────────────────────────────────
+
+# (method, path) → FakeBinanceClient 메서드
+_ROUTES = {
+    ("GET", "/fapi/v1/ping"): "futures_ping",
+    ("GET", "/fapi/v1/symbolConfig"): "futures_symbol_config",
+    ("GET", "/fapi/v1/accountConfig"): "futures_account_config",
+    ("GET", "/fapi/v1/exchangeInfo"): "futures_exchange_info",
+    ("GET", "/fapi/v1/premiumIndex"): "futures_mark_price",
+    ("GET", "/fapi/v1/positionSide/dual"): "futures_get_position_mode",
+    ("POST", "/fapi/v1/positionSide/dual"): "futures_change_position_mode",
+    ("GET", "/fapi/v1/multiAssetsMargin"): "futures_get_multi_assets_mode",
+    ("POST", "/fapi/v1/leverage"): "futures_change_leverage",
+    ("GET", "/fapi/v3/positionRisk"): "futures_position_information",
+    ("GET", "/fapi/v2/positionRisk"): "futures_position_information",
+    ("POST", "/fapi/v1/order"): "futures_create_order",
+    ("GET", "/fapi/v1/order"): "futures_get_order",
+    ("DELETE", "/fapi/v1/order"): "futures_cancel_order",
+    ("GET", "/fapi/v1/openOrders"): "futures_get_open_orders",
+    ("POST", "/fapi/v1/batchOrders"): "futures_place_batch_order",
+    ("DELETE", "/fapi/v1/batchOrders"): "futures_cancel_orders",
+}
+
+# 서명/타임스탬프 등 가짜 거래소에서 무시하는 파라미터
+_IGNORED_PARAMS = {"timestamp", "signature", "recvWindow", "newClientOrderId"}
+
+
+def create_fake_exchange_app(fake: FakeBinanceClient):
+    """
+    FakeBinanceClient를 Binance REST 경로로 노출하는 FastAPI 앱.
+    실제 python-binance Client의 FUTURES_URL을 이 서버로 돌리면 HTTP 왕복까지 포함해 측정 가능
+    (make_http_client 참고).
+    """
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+
+    @app.api_route("/fapi/v1/listenKey", methods=["POST", "PUT", "DELETE"])
+    async def listen_key(request: Request):
+        if request.method == "POST":
+            return {"listenKey": fake.futures_stream_get_listen_key()}
+        if request.method == "PUT":
+            return fake.futures_stream_keepalive(fake.listen_key)
+        return fake.futures_stream_close(fake.listen_key)
+
+    @app.api_route("/fapi/{version}/{path:path}", methods=["GET", "POST", "DELETE"])
+    async def dispatch(version: str, path: str, request: Request):
+        name = _ROUTES.get((request.method, f"/fapi/{version}/{path}"))
+        if name is None:
+            return JSONResponse({"code": -1, "msg": "Not simulated"}, status_code=404)
+
+        params = dict(request.query_params)
+        if request.method != "GET":
+            params.update(dict(await request.form()))
+        params = {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+
+        try:
+            method = getattr(fake, name)
+            result = method() if name in ("futures_ping", "futures_get_multi_assets_mode") else method(**params)
+        except BinanceAPIException as e:
+            return JSONResponse(
+                {"code": e.code, "msg": e.message},
+                status_code=e.status_code,
+                headers=dict(e.response.headers),
+            )
+        return JSONResponse(result, headers=fake.response.headers)
+
+    return app
+
+
+def make_http_client(base_url: str):
+    """FUTURES_URL을 가짜 거래소 HTTP 서버로 돌린 실제 python-binance Client"""
+    from binance.client import Client
+
+    client = Client("fake-key", "fake-secret", ping=False)
+    client.FUTURES_URL = f"{base_url.rstrip('/')}/fapi"
+    return client
@@ -0,0 +1,145 @@
+# app/clients/mark_price_stream.py
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+
+from app.clients.ws import StreamThread
+from app.config import MARK_PRICE_STREAM_URL, MARK_PRICE_MAX_AGE
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class MarkPriceTable:
+    """
+    심볼별 최신 마크가격 테이블.
+    값은 (price, 수신 시각) 튜플 하나로 통째로 교체 → 읽기 쪽은 락 없이 O(1) 조회
+    """
+
+    def __init__(self):
+        self._prices: dict[str, tuple[float, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, symbol: str, price: float, at: float | None = None) -> None:
+        self._prices[symbol] = (price, at if at is not None else time.time())
+
+    def get(self, symbol: str, max_age: float = MARK_PRICE_MAX_AGE) -> float | None:
+        """max_age초 이내 값이면 가격, 아니면 None"""
+        entry = self._prices.get(symbol)
+        if entry is None or time.time() - entry[1] > max_age:
+            return None
+        return entry[0]
+
+    def stats(self) -> dict:
+        return {"symbols": len(self._prices), "hits": self.hits, "misses": self.misses}
+
+
+mark_prices = MarkPriceTable()
+
+
+def get_mark_price(client, symbol: str) -> float:
+    """
+    사이징용 마크가격: 스트림 테이블 값이 MARK_PRICE_MAX_AGE 이내면 그대로,
+    아니면(스트림 꺼짐/끊김/미구독 심볼) REST 조회
+    """
+    price = mark_prices.get(symbol)
+    if price is not None:
+        mark_prices.hits += 1
+        return price
+
+    mark_prices.misses += 1
+    return float(client.futures_mark_price(symbol=symbol)["markPrice"])
+
+
+class MarkPriceStream(StreamThread):
+    """
+    Binance Futures markPrice 스트림 구독 관리자.
+
+    - symbols가 없으면 전 종목 스트림(!markPrice@arr@1s) 하나만 구독
+    - symbols가 있으면 <symbol>@markPrice@1s 를 SUBSCRIBE, subscribe()로 실행 중 추가 가능
+    - 재접속 시 구독 목록 전체를 다시 SUBSCRIBE
+
+    base_url을 주입하면 로컬 가짜 WebSocket 서버로도 테스트 가능
+    (app.clients.fake_binance.serve_mark_prices)
+    """
+
+    name = "mark-price-stream"
+
+    def __init__(
+        self,
+        base_url: str = MARK_PRICE_STREAM_URL,
+        symbols: list[str] | None = None,
+        table: MarkPriceTable = mark_prices,
+    ):
+        super().__init__()
+        self._base_url = base_url.rstrip("/")
+        self._table = table
+        self._ids = itertools.count(1)
+        if symbols:
+            self._streams = {f"{s.lower()}@markPrice@1s" for s in symbols}
+        else:
+            self._streams = {"!markPrice@arr@1s"}
+
+    async def _url(self) -> str:
+        return self._base_url
+
+    async def _on_open(self) -> None:
+        await self._send_subscribe(sorted(self._streams))
+
+    async def _send_subscribe(self, streams: list[str]) -> None:
+        if self._ws is None or not streams:
+            return
+        await self._ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams, "id": next(self._ids)}))
+
+    def subscribe(self, symbols: list[str]) -> None:
+        """심볼 스트림 추가 (연결 중이면 즉시 SUBSCRIBE, 아니면 다음 접속 때)"""
+        new = [f"{s.lower()}@markPrice@1s" for s in symbols]
+        new = [s for s in new if s not in self._streams]
+        if not new:
+            return
+        self._streams.update(new)
+        if self._loop is not None and self.connected:
+            asyncio.run_coroutine_threadsafe(self._send_subscribe(new), self._loop)
+
+    def _on_message(self, msg) -> None:
+        # combined stream 형식({"stream", "data"})도 허용
+        if isinstance(msg, dict) and "data" in msg:
+            msg = msg["data"]
+
+        now = time.time()
+        events = msg if isinstance(msg, list) else [msg]
+        for event in events:
+            if event.get("e") != "markPriceUpdate":
+                continue  # SUBSCRIBE 응답 등
+            self._table.update(event["s"], float(event["p"]), now)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "streams": len(self._streams), **self._table.stats()}
+
+
+# 싱글톤 스트림
+_mark_price_stream: MarkPriceStream | None = None
+
+
+def get_mark_price_stream() -> MarkPriceStream | None:
+    return _mark_price_stream
+
+
+def start_mark_price_stream(**kwargs) -> MarkPriceStream:
+    global _mark_price_stream
+    if _mark_price_stream is None:
+        _mark_price_stream = MarkPriceStream(**kwargs)
+    _mark_price_stream.start()
+    logger.info("Mark price stream started.")
+    return _mark_price_stream
+
+
+def stop_mark_price_stream() -> None:
+    global _mark_price_stream
+    if _mark_price_stream is not None:
+        _mark_price_stream.stop()
+        _mark_price_stream = None
@@ -0,0 +1,362 @@
+# app/clients/rate_limiter.py
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+
+from binance.exceptions import BinanceAPIException
+
+from app.config import (
+    RATE_LIMIT_WEIGHT_1M, RATE_LIMIT_ORDERS_1M, RATE_LIMIT_ORDERS_10S,
+    RATE_LIMIT_RESERVE, RATE_LIMIT_MAX_RETRY, METRICS_ENABLED,
+)
+from app.metrics import observe_exchange_call
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# ── 엔드포인트별 IP weight (Binance USDⓈ-M Futures 문서 기준) ──────────
+_WEIGHTS = {
+    "futures_exchange_info": 1,
+    "futures_position_information": 5,
+    "futures_account": 5,
+    "futures_account_balance": 5,
+    "futures_get_position_mode": 30,
+    "futures_change_position_mode": 1,
+    "futures_get_multi_assets_mode": 30,
+    "futures_symbol_config": 5,
+    "futures_account_config": 5,
+    "futures_change_leverage": 1,
+    "futures_change_margin_type": 1,
+    "futures_get_order": 1,
+    "futures_cancel_order": 1,
+    "futures_cancel_orders": 1,
+    "futures_cancel_all_open_orders": 1,
+    "futures_place_batch_order": 5,
+    "futures_create_order": 0,  # 주문은 IP weight 0, 주문 수 한도만 차감
+    "futures_stream_get_listen_key": 1,
+    "futures_stream_keepalive": 1,
+    "futures_stream_close": 1,
+}
+
+# 주문 수 한도(X-MBX-ORDER-COUNT-*)를 차감하는 엔드포인트
+_ORDER_ENDPOINTS = {"futures_create_order", "futures_place_batch_order"}
+
+# 주문 경로: 예약분(RATE_LIMIT_RESERVE)까지 쓸 수 있는 우선순위 호출
+_PRIORITY_ENDPOINTS = _ORDER_ENDPOINTS | {
+    "futures_cancel_order",
+    "futures_cancel_orders",
+    "futures_cancel_all_open_orders",
+    "futures_change_leverage",
+}
+
+
+def endpoint_weight(name: str, kwargs: dict) -> int:
+    """심볼 유무에 따라 달라지는 엔드포인트 weight"""
+    if name == "futures_mark_price":
+        return 1 if kwargs.get("symbol") else 10
+    if name == "futures_get_open_orders":
+        return 1 if kwargs.get("symbol") else 40
+    if name == "futures_place_batch_order":
+        return 5
+    return _WEIGHTS.get(name, 1)
+
+
+def order_count(name: str, kwargs: dict) -> int:
+    if name == "futures_create_order":
+        return 1
+    if name == "futures_place_batch_order":
+        orders = kwargs.get("batchOrders") or []
+        return max(len(orders), 1)
+    return 0
+
+
+class TokenBucket:
+    """window초 동안 capacity만큼 쓰는 토큰 버킷 (락은 RateLimiter가 잡음)"""
+
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float, now: float) -> float:
+        """amount를 꺼내려면 기다려야 할 시간 (0이면 바로 가능). reserve만큼은 남겨 둠"""
+        self._refill(now)
+        need = amount + reserve - self.tokens
+        return 0.0 if need <= 0 else need / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+    def sync_used(self, used: int) -> None:
+        """서버가 알려준 실제 사용량으로 보정 (다른 프로세스/IP 공유분 포함)"""
+        self.tokens = min(self.tokens, float(self.capacity - used))
+
+
+class RateLimiter:
+    """
+    요청 weight / 주문 수 토큰 버킷.
+    - 정보성 호출은 한도의 RATE_LIMIT_RESERVE 비율을 남겨 두고, 주문 경로는 전부 사용
+    - 한도 초과 시 실패 대신 대기(큐잉)
+    - 응답 헤더(X-MBX-USED-WEIGHT-1M, X-MBX-ORDER-COUNT-*)로 자기 보정
+    - 엔드포인트별 호출 수/weight 누적
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._weight = TokenBucket(RATE_LIMIT_WEIGHT_1M, 60.0)
+        self._orders_1m = TokenBucket(RATE_LIMIT_ORDERS_1M, 60.0)
+        self._orders_10s = TokenBucket(RATE_LIMIT_ORDERS_10S, 10.0)
+        self._reserve = RATE_LIMIT_WEIGHT_1M * RATE_LIMIT_RESERVE
+        self._paused_until = 0.0
+
+        self._endpoints: dict[str, dict] = {}
+        self._used_weight_1m = 0
+        self._order_count_1m = 0
+        self._waited_s = 0.0
+        self._throttled = 0
+        self._header_skips = 0
+
+    def _wait_time(self, name: str, weight: int, orders: int) -> float:
+        now = time.monotonic()
+        reserve = 0.0 if name in _PRIORITY_ENDPOINTS else self._reserve
+        wait = max(
+            self._paused_until - now,
+            self._weight.wait_time(weight, reserve, now),
+            self._orders_1m.wait_time(orders, 0.0, now) if orders else 0.0,
+            self._orders_10s.wait_time(orders, 0.0, now) if orders else 0.0,
+        )
+        if wait <= 0:
+            self._weight.take(weight)
+            if orders:
+                self._orders_1m.take(orders)
+                self._orders_10s.take(orders)
+        return wait
+
+    def reserve(self, name: str, kwargs: dict) -> float:
+        """토큰을 잡거나, 잡을 수 없으면 기다릴 시간을 반환"""
+        weight = endpoint_weight(name, kwargs)
+        orders = order_count(name, kwargs)
+        with self._lock:
+            wait = self._wait_time(name, weight, orders)
+            if wait <= 0:
+                ep = self._endpoints.setdefault(name, {"calls": 0, "weight": 0, "orders": 0})
+                ep["calls"] += 1
+                ep["weight"] += weight
+                ep["orders"] += orders
+            else:
+                self._throttled += 1
+            return wait
+
+    def acquire(self, name: str, kwargs: dict) -> None:
+        while True:
+            wait = self.reserve(name, kwargs)
+            if wait <= 0:
+                return
+            with self._lock:
+                self._waited_s += wait
+            time.sleep(min(wait, 1.0))
+
+    async def acquire_async(self, name: str, kwargs: dict) -> None:
+        while True:
+            wait = self.reserve(name, kwargs)
+            if wait <= 0:
+                return
+            with self._lock:
+                self._waited_s += wait
+            await asyncio.sleep(min(wait, 1.0))
+
+    def update_from_headers(self, headers) -> None:
+        if not headers:
+            return
+        used = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("x-mbx-used-weight-1m")
+        orders_1m = headers.get("X-MBX-ORDER-COUNT-1M") or headers.get("x-mbx-order-count-1m")
+        orders_10s = headers.get("X-MBX-ORDER-COUNT-10S") or headers.get("x-mbx-order-count-10s")
+        with self._lock:
+            if used is not None:
+                self._used_weight_1m = int(used)
+                self._weight.sync_used(int(used))
+            if orders_1m is not None:
+                self._order_count_1m = int(orders_1m)
+                self._orders_1m.sync_used(int(orders_1m))
+            if orders_10s is not None:
+                self._orders_10s.sync_used(int(orders_10s))
+
+    def skip_headers(self) -> None:
+        """이 호출의 응답을 알 수 없어 헤더 보정을 건너뜀"""
+        with self._lock:
+            self._header_skips += 1
+
+    def pause(self, seconds: float) -> None:
+        """429/418 수신 시 모든 호출 일시 정지"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning("[RateLimit] Paused all requests for %.1fs", seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "used_weight_1m": self._used_weight_1m,
+                "order_count_1m": self._order_count_1m,
+                "weight_tokens": round(self._weight.tokens, 1),
+                "throttled": self._throttled,
+                "waited_s": round(self._waited_s, 3),
+                "header_skips": self._header_skips,
+                "endpoints": {k: dict(v) for k, v in self._endpoints.items()},
+            }
+
+
+rate_limiter = RateLimiter()
+
+# 비동기 호출의 응답: aiohttp trace가 요청을 보낸 태스크의 컨텍스트에 넣어 둠
+_async_response: contextvars.ContextVar = contextvars.ContextVar("binance_async_response", default=None)
+
+
+async def capture_async_response(session, ctx, params) -> None:
+    """aiohttp TraceConfig.on_request_end 콜백 (AsyncClient 세션에 등록)"""
+    _async_response.set(params.response)
+
+
+def _retry_after(e: BinanceAPIException) -> float:
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 0)) or 1.0
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class RateLimitedClient:
+    """
+    동기 python-binance Client 프록시.
+    futures_* 호출마다 weight를 잡고, 응답 헤더로 한도 보정, 429면 대기 후 재시도.
+    (METRICS_ENABLED면 호출별 지연을 exchange_call_seconds로 기록, 한도 대기 시간은 제외)
+
+    헤더는 그 호출 자신의 응답에서만 읽음 (client.response는 모든 스레드가 공유 → 동시 호출이면 남의 응답):
+    - requests 세션이 있으면 response hook으로 스레드별 응답을 잡아 둠
+    - 세션이 없는 Client(인프로세스 가짜 거래소)는 호출 도중 다른 호출이 없었을 때만 client.response를 읽고,
+      겹쳤으면 보정을 건너뜀 (RateLimiter.stats()의 header_skips)
+    """
+
+    def __init__(self, client, limiter: RateLimiter = rate_limiter):
+        self._client = client
+        self._limiter = limiter
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._seq = 0
+
+        session = getattr(client, "session", None)
+        hooks = getattr(session, "hooks", None)
+        self._hooked = isinstance(hooks, dict)
+        if self._hooked:
+            hooks.setdefault("response", []).append(self._capture)
+
+    def _capture(self, response, *args, **kwargs):
+        # requests response hook: 요청을 보낸 스레드에서 불림
+        self._local.response = response
+        return response
+
+    def _begin(self) -> int | None:
+        """호출 시작. 다른 호출이 진행 중이 아니면 시작 순번, 겹치면 None"""
+        self._local.response = None
+        with self._lock:
+            self._in_flight += 1
+            self._seq += 1
+            return self._seq if self._in_flight == 1 else None
+
+    def _end(self, seq: int | None, error: BinanceAPIException | None):
+        """이 호출의 응답 (모르면 None)"""
+        with self._lock:
+            # 시작부터 끝까지 혼자였을 때만 공유 client.response가 이 호출의 것
+            alone = seq is not None and self._seq == seq
+            self._in_flight -= 1
+            if error is not None and getattr(error, "response", None) is not None:
+                return error.response
+            if self._hooked:
+                return self._local.response
+            if alone:
+                return getattr(self._client, "response", None)
+        self._limiter.skip_headers()
+        return None
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not name.startswith("futures_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            for attempt in range(RATE_LIMIT_MAX_RETRY + 1):
+                self._limiter.acquire(name, kwargs)
+                started = time.perf_counter()
+                seq = self._begin()
+                error = None
+                try:
+                    result = attr(*args, **kwargs)
+                except BinanceAPIException as e:
+                    error = e
+                    if e.status_code in (418, 429):
+                        self._limiter.pause(_retry_after(e))
+                        if e.status_code == 429 and attempt < RATE_LIMIT_MAX_RETRY:
+                            continue
+                    raise
+                finally:
+                    if METRICS_ENABLED:
+                        observe_exchange_call(name, time.perf_counter() - started)
+                    response = self._end(seq, error)
+                    self._limiter.update_from_headers(getattr(response, "headers", None))
+                return result
+
+        return call
+
+
+class AsyncRateLimitedClient:
+    """
+    AsyncClient용 프록시 (대기는 asyncio.sleep).
+    헤더는 capture_async_response가 이 호출의 태스크 컨텍스트에 잡아 둔 응답에서 읽음.
+    """
+
+    def __init__(self, client, limiter: RateLimiter = rate_limiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not name.startswith("futures_") or not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            for attempt in range(RATE_LIMIT_MAX_RETRY + 1):
+                await self._limiter.acquire_async(name, kwargs)
+                started = time.perf_counter()
+                token = _async_response.set(None)
+                response = None
+                try:
+                    result = await attr(*args, **kwargs)
+                    response = _async_response.get()
+                except BinanceAPIException as e:
+                    response = getattr(e, "response", None)
+                    if e.status_code in (418, 429):
+                        self._limiter.pause(_retry_after(e))
+                        if e.status_code == 429 and attempt < RATE_LIMIT_MAX_RETRY:
+                            continue
+                    raise
+                finally:
+                    if METRICS_ENABLED:
+                        observe_exchange_call(name, time.perf_counter() - started)
+                    _async_response.reset(token)
+                    if response is None:
+                        self._limiter.skip_headers()
+                    else:
+                        self._limiter.update_from_headers(getattr(response, "headers", None))
+                return result
+
+        return call
@@ -0,0 +1,134 @@
+# app/clients/user_stream.py
+
+import asyncio
+import logging
+
+from app.clients.binance_client import get_binance_client
+from app.clients.ws import StreamThread, WsReconnect
+from app.config import USER_STREAM_URL, USER_STREAM_KEEPALIVE
+from app.services.position_cache import position_cache, PositionCache
+from app.services.open_orders import open_order_book
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class UserDataStream(StreamThread):
+    """
+    Binance Futures User Data Stream.
+
+    - listenKey 발급 → {base_url}/{listenKey} 접속
+    - USER_STREAM_KEEPALIVE 주기로 keepalive (기본 30분, 만료 60분)
+    - listenKeyExpired 수신 / 연결 끊김 시 새 listenKey로 재접속(백오프)
+    - ORDER_TRADE_UPDATE / ACCOUNT_UPDATE → PositionCache 반영
+    - ORDER_TRADE_UPDATE → 미체결 주문 장부(open_order_book) 반영
+
+    client/base_url을 주입하면 로컬 가짜 WebSocket 서버로도 테스트 가능
+    (client는 futures_stream_get_listen_key / keepalive / close 만 있으면 됨)
+    """
+
+    name = "user-stream"
+
+    def __init__(
+        self,
+        client=None,
+        base_url: str = USER_STREAM_URL,
+        keepalive_interval: float = USER_STREAM_KEEPALIVE,
+        cache: PositionCache = position_cache,
+    ):
+        super().__init__()
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._keepalive_interval = keepalive_interval
+        self._cache = cache
+        self._listen_key: str | None = None
+        # 이벤트별 후속 처리 (레버리지 캐시 무효화 등)
+        self._listeners: dict[str, list] = {}
+
+    def add_listener(self, event_type: str, fn) -> None:
+        self._listeners.setdefault(event_type, []).append(fn)
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = get_binance_client()
+        return self._client
+
+    async def _url(self) -> str:
+        client = self._get_client()
+        self._listen_key = await asyncio.to_thread(client.futures_stream_get_listen_key)
+        return f"{self._base_url}/{self._listen_key}"
+
+    async def _on_open(self) -> None:
+        self._cache.set_live(True)
+        open_order_book.set_live(True)
+
+    def _on_close(self) -> None:
+        self._cache.set_live(False)
+        open_order_book.set_live(False)
+
+    def _on_message(self, msg) -> None:
+        event = msg.get("e")
+
+        if event == "ORDER_TRADE_UPDATE":
+            self._cache.apply_order_update(msg)
+            open_order_book.apply_order_update(msg)
+        elif event == "ACCOUNT_UPDATE":
+            self._cache.apply_account_update(msg)
+        elif event == "listenKeyExpired":
+            raise WsReconnect("listenKey expired")
+
+        for fn in self._listeners.get(event, ()):
+            try:
+                fn(msg)
+            except Exception as e:
+                logger.warning("[UserStream] listener for %s failed: %s", event, e)
+
+    async def _background(self) -> None:
+        # listenKey keepalive 루프
+        while True:
+            await asyncio.sleep(self._keepalive_interval)
+            if not self._listen_key:
+                continue
+            try:
+                await asyncio.to_thread(
+                    self._get_client().futures_stream_keepalive, self._listen_key
+                )
+                logger.info("[UserStream] listenKey keepalive ok")
+            except Exception as e:
+                logger.warning("[UserStream] keepalive failed, forcing reconnect: %s", e)
+                self._listen_key = None
+                await self._close_current()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        super().stop(timeout)
+        if self._listen_key:
+            try:
+                self._get_client().futures_stream_close(listenKey=self._listen_key)
+            except Exception as e:
+                logger.warning("[UserStream] listenKey close failed: %s", e)
+            self._listen_key = None
+        self._cache.set_live(False)
+
+
+# 싱글톤 스트림
+_user_stream: UserDataStream | None = None
+
+
+def get_user_stream() -> UserDataStream | None:
+    return _user_stream
+
+
+def start_user_stream(**kwargs) -> UserDataStream:
+    global _user_stream
+    if _user_stream is None:
+        _user_stream = UserDataStream(**kwargs)
+    _user_stream.start()
+    logger.info("User data stream started.")
+    return _user_stream
+
+
+def stop_user_stream() -> None:
+    global _user_stream
+    if _user_stream is not None:
+        _user_stream.stop()
+        _user_stream = None
@@ -0,0 +1,162 @@
+# app/clients/ws.py
+
+import abc
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+
+import websockets
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class WsReconnect(Exception):
+    """메시지 핸들러에서 발생시키면 현재 연결을 끊고 재접속"""
+
+
+class StreamThread(abc.ABC):
+    """
+    전용 스레드 + asyncio 루프에서 WebSocket 스트림을 계속 유지하는 베이스 클래스.
+
+    - 연결 끊김/예외 시 지수 백오프(+지터)로 재접속
+    - 서브클래스 구현:
+        async _url()            : 접속 URL (listenKey 발급 등 포함)
+        _on_message(msg: dict)  : 파싱된 메시지 처리 (WsReconnect로 재접속 요청 가능)
+        async _on_open()        : (선택) 접속 직후
+        _on_close()             : (선택) 연결 종료 직후
+        async _background()     : (선택) 연결과 무관하게 도는 작업 (keepalive 등)
+    """
+
+    name = "ws"
+
+    def __init__(self, backoff_min: float = 1.0, backoff_max: float = 60.0):
+        self._backoff_min = backoff_min
+        self._backoff_max = backoff_max
+
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._started = threading.Event()
+        self._ws = None
+
+        self.connected = False
+        self.connects = 0
+        self.messages = 0
+        self.last_message_at = 0.0
+
+    # ── 서브클래스 훅 ─────────────────────────────────
+    @abc.abstractmethod
+    async def _url(self) -> str:
+        """접속 URL"""
+
+    @abc.abstractmethod
+    def _on_message(self, msg) -> None:
+        """파싱된 메시지 1건 처리"""
+
+    async def _on_open(self) -> None:
+        return None
+
+    def _on_close(self) -> None:
+        return None
+
+    async def _background(self) -> None:
+        return None
+
+    # ── 수명주기 ─────────────────────────────────────
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._started.clear()
+        self._thread = threading.Thread(target=self._thread_main, name=self.name, daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._loop is None or self._stop is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    async def _close_current(self) -> None:
+        """현재 연결만 닫음 → _run_forever가 즉시 재접속"""
+        if self._ws is not None:
+            await self._ws.close()
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "messages": self.messages,
+            "last_message_age_s": round(time.time() - self.last_message_at, 3) if self.last_message_at else None,
+        }
+
+    def _thread_main(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._stop = asyncio.Event()
+        self._started.set()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self) -> None:
+        runner = asyncio.create_task(self._run_forever())
+        background = asyncio.create_task(self._background())
+        await self._stop.wait()
+
+        for task in (runner, background):
+            task.cancel()
+        await asyncio.gather(runner, background, return_exceptions=True)
+
+    async def _run_forever(self) -> None:
+        backoff = self._backoff_min
+        while not self._stop.is_set():
+            try:
+                url = await self._url()
+                async with websockets.connect(
+                    url,
+                    ping_interval=20,
+                    ping_timeout=20,
+                    open_timeout=10,
+                    max_size=None,
+                ) as ws:
+                    self._ws = ws
+                    self.connected = True
+                    self.connects += 1
+                    backoff = self._backoff_min
+                    logger.info("[%s] connected", self.name)
+                    await self._on_open()
+
+                    async for raw in ws:
+                        self.messages += 1
+                        self.last_message_at = time.time()
+                        self._on_message(json.loads(raw))
+
+            except asyncio.CancelledError:
+                raise
+            except WsReconnect as e:
+                logger.info("[%s] reconnect requested: %s", self.name, e)
+                backoff = self._backoff_min
+            except Exception as e:
+                logger.warning("[%s] stream error: %s", self.name, e)
+            finally:
+                self._ws = None
+                if self.connected:
+                    self.connected = False
+                    self._on_close()
+
+            if self._stop.is_set():
+                break
+
+            delay = backoff * (1.0 + random.random() * 0.2)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, self._backoff_max)
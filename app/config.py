@@ -30,4 +30,148 @@ MAX_WAIT       = int(os.getenv("MAX_WAIT", "15"))
 # ── 거래 수수료(기본 0.04%) ──────────────────────────
 # 선물 taker fee 기준 0.04% = 0.0004
 # 레버리지 5배 → 한쪽 0.2% (= 0.0004 * 5)
-FEE_RATE       = float(os.getenv("FEE_RATE", "0.0004"))
\ No newline at end of file
+FEE_RATE       = float(os.getenv("FEE_RATE", "0.0004"))
+
+# ── 주문 실행 레이어 ─────────────────────────────────
+# 주문 처리 워커 스레드 수 (서로 다른 심볼은 병렬 실행)
+EXEC_MAX_WORKERS = int(os.getenv("EXEC_MAX_WORKERS", "8"))
+# 전체 대기 작업 상한 (초과 시 웹훅에 503 응답)
+EXEC_MAX_PENDING = int(os.getenv("EXEC_MAX_PENDING", "256"))
+# 완료된 작업 결과를 보관할 개수 (/jobs/{job_id} 조회용)
+EXEC_RESULT_KEEP = int(os.getenv("EXEC_RESULT_KEEP", "1000"))
+
+
+# ── 심볼 규칙(exchange_info) 캐시 ────────────────────
+# 백그라운드 갱신 주기 (초)
+SYMBOL_RULES_TTL = int(os.getenv("SYMBOL_RULES_TTL", "3600"))
+# 모르는 심볼 요청 시, 마지막 적재가 이 시간(초) 안이면 다시 받지 않고 바로 거부
+SYMBOL_RULES_MISS_TTL = float(os.getenv("SYMBOL_RULES_MISS_TTL", "60"))
+
+
+# ── User Data Stream (포지션/체결 이벤트) ─────────────
+# true면 listenKey WebSocket으로 청산 확인 (폴링은 fallback)
+USER_STREAM_ENABLED   = os.getenv("USER_STREAM_ENABLED", "false").lower() == "true"
+USER_STREAM_URL       = os.getenv("USER_STREAM_URL", "wss://fstream.binance.com/ws")
+# listenKey keepalive 주기 (초, 만료 60분)
+USER_STREAM_KEEPALIVE = float(os.getenv("USER_STREAM_KEEPALIVE", "1800"))
+
+# ── 마크가격 스트림 ───────────────────────────────────
+# true면 markPrice WebSocket으로 사이징용 마크가격 캐시 (REST는 fallback)
+MARK_PRICE_STREAM_ENABLED = os.getenv("MARK_PRICE_STREAM_ENABLED", "false").lower() == "true"
+MARK_PRICE_STREAM_URL     = os.getenv("MARK_PRICE_STREAM_URL", "wss://fstream.binance.com/ws")
+# 구독할 심볼 (쉼표 구분, 비우면 전 종목 !markPrice@arr@1s)
+MARK_PRICE_SYMBOLS        = [s.strip().upper() for s in os.getenv("MARK_PRICE_SYMBOLS", "").split(",") if s.strip()]
+# 캐시 값을 믿는 최대 시간 (초, 넘으면 REST 조회)
+MARK_PRICE_MAX_AGE        = float(os.getenv("MARK_PRICE_MAX_AGE", "3"))
+
+# 체결 수수료(ORDER_TRADE_UPDATE) 이벤트를 기다릴 최대 시간 (초)
+# 0이면 기다리지 않고 FEE_RATE 추정치로 기록 → 이벤트가 도착하면 실제 수수료로 보정
+FILL_COMMISSION_WAIT = float(os.getenv("FILL_COMMISSION_WAIT", "0"))
+
+
+# ── 상태 영속화 ─────────────────────────────────────
+# SQLite 파일 경로 (비우면 메모리에만 보관)
+STATE_DB_PATH        = os.getenv("STATE_DB_PATH", "")
+# 저널 배치 커밋 주기 (초)
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL", "0.2"))
+# 저널 몇 건마다 스냅샷으로 압축할지
+STATE_SNAPSHOT_EVERY = int(os.getenv("STATE_SNAPSHOT_EVERY", "1000"))
+
+
+# ── 거래 원장 (청산 기록) ───────────────────────────
+# SQLite 파일 경로 (비우면 원장 기록/조회 비활성, 일일 리포트는 상태 캐시 기준)
+LEDGER_DB_PATH        = os.getenv("LEDGER_DB_PATH", "")
+# 원장 배치 커밋 주기 (초)
+LEDGER_FLUSH_INTERVAL = float(os.getenv("LEDGER_FLUSH_INTERVAL", "0.2"))
+# /ledger/trades 한 페이지 최대 행 수
+LEDGER_PAGE_MAX       = int(os.getenv("LEDGER_PAGE_MAX", "1000"))
+
+
+# ── HTTP 커넥션 (Binance REST) ──────────────────────
+# 커넥션 풀 크기 (동기 requests 풀 / aiohttp 커넥터 공통)
+HTTP_POOL_SIZE       = int(os.getenv("HTTP_POOL_SIZE", "32"))
+# 호스트당 동시 연결 수 (aiohttp)
+HTTP_POOL_PER_HOST   = int(os.getenv("HTTP_POOL_PER_HOST", "16"))
+# 요청 전체 타임아웃 / 연결 타임아웃 (초)
+HTTP_TIMEOUT         = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+# keep-alive 유지 시간 / DNS 캐시 TTL (초)
+HTTP_KEEPALIVE       = float(os.getenv("HTTP_KEEPALIVE", "60"))
+HTTP_DNS_TTL         = int(os.getenv("HTTP_DNS_TTL", "300"))
+
+
+# ── 요청 weight 제한 (클라이언트 측) ─────────────────
+# Binance Futures 기본 한도: IP weight 2400/분, 주문 1200/분, 300/10초
+RATE_LIMIT_WEIGHT_1M  = int(os.getenv("RATE_LIMIT_WEIGHT_1M", "2400"))
+RATE_LIMIT_ORDERS_1M  = int(os.getenv("RATE_LIMIT_ORDERS_1M", "1200"))
+RATE_LIMIT_ORDERS_10S = int(os.getenv("RATE_LIMIT_ORDERS_10S", "300"))
+# 정보성 호출이 손대지 못하게 주문 경로용으로 남겨둘 weight 비율
+RATE_LIMIT_RESERVE    = float(os.getenv("RATE_LIMIT_RESERVE", "0.2"))
+# 429 응답 시 대기 후 재시도 횟수
+RATE_LIMIT_MAX_RETRY  = int(os.getenv("RATE_LIMIT_MAX_RETRY", "3"))
+
+
+# ── 계정 설정 캐시 ──────────────────────────────────
+# 거래소 확인 레버리지/마진타입 캐시 유효시간 (초)
+LEVERAGE_CACHE_TTL = float(os.getenv("LEVERAGE_CACHE_TTL", "3600"))
+# 계정 설정(포지션 모드/멀티에셋) 백그라운드 재확인 주기 (초)
+ACCOUNT_CONFIG_TTL = float(os.getenv("ACCOUNT_CONFIG_TTL", "900"))
+
+
+# ── 웹훅 수신 (중복 제거 / 병합) ─────────────────────
+# 같은 profile+symbol+action 알림을 중복으로 볼 시간 창 (초)
+INGEST_DEDUP_WINDOW = float(os.getenv("INGEST_DEDUP_WINDOW", "3"))
+# 중복 판별 캐시 최대 크기
+INGEST_DEDUP_SIZE   = int(os.getenv("INGEST_DEDUP_SIZE", "10000"))
+# true면 아직 시작 전인 같은 profile의 같은 방향 one-way 진입(BUY/SELL)을 최신 알림으로 대체
+# (*_STOP / hedge 프로필 / 다른 방향 알림은 대체하지 않음)
+INGEST_COALESCE     = os.getenv("INGEST_COALESCE", "false").lower() == "true"
+
+
+# ── 거래소 백엔드 (로컬 시뮬레이터) ──────────────────
+# live: 실거래 Binance / fake: 프로세스 내 가짜 거래소 / fake_http: 가짜 거래소 HTTP 서버
+EXCHANGE_BACKEND  = os.getenv("EXCHANGE_BACKEND", "live").lower()
+# fake_http일 때 가짜 거래소 주소 (예: http://127.0.0.1:9100)
+FAKE_EXCHANGE_URL = os.getenv("FAKE_EXCHANGE_URL", "http://127.0.0.1:9100")
+
+
+# ── 메트릭 ──────────────────────────────────────────
+# false면 타이밍 span/데코레이터가 전부 no-op (/metrics는 빈 응답)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+
+# ── 포지션 반전 방식 ─────────────────────────────────
+# sequential: 청산 → 체결 확인 → 진입 (기존)
+# batch     : batchOrders 1회로 청산 + 반대 진입 동시 전송
+# net       : One-way 모드에서 |현재수량|+진입수량 단일 주문 (Hedge 모드면 batch)
+REVERSAL_MODE = os.getenv("REVERSAL_MODE", "sequential").lower()
+
+
+# ── 기동 준비(warmup) ────────────────────────────────
+# 미리 맺어둘 keep-alive 연결 수 (기본: 워커 수와 풀 크기 중 작은 값)
+WARMUP_CONNECTIONS    = int(os.getenv("WARMUP_CONNECTIONS", str(min(EXEC_MAX_WORKERS, HTTP_POOL_SIZE))))
+# 필수 단계 실패 시 재시도 간격 (초)
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "10"))
+
+
+# ── 심볼 락 / 상태 전이 ───────────────────────────────
+# 락 키 (account, symbol)의 account: 같은 Binance 계정을 쓰는 profile은 같은 포지션을 공유
+EXCHANGE_ACCOUNT  = os.getenv("EXCHANGE_ACCOUNT", "main")
+# 상태 전이가 (account, symbol) 락을 기다리는 최대 시간 (초, 초과 시 LockTimeout)
+LOCK_TIMEOUT      = float(os.getenv("LOCK_TIMEOUT", "10"))
+# 상태 compare-and-set 충돌 시 재시도 횟수
+STATE_CAS_RETRIES = int(os.getenv("STATE_CAS_RETRIES", "3"))
+
+
+# ── 로깅 ────────────────────────────────────────────
+# 루트 로그 레벨 (이 레벨 미만 호출은 포맷/큐 적재 없이 바로 버림)
+LOG_LEVEL          = os.getenv("LOG_LEVEL", "INFO").upper()
+# 콘솔(stderr) 사람이 읽는 형식 출력 여부
+LOG_CONSOLE        = os.getenv("LOG_CONSOLE", "true").lower() == "true"
+# JSON Lines 이벤트 로그 파일 경로 (비우면 파일 출력 안 함)
+LOG_JSON_PATH      = os.getenv("LOG_JSON_PATH", "")
+# 로그 큐 최대 길이 (가득 차면 요청 스레드를 막지 않고 버림 → /logging dropped)
+LOG_QUEUE_SIZE     = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 파일에 한 번에 쓰는 줄 수 / 덜 찼어도 기록하는 주기 (초)
+LOG_BATCH_SIZE     = int(os.getenv("LOG_BATCH_SIZE", "100"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
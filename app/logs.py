@@ -0,0 +1,220 @@
+# app/logs.py
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+
+from app.config import (
+    LOG_LEVEL, LOG_CONSOLE, LOG_JSON_PATH, LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL,
+)
+
+# 호출 스레드에서 문자열로 고정하지 않아도 되는(불변) 인자 타입
+_IMMUTABLE = (str, int, float, bool, type(None), BaseException)
+
+_CONSOLE_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields) -> None:
+    """
+    구조화 이벤트 (order / fill / pnl / state ...).
+    - 레벨이 꺼져 있으면 아무 것도 만들지 않음
+    - fields는 스칼라 값만 (JSON 파일에는 data로, 콘솔에는 key=value로 출력)
+    """
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, "[%s]", event, extra={"event": event, "fields": fields})
+
+
+class _AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    요청/워커 스레드 쪽 핸들러: 레코드를 큐에 넣기만 함.
+    - 메시지 %-포맷, traceback 문자열화는 listener 스레드에서
+      (단, 가변 객체 인자는 나중에 값이 바뀔 수 있으므로 여기서 문자열로 고정)
+    - 큐가 가득 차면 기다리지 않고 버림 (dropped 카운트)
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자 하나가 dict면 LogRecord가 args 자체를 그 dict로 바꿔 두므로(가변) 여기서 포맷
+        args = record.args
+        if not isinstance(record.msg, str) or isinstance(args, dict) or (
+            args and not all(isinstance(v, _IMMUTABLE) for v in args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BatchingListener(logging.handlers.QueueListener):
+    """큐가 LOG_FLUSH_INTERVAL 동안 비어 있으면 핸들러 버퍼를 flush"""
+
+    def __init__(self, q: queue.Queue, *handlers, flush_interval: float):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self._flush_interval = flush_interval
+
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self._flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class JsonFormatter(logging.Formatter):
+    """한 레코드 = JSON 한 줄 (ts, level, logger, thread, msg, event/data, exc)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+        }
+        event = getattr(record, "event", None)
+        if event is not None:
+            out["event"] = event
+            out["data"] = record.fields
+        else:
+            out["msg"] = record.getMessage()
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """기본 한 줄 형식 + 이벤트 필드는 key=value로 덧붙임"""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class BatchFileHandler(logging.Handler):
+    """
+    listener 스레드 전용 JSON Lines 파일 핸들러.
+    포맷된 줄을 모아 LOG_BATCH_SIZE마다(또는 큐가 비면) 한 번의 write로 기록.
+    """
+
+    def __init__(self, path: str, batch_size: int = LOG_BATCH_SIZE):
+        super().__init__()
+        self._path = path
+        self._batch_size = batch_size
+        self._buffer: list[str] = []
+        self._stream = None
+        self.written = 0
+        self.batches = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self._buffer:
+                return
+            try:
+                if self._stream is None:
+                    self._stream = open(self._path, "a", encoding="utf-8")
+                self._stream.write("\n".join(self._buffer) + "\n")
+                self._stream.flush()
+            except OSError as e:
+                # 디스크 오류로 주문 경로가 멈추지 않도록 이번 배치는 버림
+                logging.getLogger(__name__).debug("log batch write failed: %s", e)
+            else:
+                self.written += len(self._buffer)
+                self.batches += 1
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        with self.lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        super().close()
+
+
+class LogPipeline:
+    """
+    루트 로거 → QueueHandler → (listener 스레드) → 콘솔 / JSON 파일.
+    로그 호출이 하는 일은 레벨 검사 + 큐 적재뿐이라 주문 지연에 영향이 없음.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: queue.Queue | None = None
+        self._handler: _AsyncQueueHandler | None = None
+        self._listener: _BatchingListener | None = None
+        self._file: BatchFileHandler | None = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is not None:
+                return
+
+            handlers: list[logging.Handler] = []
+            if LOG_CONSOLE:
+                console = logging.StreamHandler()
+                console.setFormatter(ConsoleFormatter(_CONSOLE_FORMAT))
+                handlers.append(console)
+            if LOG_JSON_PATH:
+                self._file = BatchFileHandler(LOG_JSON_PATH)
+                self._file.setFormatter(JsonFormatter())
+                handlers.append(self._file)
+
+            self._queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            self._handler = _AsyncQueueHandler(self._queue)
+            self._listener = _BatchingListener(self._queue, *handlers, flush_interval=LOG_FLUSH_INTERVAL)
+
+            root = logging.getLogger()
+            root.setLevel(LOG_LEVEL)
+            root.addHandler(self._handler)
+            self._listener.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """큐에 남은 레코드를 모두 기록한 뒤 listener 종료"""
+        with self._lock:
+            if self._listener is None:
+                return
+            logging.getLogger().removeHandler(self._handler)
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._listener is not None,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "dropped": self._handler.dropped if self._handler is not None else 0,
+            "written": self._file.written if self._file is not None else 0,
+            "batches": self._file.batches if self._file is not None else 0,
+        }
+
+
+log_pipeline = LogPipeline()
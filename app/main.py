@@ -1,19 +1,49 @@
 # app/main.py
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, JSONResponse
 from app.routers.webhook import router as webhook_router
 #from app.routers.dashboard import router as dashboard_router
-from app.routers.report import router as report_router, report
+from app.routers.report import router as report_router
+from app.routers.ledger import router as ledger_router
+from app.services.executor import get_executor
+from app.services.symbol_rules import refresh_symbol_rules
+from app.services.warmup import warmup
+from app.config import LEDGER_DB_PATH, SYMBOL_RULES_TTL, ACCOUNT_CONFIG_TTL, USER_STREAM_ENABLED, MARK_PRICE_STREAM_ENABLED, MARK_PRICE_SYMBOLS
+from app.clients.user_stream import start_user_stream, stop_user_stream, get_user_stream
+from app.clients.mark_price_stream import start_mark_price_stream, stop_mark_price_stream, get_mark_price_stream
+from app.state import init_state_store, close_state_store, state_store_stats
+from app.clients.binance_client import close_async_binance_client
+from app.clients.rate_limiter import rate_limiter
+from app.services.account_config import leverage_cache, account_config
+from app.services.ingest import alert_deduper
+from app.services.open_orders import open_order_book
+from app.services.locks import lock_manager
+from app.services.report_book import report_book, period_date
+from app.metrics import render_metrics
+from app.logs import log_pipeline
+from app.trade_ledger import trade_ledger
 import threading
 import logging
 #from app.services.monitor import start_monitor
 
 # APScheduler imports
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 app = FastAPI()
+logger = logging.getLogger("main")
+
+def _log_daily_report() -> None:
+    # 09:00에 막 끝난 기준일 (원장이 있으면 그날 실현 PnL 롤업만 읽음, 없으면 상태 캐시 집계)
+    period = period_date(datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(minutes=1))
+    if trade_ledger.enabled:
+        summary = trade_ledger.summary(period)
+    else:
+        _, summary = report_book.summary(period)
+    logger.info("Daily report: %s", summary)
+
 
 @app.on_event("startup")
 def on_startup():
@@ -21,21 +51,125 @@ def on_startup():
     앱 기동 시:
     1) 모니터 스레드 안전 실행
     2) 매일 KST 09:00에 일일 리포트 실행 스케줄러 등록
+    3) warmup(백그라운드): Client 생성/포지션 모드 확인/심볼 규칙/포지션·레버리지/커넥션 예열
+       → 완료 전까지 /ready는 503, 심볼 규칙은 이후 TTL 주기 백그라운드 갱신
+    4) (USER_STREAM_ENABLED) User Data Stream 시작 → 이벤트 기반 청산 확인
+    5) (STATE_DB_PATH) 디스크 snapshot+journal에서 상태 복구
+       (LEDGER_DB_PATH) 청산 거래 원장 열기 → /ledger/*, 일일 리포트
+    6) (MARK_PRICE_STREAM_ENABLED) markPrice 스트림 → 사이징용 마크가격 캐시
     """
 
+    # 로그는 큐 → 별도 스레드에서 콘솔/JSON 파일로 (주문 경로는 큐 적재만)
+    log_pipeline.start()
+
+    init_state_store()
+    if LEDGER_DB_PATH:
+        trade_ledger.start(LEDGER_DB_PATH)
+
+    # 첫 알림 전에 Client/계정 상태 준비 (실패 단계는 첫 주문 시 평소처럼 조회됨)
+    warmup.start()
+
+    if USER_STREAM_ENABLED:
+        stream = start_user_stream()
+        # 레버리지/마진타입 변경 이벤트 → 레버리지 캐시 갱신
+        stream.add_listener("ACCOUNT_CONFIG_UPDATE", leverage_cache.on_account_config_update)
+        stream.add_listener("ACCOUNT_CONFIG_UPDATE", account_config.on_account_config_update)
+        stream.add_listener("ACCOUNT_UPDATE", leverage_cache.on_account_update)
+
+    if MARK_PRICE_STREAM_ENABLED:
+        start_mark_price_stream(symbols=MARK_PRICE_SYMBOLS)
+
     # 1) 일일 리포트 스케줄러 (Asia/Seoul 09:00)
     sched = BackgroundScheduler(timezone="Asia/Seoul")
-    # 매일 오전 09:00에 report() 호출
-    sched.add_job(lambda: report(), 'cron', hour=9, minute=0)
+    # 매일 오전 09:00에 전 profile 집계를 로그로 남김 (report()는 async 라우트라 직접 호출 불가)
+    sched.add_job(_log_daily_report, 'cron', hour=9, minute=0)
+    # 심볼 규칙 TTL 갱신
+    sched.add_job(refresh_symbol_rules, 'interval', seconds=SYMBOL_RULES_TTL)
+    # 포지션 모드는 스트림 이벤트가 없으므로 주기적으로 재확인
+    sched.add_job(account_config.refresh_background, 'interval', seconds=ACCOUNT_CONFIG_TTL)
     sched.start()
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    # 진행 중인 주문 작업은 끝까지 처리한 뒤 종료
+    warmup.stop()
+    get_executor().shutdown(wait=True)
+    stop_user_stream()
+    stop_mark_price_stream()
+    close_state_store()
+    trade_ledger.stop()
+    log_pipeline.stop()
+
+
+@app.on_event("shutdown")
+async def on_shutdown_async():
+    # aiohttp 커넥션 풀 정리
+    await close_async_binance_client()
+
+
 # 라우터 등록
 app.include_router(webhook_router)
 #app.include_router(dashboard_router)
 app.include_router(report_router)
+app.include_router(ledger_router)
 
 
 @app.get("/health")
 def health():
-    return {"status": "alive"}
\ No newline at end of file
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+def ready():
+    # 준비(warmup) 완료 여부: 로드밸런서/오케스트레이터 readiness probe 용
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus 스크레이프용: 거래소 호출 / 서비스 단계별 지연 히스토그램
+    return render_metrics()
+
+
+@app.get("/stream")
+def stream_stats():
+    stream = get_user_stream()
+    mark_stream = get_mark_price_stream()
+    return {
+        "user_stream": stream.stats() if stream else None,
+        "mark_price_stream": mark_stream.stats() if mark_stream else None,
+        "open_orders": open_order_book.stats(),
+    }
+
+
+@app.get("/executor")
+def executor_stats():
+    # 주문 실행기 대기열 깊이 / 대기·실행 지연 메트릭 + 중복 알림 제거 현황 + (account, symbol) 락 대기
+    return {**get_executor().stats(), "ingest": alert_deduper.stats(), "locks": lock_manager.stats()}
+
+
+
+@app.get("/ratelimit")
+def ratelimit_stats():
+    # 엔드포인트별 weight 소비량 / 서버 보고 사용량
+    return rate_limiter.stats()
+
+
+@app.get("/account")
+def account_stats():
+    # 캐시된 계정 설정 (포지션 모드 / 멀티에셋 / 레버리지 캐시)
+    return {**account_config.stats(), "leverage": leverage_cache.stats()}
+
+
+@app.get("/logging")
+def logging_stats():
+    # 로그 큐 깊이 / 버린 레코드 / 파일에 쓴 줄·배치 수
+    return log_pipeline.stats()
+
+
+@app.get("/storage")
+def storage_stats():
+    # 디스크 writer 상태 (state 저널 / 거래 원장): 대기 행 / 커밋 실패 / 버린 행 / 마지막 오류
+    return {"state_store": state_store_stats(), "ledger": trade_ledger.stats()}
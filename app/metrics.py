@@ -0,0 +1,155 @@
+# app/metrics.py
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from app.config import METRICS_ENABLED
+
+# 초 단위 버킷 (1ms ~ 30s)
+_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_HELP = {
+    "exchange_call_seconds": "Binance REST call latency by endpoint",
+    "stage_seconds": "Service stage latency (order path)",
+    "lock_wait_seconds": "Time spent waiting for an (account, symbol) lock",
+}
+
+
+class Histogram:
+    """Prometheus 형식 누적 히스토그램 (버킷 고정)"""
+
+    __slots__ = ("_lock", "counts", "sum", "count")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        idx = bisect_left(_BUCKETS, seconds)
+        with self._lock:
+            self.counts[idx] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    """(metric, label) → Histogram"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], Histogram] = {}
+
+    def histogram(self, metric: str, label: str, value: str) -> Histogram:
+        key = (metric, label, value)
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram())
+        return hist
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+
+        lines = []
+        current = None
+        for (metric, label, value), hist in items:
+            if metric != current:
+                current = metric
+                lines.append(f"# HELP {metric} {_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} histogram")
+            counts, total, count = hist.snapshot()
+            cumulative = 0
+            for bound, n in zip(_BUCKETS, counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{{label}="{value}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{{label}="{value}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class _Span:
+    __slots__ = ("_hist", "_started")
+
+    def __init__(self, hist: Histogram):
+        self._hist = hist
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter() - self._started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage: str):
+    """
+    with span("buy.leverage"): ...
+    METRICS_ENABLED=false면 공유 no-op 객체 반환 (할당/시계 호출 없음)
+    """
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _Span(registry.histogram("stage_seconds", "stage", stage))
+
+
+def timed(stage: str):
+    """
+    함수 전체를 stage로 측정하는 데코레이터.
+    METRICS_ENABLED=false면 원래 함수를 그대로 돌려줌 (호출 오버헤드 0)
+    """
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+        hist = registry.histogram("stage_seconds", "stage", stage)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def observe_exchange_call(endpoint: str, seconds: float) -> None:
+    registry.histogram("exchange_call_seconds", "endpoint", endpoint).observe(seconds)
+
+
+def observe_lock_wait(account: str, seconds: float) -> None:
+    if METRICS_ENABLED:
+        registry.histogram("lock_wait_seconds", "account", account).observe(seconds)
+
+
+def render_metrics() -> str:
+    return registry.render()
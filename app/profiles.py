@@ -0,0 +1,29 @@
+# app/profiles.py
+
+from dataclasses import dataclass
+
+from app.config import TRADE_LEVERAGE
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileSpec:
+    hedge: bool
+    use_initial_capital: bool
+    leverage: int | None  # None이면 알림 payload의 leverage 사용 (webhook5/6)
+
+    def job_kwargs(self) -> dict:
+        """작업 함수(switch_position / switch_position_hedge)에 넘길 고정 인자"""
+        if self.hedge:
+            return {"use_initial_capital": self.use_initial_capital}
+        return {"leverage": self.leverage, "use_initial_capital": self.use_initial_capital}
+
+
+# 웹훅 profile별 설정: 개별 웹훅 핸들러 / 배치 웹훅 / 백테스트가 모두 이 표를 읽음
+PROFILES: dict[str, ProfileSpec] = {
+    "webhook1": ProfileSpec(hedge=False, use_initial_capital=False, leverage=TRADE_LEVERAGE),  # 복리
+    "webhook2": ProfileSpec(hedge=False, use_initial_capital=True, leverage=5),    # 복리X 높은 레버리지
+    "webhook3": ProfileSpec(hedge=False, use_initial_capital=True, leverage=2),    # 복리X 낮은 레버리지
+    "webhook4": ProfileSpec(hedge=False, use_initial_capital=False, leverage=2),   # 복리 커스텀 레버리지
+    "webhook5": ProfileSpec(hedge=True, use_initial_capital=False, leverage=None),  # hedge 복리
+    "webhook6": ProfileSpec(hedge=True, use_initial_capital=True, leverage=None),   # hedge 복리X
+}
@@ -0,0 +1,70 @@
+# app/routers/ledger.py
+
+import logging
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from app.config import LEDGER_PAGE_MAX
+from app.services.report_book import period_date
+from app.trade_ledger import trade_ledger, GROUP_KEYS
+
+router = APIRouter()
+logger = logging.getLogger("ledger")
+
+
+def _require_ledger() -> None:
+    if not trade_ledger.enabled:
+        raise HTTPException(status_code=503, detail="Trade ledger disabled (set LEDGER_DB_PATH)")
+
+
+def _symbol(symbol: str | None) -> str | None:
+    return symbol.upper().replace("/", "") if symbol else None
+
+
+@router.get("/ledger", response_class=JSONResponse)
+def ledger_stats():
+    # 원장 활성 여부 / 커밋 대기 행 수 / 기록한 행 수
+    return trade_ledger.stats()
+
+
+@router.get("/ledger/pnl", response_class=JSONResponse)
+def ledger_pnl(
+    by: str = Query("period", description=f"집계 기준: {' | '.join(GROUP_KEYS)}"),
+    start: str | None = Query(None, description="시작 기준일 (YYYY-MM-DD, 포함)"),
+    end: str | None = Query(None, description="끝 기준일 (YYYY-MM-DD, 포함)"),
+    profile: str | None = Query(None, description="예: webhook1"),
+    symbol: str | None = Query(None, description="예: ETH/USDT 또는 ETHUSDT"),
+):
+    # 기간 / profile / 심볼별 실현 PnL (일별 롤업 합산)
+    _require_ledger()
+    if by not in GROUP_KEYS:
+        raise HTTPException(status_code=400, detail=f"by must be one of {GROUP_KEYS}")
+    rows = trade_ledger.pnl(by, start=start, end=end, profile=profile, symbol=_symbol(symbol))
+    return {"by": by, "start": start, "end": end, "profile": profile, "symbol": _symbol(symbol), "rows": rows}
+
+
+@router.get("/ledger/trades", response_class=JSONResponse)
+def ledger_trades(
+    profile: str | None = Query(None, description="예: webhook1"),
+    symbol: str | None = Query(None, description="예: ETH/USDT 또는 ETHUSDT"),
+    start: str | None = Query(None, description="시작 기준일 (YYYY-MM-DD, 포함)"),
+    end: str | None = Query(None, description="끝 기준일 (YYYY-MM-DD, 포함)"),
+    before_id: int | None = Query(None, description="이전 페이지 마지막 id (최신순 페이지네이션)"),
+    limit: int = Query(100, ge=1, description=f"최대 {LEDGER_PAGE_MAX}"),
+):
+    # 개별 청산 거래 (최신순)
+    _require_ledger()
+    trades = trade_ledger.trades(
+        profile=profile, symbol=_symbol(symbol), start=start, end=end,
+        before_id=before_id, limit=min(limit, LEDGER_PAGE_MAX),
+    )
+    next_before = trades[-1]["id"] if len(trades) == min(limit, LEDGER_PAGE_MAX) else None
+    return {"trades": trades, "next_before_id": next_before}
+
+
+@router.get("/ledger/summary", response_class=JSONResponse)
+def ledger_summary(
+    period: str | None = Query(None, description="기준일 (YYYY-MM-DD, 기본: 현재 기준일)"),
+):
+    # 기준일 하루의 profile별 실현 PnL + 합계 (일일 리포트와 같은 값)
+    _require_ledger()
+    return trade_ledger.summary(period or period_date())
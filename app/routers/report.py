@@ -1,101 +1,88 @@
 # app/routers/report.py
 
 import logging
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from app.state import monitor_states, get_state, list_symbols
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+from app.state import get_state, list_symbols, save_state
+from app.services.report_book import report_book, period_date, etag_matches
 
 router = APIRouter()
 logger = logging.getLogger("report")
 
 
-def _compute_period_date(now: datetime) -> str:
-    if now.hour >= 9:
-        return now.strftime("%Y-%m-%d")
-    else:
-        prev = now - timedelta(days=1)
-        return prev.strftime("%Y-%m-%d")
-
-
-def _calculate_cumulative_return(current_capital: float, initial_capital: float) -> float:
-    if initial_capital == 0:
-        return 0.0
-    return round(((current_capital / initial_capital) - 1.0) * 100, 2)
+def _etag_response(request: Request, etag: str, content=None, body: bytes | None = None) -> Response:
+    """If-None-Match가 현재 ETag와 일치하면 본문 없이 304 (대시보드 폴링용)"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers=headers)
+    return JSONResponse(content, headers=headers)
 
 
-def _build_single_report(profile: str, sym: str) -> dict:
-    state = get_state(sym, profile)
-    now = datetime.now(ZoneInfo("Asia/Seoul"))
-    period_date = _compute_period_date(now)
-
-    capital = state.get("capital", 0.0)
-    initial = state.get("initial_capital", 1.0)
-
-    return {
-        "profile": profile,
-        "symbol":           sym,
-        "period":           period_date,
-        "total_trades":     state.get("trade_count", 0),
-        "long_entries":     state.get("long_count", 0),
-        "short_entries":    state.get("short_count", 0),
-        "현재_자본($)":     round(capital, 2),
-        "복리_수익률(%)":    _calculate_cumulative_return(capital, initial),
-        "daily_pnl(%)":     round(state.get("daily_pnl", 0.0), 2),
-        "initial_capital":  round(initial, 2),
-        "last_reset":       state.get("last_reset", None),
-    }
-
 async def _report_internal(
+    request: Request,
     profile: str,
     symbol: str | None,
     all: bool,
 ):
-    symbols = list_symbols(profile)
+    # 기준일은 요청당 한 번만 계산, 행/집계는 save_state 때 갱신된 캐시 사용
+    period = period_date()
 
     if all:
-        reports = [_build_single_report(profile, sym) for sym in symbols]
-        logger.info(f"Report all symbols for {profile}: count={len(reports)}")
-        return JSONResponse({"profile": profile, "reports": reports})
+        etag, body, count = report_book.report_all(profile, period)
+        logger.info("Report all symbols for %s: count=%s", profile, count)
+        return _etag_response(request, etag, body=body)
 
     if symbol:
         sym = symbol.upper().replace("/", "")
-        if sym not in symbols:
-            raise HTTPException(status_code=404, detail=f"No data for {profile}:{sym}")
     else:
-        try:
-            sym = symbols[0]
-        except IndexError:
+        symbols = list_symbols(profile)
+        if not symbols:
             raise HTTPException(status_code=404, detail=f"No symbol data available for {profile}")
+        sym = symbols[0]
+
+    found = report_book.report(profile, sym, period)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"No data for {profile}:{sym}")
 
-    data = _build_single_report(profile, sym)
-    logger.info(f"Report [{profile}:{sym}]: {data}")
-    return JSONResponse(data)
+    etag, data = found
+    logger.info("Report [%s:%s]: %s", profile, sym, data)
+    return _etag_response(request, etag, data)
 
 
 @router.get("/report", response_class=JSONResponse)
 async def report(
+    request: Request,
     symbol: str | None = Query(None, description="조회할 심볼 (예: ETH/USDT 또는 ETHUSDT)"),
     all: bool = Query(False, description="해당 profile의 모든 심볼 리포트"),
 ):
     # 기본: webhook1용
-    return await _report_internal("webhook1", symbol, all)
+    return await _report_internal(request, "webhook1", symbol, all)
 
 @router.get("/report2", response_class=JSONResponse)
 async def report2(
+    request: Request,
     symbol: str | None = Query(None, description="조회할 심볼 (예: ETH/USDT 또는 ETHUSDT)"),
     all: bool = Query(False, description="해당 profile의 모든 심볼 리포트"),
 ):
-    return await _report_internal("webhook2", symbol, all)
+    return await _report_internal(request, "webhook2", symbol, all)
 
 
 @router.get("/report3", response_class=JSONResponse)
 async def report3(
+    request: Request,
     symbol: str | None = Query(None, description="조회할 심볼 (예: ETH/USDT 또는 ETHUSDT)"),
     all: bool = Query(False, description="해당 profile의 모든 심볼 리포트"),
 ):
-    return await _report_internal("webhook3", symbol, all)
+    return await _report_internal(request, "webhook3", symbol, all)
+
+
+@router.get("/report/summary", response_class=JSONResponse)
+async def report_summary(request: Request):
+    # 전 profile 집계 (profile별 심볼 수 / 거래 수 / 자본 합계 / 수익률 / daily_pnl)
+    etag, data = report_book.summary(period_date())
+    return _etag_response(request, etag, data)
 
 
 
@@ -104,8 +91,7 @@ def _reset_internal(profile: str, symbol: str) -> dict:
     sym = symbol.upper().replace("/", "")
     state = get_state(sym, profile)  # 없으면 생성됨
 
-    now = datetime.now(ZoneInfo("Asia/Seoul"))
-    period_date = _compute_period_date(now)
+    period = period_date()
 
     # 현재 자본을 새로운 기준 자본으로 사용
     capital_now = float(state.get("capital", 50.0))
@@ -129,19 +115,20 @@ def _reset_internal(profile: str, symbol: str) -> dict:
             "current_price": 0.0,
             "pnl": 0.0,
 
-            "last_reset": period_date,
+            "last_reset": period,
         }
     )
+    save_state(sym, profile)
 
     result = {
         "status": "reset",
         "profile": profile,
         "symbol": sym,
-        "last_reset": period_date,
+        "last_reset": period,
         "capital": capital_now,
         "initial_capital": capital_now,
     }
-    logger.info(f"Reset report state: {result}")
+    logger.info("Reset report state: %s", result)
     return result
 
 
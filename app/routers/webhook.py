@@ -1,13 +1,17 @@
+import asyncio
 import logging
-from datetime import datetime
-from zoneinfo import ZoneInfo
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from app.config import DRY_RUN
+from app.profiles import PROFILES
 from app.services.switching import switch_position
-from app.state import get_state
+from app.state import save_state
 from app.services.switching_hedge import switch_position_hedge
+from app.services.executor import get_executor, symbol_key, ExecutorFull
+from app.services.ingest import alert_deduper, coalescable
+from app.services.prefetch import MarketPrefetch
+from app.logs import log_event
 
 logger = logging.getLogger("webhook")
 router = APIRouter()
@@ -15,6 +19,7 @@ router = APIRouter()
 class AlertPayload(BaseModel):
     symbol: str   # e.g. "ETH/USDT"
     action: str   # BUY, SELL, BUY_STOP, SELL_STOP
+    alert_id: str | None = None  # (선택) 멱등 키: TradingView 재전송 중복 제거용
     
 
 PROFILE_WEBHOOK1 = "webhook1"
@@ -24,6 +29,81 @@ PROFILE_WEBHOOK4 = "webhook4"
 PROFILE_WEBHOOK5 = "webhook5"
 PROFILE_WEBHOOK6 = "webhook6"
 
+
+def _switch_job(sym: str, action: str, profile: str, **kwargs) -> dict:
+    """
+    webhook1~4 공통 작업: 워커 스레드에서 switch_position 실행 후 state 반영
+    (같은 계정·심볼을 쓰는 다른 profile 작업과는 symbol_key 대기열에서 직렬화)
+    """
+    try:
+        return _apply_switch_result(sym, action, profile, switch_position(sym, action, profile=profile, **kwargs))
+    finally:
+        save_state(sym, profile)
+
+
+def _apply_switch_result(sym: str, action: str, profile: str, res: dict) -> dict:
+
+    if "skipped" in res:
+        logger.info("Skipped %s %s (%s): %s", action, sym, profile, res['skipped'])
+        return res
+
+    # 진입/청산 상태는 서비스 쪽에서 CAS로 이미 반영됨
+    # (진입: SymbolState.record_entry, 청산: _update_capital_after_exit 정산 전이)
+    if action in ("BUY_STOP", "SELL_STOP"):
+        # ✅ exit_price / pnl 로그 찍기
+        exit_price = res.get("exit_price", 0.0)
+        pnl        = res.get("pnl", 0.0)
+        logger.info("[%s] %s:%s EXIT @ %s, PnL %.2f%%", action, profile, sym, exit_price, pnl)
+
+    return res
+
+
+def _hedge_job(sym: str, action: str, profile: str, **kwargs) -> dict:
+    """webhook5/6 공통 작업: 워커 스레드에서 switch_position_hedge 실행 (symbol_key 대기열에서 직렬화)"""
+    try:
+        return switch_position_hedge(symbol=sym, action=action, profile=profile, **kwargs)
+    finally:
+        save_state(sym, profile)
+
+
+def _profile_job(profile: str) -> tuple:
+    """profile → (작업 함수, 고정 인자). 설정은 app.profiles.PROFILES 한 곳에서만 관리"""
+    spec = PROFILES[profile]
+    return (_hedge_job if spec.hedge else _switch_job), spec.job_kwargs()
+
+
+def _enqueue(sym: str, action: str, profile: str, alert_id: str | None = None, **kwargs) -> dict:
+    """
+    HTTP 경로에서는 작업을 (account, symbol) 큐에 넣고 즉시 반환.
+    실제 주문/대기(polling)는 실행기 워커 스레드에서 처리된다.
+    - 중복 알림(alert_id 또는 profile+symbol+action+INGEST_DEDUP_WINDOW 시간 버킷)은
+      거래소 호출 없이 원래 job_id로 바로 응답 (hedge 추가진입은 alert_id가 있을 때만)
+    - INGEST_COALESCE면 같은 profile의 대기 중인 같은 방향 one-way 진입은 이번 알림으로 대체
+      (coalescable: *_STOP / hedge는 대체하지 않음)
+    """
+    hedge = PROFILES[profile].hedge
+    fingerprint = alert_deduper.fingerprint(profile, sym, action, alert_id, hedge=hedge)
+    original = alert_deduper.check(fingerprint)
+    if original is not None:
+        return {"status": "duplicate", "job_id": original}
+
+    job_fn, base_kwargs = _profile_job(profile)
+    try:
+        job = get_executor().submit(
+            symbol_key(sym), job_fn, sym, action, profile,
+            tag=(profile, action), coalesce=coalescable(action, hedge=hedge),
+            **base_kwargs, **kwargs
+        )
+    except ExecutorFull as e:
+        log_event(logger, "order", logging.WARNING, status="rejected", profile=profile, symbol=sym,
+                  action=action, reason=str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+
+    alert_deduper.remember(fingerprint, job.job_id)
+    log_event(logger, "order", status="queued", profile=profile, symbol=sym, action=action, job_id=job.job_id)
+    return {"status": "queued", "job_id": job.job_id}
+
+
 # 복리 쓰는 레버리지 설정
 @router.post("/webhook")
 async def webhook(payload: AlertPayload):
@@ -32,57 +112,10 @@ async def webhook(payload: AlertPayload):
     profile = PROFILE_WEBHOOK1
 
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym} ({profile})")
+        logger.info("[DRY_RUN] %s %s (%s)", action, sym, profile)
         return {"status": "dry_run"}
 
-    try:
-        res = switch_position(sym, action, profile=profile)
-
-        if "skipped" in res:
-            logger.info(f"Skipped {action} {sym}: {res['skipped']}")
-            return {"status": "skipped", "reason": res["skipped"]}
-
-        state = get_state(sym, profile)
-        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-        if action == "BUY":
-            info = res.get("buy", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  qty,
-                "entry_time":    now
-            })
-
-        elif action == "SELL":
-            info = res.get("sell", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  -qty,
-                "entry_time":    now
-            })
-
-        elif action in ("BUY_STOP", "SELL_STOP"):
-            # ✅ exit_price / pnl 로그 찍기
-            exit_price = res.get("exit_price", 0.0)
-            pnl        = res.get("pnl", 0.0)
-
-            state.update({
-                "entry_price":   0.0,
-                "position_qty":  0.0,
-                "entry_time":    now
-            })
-
-            logger.info(f"[{action}] {profile}:{sym} EXIT @ {exit_price}, PnL {pnl:.2f}%")
-
-    except Exception as e:
-        logger.exception(f"Error processing {action} for {sym} ({profile})")
-        raise HTTPException(status_code=500, detail=str(e))
-
-    return {"status": "ok", "result": res}
+    return _enqueue(sym, action, profile, alert_id=payload.alert_id)
 
 
 # ✅ webhook2는 동일 (단, 필요 시 같은 방식으로 STOP 로그 추가 가능) -> 복리 안쓰는 높은 레버리지
@@ -92,66 +125,12 @@ async def webhook2(payload: AlertPayload):
     action = payload.action.upper()
     profile = PROFILE_WEBHOOK2
 
-    # 👉 원하는 커스텀 레버리지 설정
-    custom_leverage = 5
-
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym} ({profile})")
+        logger.info("[DRY_RUN] %s %s (%s)", action, sym, profile)
         return {"status": "dry_run"}
 
-    try:
-        res = switch_position(
-            sym,
-            action,
-            profile=profile,
-            leverage=custom_leverage,
-            use_initial_capital=True
-        )
-
-        if "skipped" in res:
-            logger.info(f"Skipped {action} {sym} ({profile}): {res['skipped']}")
-            return {"status": "skipped", "reason": res["skipped"]}
-
-        state = get_state(sym, profile)
-        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-        if action == "BUY":
-            info = res.get("buy", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  qty,
-                "entry_time":    now
-            })
-
-        elif action == "SELL":
-            info = res.get("sell", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  -qty,
-                "entry_time":    now
-            })
-
-        elif action in ("BUY_STOP", "SELL_STOP"):
-            exit_price = res.get("exit_price", 0.0)
-            pnl        = res.get("pnl", 0.0)
-
-            state.update({
-                "entry_price":   0.0,
-                "position_qty":  0.0,
-                "entry_time":    now
-            })
-
-            logger.info(f"[{action}] {profile}:{sym} EXIT @ {exit_price}, PnL {pnl:.2f}%")
-
-    except Exception as e:
-        logger.exception(f"Error switching in webhook2 for {action} {sym} ({profile})")
-        raise HTTPException(status_code=500, detail=str(e))
-
-    return {"status": "ok", "result": res}
+    # 👉 레버리지 / 복리 여부는 app/profiles.py
+    return _enqueue(sym, action, profile, alert_id=payload.alert_id)
 
 # ✅ webhook3도 동일 (단, 필요 시 같은 방식으로 STOP 로그 추가 가능) -> 복리 안쓰는 낮은 레버리지
 @router.post("/webhook3")
@@ -160,66 +139,12 @@ async def webhook3(payload: AlertPayload):
     action = payload.action.upper()
     profile = PROFILE_WEBHOOK3
 
-    # 👉 원하는 커스텀 레버리지 설정
-    custom_leverage = 2
-
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym} ({profile})")
+        logger.info("[DRY_RUN] %s %s (%s)", action, sym, profile)
         return {"status": "dry_run"}
 
-    try:
-        res = switch_position(
-            sym,
-            action,
-            profile=profile,
-            leverage=custom_leverage,
-            use_initial_capital=True
-        )
-
-        if "skipped" in res:
-            logger.info(f"Skipped {action} {sym} ({profile}): {res['skipped']}")
-            return {"status": "skipped", "reason": res["skipped"]}
-
-        state = get_state(sym, profile)
-        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-        if action == "BUY":
-            info = res.get("buy", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  qty,
-                "entry_time":    now
-            })
-
-        elif action == "SELL":
-            info = res.get("sell", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  -qty,
-                "entry_time":    now
-            })
-
-        elif action in ("BUY_STOP", "SELL_STOP"):
-            exit_price = res.get("exit_price", 0.0)
-            pnl        = res.get("pnl", 0.0)
-
-            state.update({
-                "entry_price":   0.0,
-                "position_qty":  0.0,
-                "entry_time":    now
-            })
-
-            logger.info(f"[{action}] {profile}:{sym} EXIT @ {exit_price}, PnL {pnl:.2f}%")
-
-    except Exception as e:
-        logger.exception(f"Error switching in webhook3 for {action} {sym} ({profile})")
-        raise HTTPException(status_code=500, detail=str(e))
-
-    return {"status": "ok", "result": res}
+    # 👉 레버리지 / 복리 여부는 app/profiles.py
+    return _enqueue(sym, action, profile, alert_id=payload.alert_id)
 
 # ✅ webhook4 -> 복리 쓰는 커스텀 레버리지 전략
 @router.post("/webhook4")
@@ -228,72 +153,18 @@ async def webhook4(payload: AlertPayload):
     action  = payload.action.upper()
     profile = PROFILE_WEBHOOK4
 
-    # 👉 여기서 원하는 커스텀 레버리지 설정 (예: 2배)
-    custom_leverage = 2
-
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym} ({profile})")
+        logger.info("[DRY_RUN] %s %s (%s)", action, sym, profile)
         return {"status": "dry_run"}
 
-    try:
-        # use_initial_capital=False (기본값) → 복리 운용
-        res = switch_position(
-            sym,
-            action,
-            profile=profile,
-            leverage=custom_leverage,
-            # use_initial_capital=False  # 생략 시 False라 복리
-        )
-
-        if "skipped" in res:
-            logger.info(f"Skipped {action} {sym} ({profile}): {res['skipped']}")
-            return {"status": "skipped", "reason": res["skipped"]}
-
-        state = get_state(sym, profile)
-        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-        if action == "BUY":
-            info  = res.get("buy", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  qty,
-                "entry_time":    now,
-            })
-
-        elif action == "SELL":
-            info  = res.get("sell", {})
-            entry = float(info.get("entry", 0))
-            qty   = float(info.get("filled", 0))
-            state.update({
-                "entry_price":   entry,
-                "position_qty":  -qty,
-                "entry_time":    now,
-            })
-
-        elif action in ("BUY_STOP", "SELL_STOP"):
-            exit_price = res.get("exit_price", 0.0)
-            pnl        = res.get("pnl", 0.0)
-
-            state.update({
-                "entry_price":   0.0,
-                "position_qty":  0.0,
-                "entry_time":    now,
-            })
-
-            logger.info(f"[{action}] {profile}:{sym} EXIT @ {exit_price}, PnL {pnl:.2f}%")
-
-    except Exception as e:
-        logger.exception(f"Error switching in webhook4 for {action} {sym} ({profile})")
-        raise HTTPException(status_code=500, detail=str(e))
-
-    return {"status": "ok", "result": res}
+    # 👉 레버리지 / 복리 여부는 app/profiles.py
+    return _enqueue(sym, action, profile, alert_id=payload.alert_id)
 
 class AlertPayloadV5(BaseModel):
     symbol: str
     action: str
     leverage: int
+    alert_id: str | None = None
 
 @router.post("/webhook5")
 async def webhook5(payload: AlertPayloadV5):
@@ -302,23 +173,11 @@ async def webhook5(payload: AlertPayloadV5):
     profile = PROFILE_WEBHOOK5
 
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym} lev={payload.leverage} ({profile})")
+        logger.info("[DRY_RUN] %s %s lev=%s (%s)", action, sym, payload.leverage, profile)
         return {"status": "dry_run"}
 
-    try:
-        res = switch_position_hedge(
-            symbol=sym,
-            action=action,
-            leverage=payload.leverage,
-            profile=profile,
-            use_initial_capital=False,  # ✅ 복리
-        )
-        if "skipped" in res:
-            return {"status": "skipped", "reason": res["skipped"], "result": res}
-        return {"status": "ok", "result": res}
-    except Exception as e:
-        logger.exception(f"Error processing {action} for {sym} ({profile})")
-        raise HTTPException(status_code=500, detail=str(e))
+    # ✅ 복리 (app/profiles.py)
+    return _enqueue(sym, action, profile, alert_id=payload.alert_id, leverage=payload.leverage)
     
 @router.post("/webhook6")
 async def webhook6(payload: AlertPayloadV5):
@@ -327,20 +186,155 @@ async def webhook6(payload: AlertPayloadV5):
     profile = PROFILE_WEBHOOK6
 
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] {action} {sym} lev={payload.leverage} ({profile})")
+        logger.info("[DRY_RUN] %s %s lev=%s (%s)", action, sym, payload.leverage, profile)
         return {"status": "dry_run"}
 
+    # ✅ 복리X (initial_capital 고정, app/profiles.py)
+    return _enqueue(sym, action, profile, alert_id=payload.alert_id, leverage=payload.leverage)
+
+
+# ── 배치 알림 (바스켓) ───────────────────────────────
+
+class BatchAlertItem(BaseModel):
+    symbol: str
+    action: str
+    leverage: int | None = None  # webhook5/6 필수
+    alert_id: str | None = None
+
+
+class BatchPayload(BaseModel):
+    profile: str = PROFILE_WEBHOOK1
+    alerts: list[BatchAlertItem]
+
+
+def _batch_group_job(sym: str, items: list, profile: str, job_fn, prefetch=None, **kwargs) -> list[dict]:
+    """
+    같은 심볼 알림 묶음을 도착 순서대로 실행.
+    prefetch는 첫 알림에만 사용 (이후 알림은 앞 주문 결과가 반영된 값을 새로 조회)
+    하나가 실패하면 남은 알림은 실행하지 않음
+    """
+    results = []
+    for i, item in enumerate(items):
+        item_kwargs = dict(kwargs)
+        if item.leverage is not None and job_fn is _hedge_job:
+            item_kwargs["leverage"] = item.leverage
+        try:
+            results.append(job_fn(
+                sym, item.action.upper(), profile,
+                prefetch=prefetch if i == 0 else None,
+                **item_kwargs,
+            ))
+        except Exception as e:
+            logger.exception("[Batch] %s %s (%s) failed", item.action, sym, profile)
+            results.append({"error": str(e)})
+            results.extend({"skipped": "previous_failed"} for _ in items[i + 1:])
+            break
+    return results
+
+
+@router.post("/webhook/batch")
+async def webhook_batch(payload: BatchPayload):
+    """
+    여러 심볼 알림을 한 번에 처리.
+    - 공유 데이터(전 심볼 포지션 / 마크가격 / 심볼 규칙)는 1회만 조회
+    - 심볼별 작업은 실행기에서 병렬 실행 (같은 심볼은 순서대로)
+    - 응답: 알림 순서대로 항목별 결과
+    """
+    profile = payload.profile
+    if profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown profile {profile}")
+    job_fn, base_kwargs = _profile_job(profile)
+
+    if DRY_RUN:
+        logger.info("[DRY_RUN] batch of %s alerts (%s)", len(payload.alerts), profile)
+        return {"status": "dry_run", "results": [{"status": "dry_run"} for _ in payload.alerts]}
+
+    results: list[dict | None] = [None] * len(payload.alerts)
+    groups: dict[str, list[tuple[int, BatchAlertItem, tuple]]] = {}
+    in_batch: dict[tuple, str] = {}  # 이번 배치에서 이미 받은 fingerprint → 심볼
+    repeats: list[tuple[int, str]] = []
+    batch_actions: dict[str, str] = {}  # 심볼 → 이번 배치에서 마지막으로 받은 action
+    flipped: set[str] = set()           # 이번 배치 안에서 action이 바뀐 심볼
+    for idx, item in enumerate(payload.alerts):
+        sym = item.symbol.upper().replace("/", "")
+        action = item.action.upper()
+        fingerprint = alert_deduper.fingerprint(profile, sym, action, item.alert_id, hedge=job_fn is _hedge_job)
+        if batch_actions.setdefault(sym, action) != action:
+            # BUY → BUY_STOP → BUY: 앞선 신호는 더 이상 중복 기준이 아님 (alert_id 재전송만 중복)
+            batch_actions[sym] = action
+            flipped.add(sym)
+            in_batch = {f: s for f, s in in_batch.items() if s != sym or alert_deduper.is_idempotency_key(f)}
+        if sym not in flipped or alert_deduper.is_idempotency_key(fingerprint):
+            original = alert_deduper.check(fingerprint)
+            if original is not None:
+                results[idx] = {"symbol": sym, "status": "duplicate", "job_id": original}
+                continue
+        if fingerprint is not None and fingerprint in in_batch:
+            # 같은 배치 안의 중복: 먼저 받은 알림의 작업 id로 응답 (제출 후 채움)
+            repeats.append((idx, sym))
+            continue
+        if job_fn is _hedge_job and item.leverage is None:
+            results[idx] = {"symbol": sym, "status": "rejected", "detail": "leverage required"}
+            continue
+        if fingerprint is not None:
+            in_batch[fingerprint] = sym
+        groups.setdefault(sym, []).append((idx, item, fingerprint))
+
+    executor = get_executor()
+    # prefetch 전후로 해당 심볼 작업(모든 profile)이 없었을 때만 prefetch 결과를 재사용
+    versions = {sym: executor.idle_version(symbol_key(sym)) for sym in groups}
     try:
-        res = switch_position_hedge(
-            symbol=sym,
-            action=action,
-            leverage=payload.leverage,
-            profile=profile,
-            use_initial_capital=True,  # ✅ 복리X (initial_capital 고정)
-        )
-        if "skipped" in res:
-            return {"status": "skipped", "reason": res["skipped"], "result": res}
-        return {"status": "ok", "result": res}
+        prefetch = await MarketPrefetch.fetch_async(list(groups)) if groups else None
     except Exception as e:
-        logger.exception(f"Error processing {action} for {sym} ({profile})")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.warning("[Batch] Prefetch failed, falling back to per-symbol calls: %s", e)
+        prefetch = None
+
+    jobs = {}
+    for sym, entries in groups.items():
+        key = symbol_key(sym)
+        version = versions[sym]
+        shared = prefetch if version is not None and executor.idle_version(key) == version else None
+        try:
+            job = executor.submit(
+                key, _batch_group_job, sym, [item for _, item, _ in entries], profile, job_fn,
+                tag=(profile, "BATCH"), prefetch=shared, **base_kwargs,
+            )
+        except ExecutorFull as e:
+            logger.warning("[Batch] Rejected %s (%s): %s", sym, profile, e)
+            for idx, _, _ in entries:
+                results[idx] = {"symbol": sym, "status": "rejected", "detail": str(e)}
+            continue
+        for _, _, fingerprint in entries:
+            alert_deduper.remember(fingerprint, job.job_id)
+        jobs[sym] = job
+    for idx, sym in repeats:
+        job = jobs.get(sym)
+        results[idx] = (
+            {"symbol": sym, "status": "duplicate", "job_id": job.job_id} if job is not None
+            else {"symbol": sym, "status": "rejected", "detail": "duplicate of rejected alert"}
+        )
+    logger.info("Queued batch of %s alerts as %s symbol jobs (%s)", len(payload.alerts), len(jobs), profile)
+
+    outcomes = await asyncio.gather(
+        *(asyncio.wrap_future(job.future) for job in jobs.values()), return_exceptions=True
+    )
+    for (sym, job), outcome in zip(jobs.items(), outcomes):
+        entries = groups[sym]
+        if isinstance(outcome, Exception):
+            outcome = [{"error": str(outcome)}] * len(entries)
+        elif not isinstance(outcome, list):
+            # coalesce로 대체된 경우 등
+            outcome = [outcome] * len(entries)
+        for (idx, _, _), res in zip(entries, outcome):
+            status = "superseded" if isinstance(res, dict) and res.get("skipped") == "superseded" else "done"
+            results[idx] = {"symbol": sym, "status": status, "job_id": job.job_id, "result": res}
+
+    return {"status": "done", "results": results}
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    record = get_executor().get_result(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return record
@@ -0,0 +1,203 @@
+# app/services/account_config.py
+
+import logging
+import threading
+import time
+
+from binance.exceptions import BinanceAPIException
+
+from app.config import LEVERAGE_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class LeverageCache:
+    """
+    심볼별 거래소 확인 레버리지 / 마진타입 캐시.
+
+    - 채워지는 곳: futures_change_leverage 응답, positionRisk 스냅샷,
+      User Data Stream ACCOUNT_CONFIG_UPDATE / ACCOUNT_UPDATE
+    - TTL(LEVERAGE_CACHE_TTL)이 지나면 모르는 값으로 취급 → 다음 주문에서 다시 설정
+    """
+
+    def __init__(self, ttl: float = LEVERAGE_CACHE_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol: str) -> int | None:
+        entry = self._entries.get(symbol)
+        if entry is None or entry["leverage"] is None:
+            return None
+        if time.monotonic() - entry["updated_at"] > self._ttl:
+            return None
+        return entry["leverage"]
+
+    def margin_type(self, symbol: str) -> str | None:
+        entry = self._entries.get(symbol)
+        return entry["margin_type"] if entry else None
+
+    def set(self, symbol: str, leverage: int | None = None, margin_type: str | None = None) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(
+                symbol, {"leverage": None, "margin_type": None, "updated_at": 0.0}
+            )
+            if leverage is not None:
+                entry["leverage"] = int(leverage)
+                entry["updated_at"] = time.monotonic()
+            if margin_type is not None:
+                entry["margin_type"] = margin_type.lower()
+
+    def invalidate(self, symbol: str | None = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    # ── User Data Stream 리스너 ─────────────────────────
+    def on_account_config_update(self, event: dict) -> None:
+        ac = event.get("ac")
+        if ac and ac.get("s"):
+            self.set(ac["s"], leverage=ac.get("l"))
+
+    def on_account_update(self, event: dict) -> None:
+        for p in event.get("a", {}).get("P", []):
+            if p.get("s") and p.get("mt"):
+                self.set(p["s"], margin_type=p["mt"])
+
+    def stats(self) -> dict:
+        return {"symbols": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+leverage_cache = LeverageCache()
+
+
+def ensure_leverage(client, symbol: str, leverage: int) -> bool:
+    """
+    거래소 레버리지가 이미 leverage면 호출 생략.
+    반환: 실제로 futures_change_leverage를 호출했으면 True
+    """
+    if leverage_cache.get(symbol) == leverage:
+        leverage_cache.hits += 1
+        return False
+
+    leverage_cache.misses += 1
+    try:
+        res = client.futures_change_leverage(symbol=symbol, leverage=leverage)
+    except Exception:
+        # 실패 시 거래소 값을 알 수 없으므로 캐시 제거
+        leverage_cache.invalidate(symbol)
+        raise
+
+    leverage_cache.set(symbol, leverage=int(res.get("leverage", leverage)) if isinstance(res, dict) else leverage)
+    logger.info("[Leverage] %s set to %sx", symbol, leverage)
+    return True
+
+
+# ── 계정 단위 설정 (포지션 모드 / 멀티에셋) ─────────────
+class AccountConfig:
+    """
+    계정 설정 캐시: dualSidePosition(Hedge 여부), multiAssetsMargin, 심볼별 마진타입(leverage_cache).
+
+    - 기동 시 1회 확인(refresh) 후 서비스는 캐시만 읽음 → 알림당 signed 요청 없음
+    - ACCOUNT_CONFIG_UPDATE(ai)로 멀티에셋 변경 반영, 포지션 모드는 이벤트가 없으므로
+      ACCOUNT_CONFIG_TTL 주기 백그라운드 refresh로 보정
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.dual_side_position: bool | None = None
+        self.multi_assets_margin: bool | None = None
+        self.updated_at = 0.0
+        self.refreshes = 0
+
+    def refresh(self, client) -> dict:
+        """
+        accountConfig(weight 5) 1회로 두 값 조회.
+        (미지원 환경이면 positionSide/dual + multiAssetsMargin으로 대체)
+        """
+        try:
+            cfg = client.futures_account_config()
+            dual = cfg.get("dualSidePosition")
+            multi = cfg.get("multiAssetsMargin")
+        except Exception as e:
+            logger.warning("[AccountConfig] accountConfig failed, using legacy endpoints: %s", e)
+            dual = client.futures_get_position_mode().get("dualSidePosition")
+            multi = client.futures_get_multi_assets_mode().get("multiAssetsMargin")
+
+        with self._lock:
+            self.dual_side_position = bool(dual)
+            self.multi_assets_margin = bool(multi)
+            self.updated_at = time.monotonic()
+            self.refreshes += 1
+        return {"dual_side_position": self.dual_side_position, "multi_assets_margin": self.multi_assets_margin}
+
+    def dual_side(self, client) -> bool:
+        """계정 포지션 모드 (True=Hedge, False=One-way). 아직 확인 전이면 그때만 refresh"""
+        if self.dual_side_position is None:
+            self.refresh(client)
+        return self.dual_side_position
+
+    def multi_assets(self, client) -> bool:
+        if self.multi_assets_margin is None:
+            self.refresh(client)
+        return self.multi_assets_margin
+
+    def margin_type(self, symbol: str) -> str | None:
+        return leverage_cache.margin_type(symbol)
+
+    def ensure_hedge_mode(self, client) -> None:
+        """
+        Binance Futures 계정을 Hedge Mode(dualSidePosition=True)로 설정합니다.
+        캐시상 이미 Hedge Mode면 아무 요청도 보내지 않습니다.
+        """
+        try:
+            if self.dual_side(client):
+                return
+
+            logger.info("Switching Binance account to Hedge Mode...")
+            client.futures_change_position_mode(dualSidePosition=True)
+
+            # 변경 확인
+            self.refresh(client)
+            if self.dual_side_position is not True:
+                raise RuntimeError("Failed to enable Hedge Mode.")
+
+            logger.info("Hedge Mode enabled successfully.")
+
+        except BinanceAPIException as e:
+            # 이미 Hedge Mode거나 변경 불가능한 상태(포지션 보유 중 등)일 수 있음
+            logger.warning("Binance API exception while setting Hedge Mode: %s", e)
+        except Exception as e:
+            logger.error("Unexpected error while enabling Hedge Mode: %s", e)
+            raise
+
+    def refresh_background(self) -> None:
+        """스케줄러용: 실패해도 기존 값 유지"""
+        from app.clients.binance_client import get_binance_client
+
+        try:
+            self.refresh(get_binance_client())
+        except Exception as e:
+            logger.warning("[AccountConfig] Refresh failed, keeping previous values: %s", e)
+
+    # ── User Data Stream 리스너 ─────────────────────────
+    def on_account_config_update(self, event: dict) -> None:
+        ai = event.get("ai")
+        if ai and "j" in ai:
+            self.multi_assets_margin = bool(ai["j"])
+
+    def stats(self) -> dict:
+        return {
+            "dual_side_position": self.dual_side_position,
+            "multi_assets_margin": self.multi_assets_margin,
+            "age_s": round(time.monotonic() - self.updated_at, 1) if self.updated_at else None,
+            "refreshes": self.refreshes,
+        }
+
+
+account_config = AccountConfig()
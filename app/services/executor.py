@@ -0,0 +1,219 @@
+# app/services/executor.py
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.config import EXEC_MAX_WORKERS, EXEC_MAX_PENDING, EXEC_RESULT_KEEP, EXCHANGE_ACCOUNT
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ExecutorFull(RuntimeError):
+    """대기열이 EXEC_MAX_PENDING을 넘었을 때 발생"""
+
+
+def symbol_key(symbol: str, account: str = EXCHANGE_ACCOUNT) -> str:
+    """
+    주문 작업 대기열 키: (account, symbol).
+    같은 Binance 포지션을 쓰는 모든 profile(webhook1~6)의 작업이 한 대기열에서 순서대로 실행됨
+    → 락을 잡은 채 워커 스레드가 기다리는 일 없이 대기열에서 기다림
+    """
+    return f"{account}:{symbol}"
+
+
+class _Job:
+    __slots__ = ("job_id", "key", "fn", "args", "kwargs", "tag", "future", "enqueued_at")
+
+    def __init__(self, key: str, fn, args: tuple, kwargs: dict, tag: tuple | None = None):
+        self.job_id = uuid.uuid4().hex
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.tag = tag  # (group, kind) 예: (profile, action) — coalesce 판별용
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class SymbolExecutor:
+    """
+    key 단위 직렬화 + 전체 병렬 실행 워커 풀 (주문 작업 key = symbol_key: account:symbol).
+
+    - 같은 key의 작업은 도착 순서대로 하나씩 실행 (포지션 스위치 경합 방지)
+    - 서로 다른 key는 max_workers 범위 내에서 동시에 실행
+    - 블로킹 Binance 호출/time.sleep은 전부 워커 스레드에서 돌기 때문에
+      이벤트 루프(uvicorn)는 막히지 않음
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, result_keep: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="order")
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._result_keep = result_keep
+
+        self._lock = threading.Lock()
+        self._queues: dict[str, deque[_Job]] = {}
+        self._running: set[str] = set()
+        self._pending = 0
+        self._versions: dict[str, int] = {}
+        self._results: OrderedDict[str, dict] = OrderedDict()
+
+        # 메트릭
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._superseded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def submit(self, key: str, fn, *args, tag: tuple | None = None, coalesce: bool = False, **kwargs) -> _Job:
+        """
+        tag: (group, kind) — 예: (profile, action)
+        coalesce=True면 같은 key에서 아직 시작 안 한 같은 group의 마지막 작업이 같은 tag일 때만
+        그 작업을 이번 작업으로 대체 (같은 신호가 연달아 오면 마지막 것만 실행).
+        대체해도 결과가 같은 신호에만 호출 측이 coalesce=True를 준다.
+        대기열이 가득 차면 아무 작업도 건드리지 않고 ExecutorFull.
+        """
+        job = _Job(key, fn, args, kwargs, tag)
+        with self._lock:
+            queue = self._queues.get(key)
+            stale = self._coalesce_target(queue, tag) if coalesce and queue else None
+
+            # 용량 확인을 먼저 (대체 대상은 빠지므로 한 칸으로 계산)
+            if self._pending - (stale is not None) >= self._max_pending:
+                raise ExecutorFull(f"executor queue full ({self._pending})")
+
+            if queue is None:
+                queue = self._queues[key] = deque()
+            if stale is not None:
+                queue.remove(stale)
+                self._pending -= 1
+                self._superseded += 1
+                self._results[stale.job_id] = {"key": key, "status": "superseded", "by": job.job_id}
+                stale.future.set_result({"skipped": "superseded", "by": job.job_id})
+
+            queue.append(job)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._pending += 1
+            self._submitted += 1
+            self._results[job.job_id] = {"key": key, "status": "queued"}
+            self._trim_results()
+
+            if key not in self._running:
+                self._running.add(key)
+                self._pool.submit(self._drain, key)
+        return job
+
+    @staticmethod
+    def _coalesce_target(queue: deque, tag: tuple | None) -> _Job | None:
+        """같은 group의 가장 최근 대기 작업이 tag까지 같으면 그 작업 (아니면 None)"""
+        if tag is None:
+            return None
+        for queued in reversed(queue):
+            if queued.tag is not None and queued.tag[0] == tag[0]:
+                return queued if queued.tag == tag else None
+        return None
+
+    def _drain(self, key: str) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._queues.pop(key, None)
+                    self._running.discard(key)
+                    return
+                job = queue.popleft()
+                self._pending -= 1
+                self._results[job.job_id] = {"key": key, "status": "running"}
+
+            self._run(job)
+
+    def _run(self, job: _Job) -> None:
+        started = time.monotonic()
+        wait = started - job.enqueued_at
+        try:
+            result = job.fn(*job.args, **job.kwargs)
+        except Exception as e:
+            logger.exception("[Executor] job %s (%s) failed", job.job_id, job.key)
+            record = {"key": job.key, "status": "error", "error": str(e)}
+            ok = False
+            job.future.set_exception(e)
+        else:
+            record = {"key": job.key, "status": "done", "result": result}
+            ok = True
+            job.future.set_result(result)
+
+        run = time.monotonic() - started
+        record["wait_ms"] = round(wait * 1000, 2)
+        record["run_ms"] = round(run * 1000, 2)
+
+        with self._lock:
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._run_total += run
+            self._run_max = max(self._run_max, run)
+            self._results[job.job_id] = record
+            self._trim_results()
+
+    def _trim_results(self) -> None:
+        while len(self._results) > self._result_keep:
+            self._results.popitem(last=False)
+
+    def idle_version(self, key: str) -> int | None:
+        """
+        key에 실행/대기 중인 작업이 없으면 지금까지의 제출 횟수, 있으면 None.
+        조회 전후 값이 같으면 그 사이 key의 포지션을 바꾼 작업이 없었다는 뜻
+        (배치 prefetch 재사용 판단용)
+        """
+        with self._lock:
+            if key in self._running or self._queues.get(key):
+                return None
+            return self._versions.get(key, 0)
+
+    def get_result(self, job_id: str) -> dict | None:
+        with self._lock:
+            return self._results.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self._max_workers,
+                "pending": self._pending,
+                "active_keys": len(self._running),
+                "queue_depth": {k: len(q) for k, q in self._queues.items() if q},
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "superseded": self._superseded,
+                "wait_ms_avg": round(self._wait_total / finished * 1000, 2) if finished else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 2),
+                "run_ms_avg": round(self._run_total / finished * 1000, 2) if finished else 0.0,
+                "run_ms_max": round(self._run_max * 1000, 2),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+# 싱글톤 실행기
+_executor: SymbolExecutor | None = None
+
+
+def get_executor() -> SymbolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = SymbolExecutor(EXEC_MAX_WORKERS, EXEC_MAX_PENDING, EXEC_RESULT_KEEP)
+        logger.info("Initialized order executor (workers=%s).", EXEC_MAX_WORKERS)
+    return _executor
@@ -1,12 +1,15 @@
 # app/services/hedge_orders.py
 
 import logging
-import math
 from fastapi import HTTPException
-from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
+from binance.enums import SIDE_BUY, SIDE_SELL
 from app.clients.binance_client import get_binance_client
-from app.config import BUY_PCT
-from app.state import get_state
+from app.clients.mark_price_stream import get_mark_price
+from app.state import get_state, save_state
+from app.services.sizing import entry_quantity
+from app.services.order_gateway import submit_market_order, on_actual_commission
+from app.services.locks import lock_manager
+from app.metrics import timed
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -14,12 +17,14 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+@timed("hedge.entry")
 def execute_hedge_entry(
     symbol: str,
     position_side: str,       # "LONG" | "SHORT"
     leverage: int,
     profile: str,
     use_initial_capital: bool,
+    mark_price: float | None = None,
 ) -> dict:
     """
     Hedge Mode 진입 주문(추가매수/추가진입 포함)
@@ -29,6 +34,7 @@ def execute_hedge_entry(
     사이징:
     - use_initial_capital=True  -> state['initial_capital'] 기준
     - use_initial_capital=False -> state['capital'] 기준(복리)
+    - mark_price: 배치 알림에서 미리 받아둔 마크가격 (없으면 REST 조회)
     """
     client = get_binance_client()
     state = get_state(symbol, profile)
@@ -44,53 +50,68 @@ def execute_hedge_entry(
     if base_capital <= 0:
         raise HTTPException(status_code=400, detail="base_capital must be > 0")
 
-    mark_price = float(client.futures_mark_price(symbol=symbol)["markPrice"])
+    if mark_price is None:
+        mark_price = get_mark_price(client, symbol)
 
     # ✅ 기존 buy/sell.py 스타일: allocation 기반 사이징
-    allocation = base_capital * BUY_PCT * leverage
-    raw_qty = allocation / mark_price
-
-    # LOT_SIZE 규칙에 맞춰 수량 보정
-    info = client.futures_exchange_info()
-    sym_info = next(s for s in info["symbols"] if s["symbol"] == symbol)
-    lot_f = next(f for f in sym_info["filters"] if f["filterType"] == "LOT_SIZE")
-    step = float(lot_f["stepSize"])
-    min_qty = float(lot_f["minQty"])
-    qty_prec = int(round(-math.log10(step), 0)) if step > 0 else 0
-
-    qty = math.floor(raw_qty / step) * step
-    if qty < min_qty:
-        raise HTTPException(status_code=400, detail=f"Qty {qty} < minQty {min_qty}")
-
-    qty_str = f"{qty:.{qty_prec}f}"
+    # 거래소 LOT_SIZE / MIN_NOTIONAL 규칙에 맞춰 수량 보정 (캐시된 심볼 규칙 사용)
+    qty, qty_str = entry_quantity(symbol, base_capital, leverage, mark_price)
 
     # Hedge 진입 side 결정
     side = SIDE_BUY if position_side == "LONG" else SIDE_SELL
 
-    order = client.futures_create_order(
-        symbol=symbol,
-        side=side,
-        type=ORDER_TYPE_MARKET,
-        quantity=qty_str,
-        positionSide=position_side,  # ⭐ 핵심
-    )
+    # RESULT 응답으로 체결가/수량/수수료 한 번에 확보
+    fill = submit_market_order(client, symbol, side, qty_str, positionSide=position_side)  # ⭐ 핵심
 
     logger.info(
-        f"[HEDGE_ENTRY] {profile}:{symbol} {position_side} "
-        f"lev={leverage} qty={qty_str} mark={mark_price} "
-        f"(base={'initial_capital' if use_initial_capital else 'capital'}={base_capital})"
+        "[HEDGE_ENTRY] %s:%s %s lev=%s qty=%s avg=%s mark=%s (base=%s=%s)",
+        profile, symbol, position_side, leverage, qty_str, fill.avg_price, mark_price,
+        "initial_capital" if use_initial_capital else "capital", base_capital,
     )
 
-    # (선택) webhook5/6 상태 기록: 마지막 진입 주문 정보
-    if position_side == "LONG":
-        state["hedge_long_add_count"] = state.get("hedge_long_add_count", 0) + 1
-        state["hedge"]["long"]["last_order_qty"] = float(qty_str)
-        state["hedge"]["long"]["last_order_time"] = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-    else:
-        state["hedge_short_add_count"] = state.get("hedge_short_add_count", 0) + 1
-        state["hedge"]["short"]["last_order_qty"] = float(qty_str)
-        state["hedge"]["short"]["last_order_time"] = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-    state["trade_count"] = state.get("trade_count", 0) + 1
+    # (선택) webhook5/6 상태 기록: 마지막 진입 주문 정보 + 카운터/누적 수수료 (CAS로 한 번에 반영)
+    side = "long" if position_side == "LONG" else "short"
+    now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+    commission_path, orders_path = f"hedge.{side}.entry_commission", f"hedge.{side}.entry_order_ids"
+    order_ids = (fill.order_id,) if fill.order_id is not None else ()
+    lock_manager.transition(
+        state,
+        (f"hedge_{side}_add_count", commission_path, orders_path, "trade_count"),
+        lambda cur: {
+            f"hedge_{side}_add_count": (cur[f"hedge_{side}_add_count"] or 0) + 1,
+            f"hedge.{side}.last_order_qty": float(qty_str),
+            commission_path: (cur[commission_path] or 0.0) + fill.commission,
+            orders_path: (*(cur[orders_path] or ()), *order_ids),
+            f"hedge.{side}.last_order_time": now,
+            "trade_count": (cur["trade_count"] or 0) + 1,
+        },
+    )
 
-    return {"entry": {"positionSide": position_side, "qty": float(qty_str), "mark": mark_price}, "order": order}
\ No newline at end of file
+    # 추정 수수료로 누적했으면 체결 이벤트 도착 시 차이만큼 보정
+    # (이 주문이 아직 현재 포지션의 진입 주문일 때만: 그 사이 청산/재진입했으면 무시)
+    estimate = fill.commission
+
+    def correct(actual: float) -> None:
+        applied = lock_manager.transition(
+            state,
+            (commission_path, orders_path),
+            lambda cur: (
+                {commission_path: cur[commission_path] + actual - estimate}
+                if fill.order_id in (cur[orders_path] or ()) else None
+            ),
+        )
+        if applied is not None:
+            save_state(symbol, profile)
+
+    on_actual_commission(fill, correct)
+
+    return {
+        "entry": {
+            "positionSide": position_side,
+            "qty": fill.executed_qty or float(qty_str),
+            "avg_price": fill.avg_price,
+            "commission": fill.commission,
+            "mark": mark_price,
+        },
+        "order": fill.raw,
+    }
\ No newline at end of file
@@ -0,0 +1,91 @@
+# app/services/ingest.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import INGEST_DEDUP_WINDOW, INGEST_DEDUP_SIZE, INGEST_COALESCE
+
+# 대기 중인 같은 신호를 대체해도 되는 action (one-way 진입: 같은 방향이면 결과가 같음)
+_COALESCE_ACTIONS = ("BUY", "SELL")
+
+# fingerprint에서 alert_id(멱등 키) 기반 키 표시
+_ID = "id"
+
+
+def coalescable(action: str, hedge: bool, enabled: bool = INGEST_COALESCE) -> bool:
+    """
+    새 알림이 대기 중인 같은 (profile, action) 알림을 대체해도 되는지.
+    - *_STOP: 청산은 항상 실행 (대체하면 포지션이 남음)
+    - hedge(webhook5/6): BUY/SELL은 누적 추가진입이라 각각 실행
+    """
+    return enabled and not hedge and action in _COALESCE_ACTIONS
+
+
+class AlertDeduper:
+    """
+    웹훅 알림 중복 제거용 LRU + TTL 캐시.
+
+    - alert_id(멱등 키)가 있으면 그 값으로, 없으면 (profile, symbol, action, 시간 버킷)으로 판별
+    - window초 안에 같은 키가 다시 오면 처음 작업의 job_id를 돌려줌 (거래소 호출 없음)
+    - alert_id 없는 신호는 같은 profile:symbol의 마지막 action일 때만 중복
+      (BUY → BUY_STOP → BUY면 두 번째 BUY는 새 신호)
+    - hedge(webhook5/6) BUY/SELL은 누적 추가진입이라 alert_id가 있을 때만 판별
+    """
+
+    def __init__(self, window: float = INGEST_DEDUP_WINDOW, max_size: int = INGEST_DEDUP_SIZE):
+        self._window = window
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._seen: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+        self._last_action: dict[tuple[str, str], str] = {}  # (profile, symbol) → 마지막으로 받은 action
+        self.duplicates = 0
+
+    def fingerprint(
+        self, profile: str, symbol: str, action: str, alert_id: str | None, hedge: bool = False,
+    ) -> tuple | None:
+        """중복 판별 키. None이면 판별하지 않음 (항상 실행)"""
+        if alert_id:
+            return (profile, symbol, action, _ID, alert_id)
+        if hedge and action in _COALESCE_ACTIONS:
+            return None
+        return (profile, symbol, action, int(time.time() // self._window))
+
+    @staticmethod
+    def is_idempotency_key(key: tuple | None) -> bool:
+        return key is not None and key[3] == _ID
+
+    def check(self, key: tuple | None) -> str | None:
+        """중복이면 원래 job_id, 아니면 None"""
+        if key is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            hit = self._seen.get(key)
+            if hit is None:
+                return None
+            expires_at, job_id = hit
+            if expires_at < now or (
+                not self.is_idempotency_key(key) and self._last_action.get(key[:2]) != key[2]
+            ):
+                # 만료, 또는 그 뒤에 같은 profile:symbol로 다른 action이 들어옴
+                del self._seen[key]
+                return None
+            self.duplicates += 1
+            return job_id
+
+    def remember(self, key: tuple | None, job_id: str) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._last_action[key[:2]] = key[2]
+            self._seen[key] = (time.monotonic() + self._window, job_id)
+            self._seen.move_to_end(key)
+            while len(self._seen) > self._max_size:
+                self._seen.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"tracked": len(self._seen), "duplicates": self.duplicates}
+
+
+alert_deduper = AlertDeduper()
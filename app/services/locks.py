@@ -0,0 +1,152 @@
+# app/services/locks.py
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from app.config import EXCHANGE_ACCOUNT, LOCK_TIMEOUT, STATE_CAS_RETRIES
+from app.metrics import observe_lock_wait
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class LockTimeout(RuntimeError):
+    """LOCK_TIMEOUT 안에 (account, symbol) 락을 얻지 못했을 때 발생"""
+
+
+class StateConflict(RuntimeError):
+    """compare-and-set이 STATE_CAS_RETRIES번 연속 충돌했을 때 발생"""
+
+
+def _resolve(record, path: str):
+    # "hedge.long.entry_commission" → (state["hedge"]["long"], "entry_commission")
+    *parents, leaf = path.split(".")
+    for name in parents:
+        record = record[name]
+    return record, leaf
+
+
+class LockManager:
+    """
+    (account, symbol) 단위 상태 락.
+
+    - 주문 작업 자체는 실행기 symbol_key 대기열에서 직렬화 (주문 대기 중에 락을 쥐지 않음)
+    - 여기서는 상태 전이(compare_and_set) 구간만 짧게 잡음 → 워커 외 경로(리셋, 스트림 등)와의 경합 방지
+    - RLock: 락을 쥔 채로 호출하는 transition()은 바로 재진입
+    - 대기 시간 / 경합 / 타임아웃 메트릭 (/executor, /metrics lock_wait_seconds)
+    - compare_and_set / transition: 읽은 값이 그대로일 때만 상태 필드를 한 번에 갱신
+    """
+
+    def __init__(self, timeout: float = LOCK_TIMEOUT, account: str = EXCHANGE_ACCOUNT):
+        self._timeout = timeout
+        self._account = account
+        self._guard = threading.Lock()
+        self._locks: dict[tuple[str, str], threading.RLock] = {}
+
+        # 메트릭
+        self._acquired = 0
+        self._contended = 0
+        self._timeouts = 0
+        self._waiting = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hold_max = 0.0
+        self._cas_conflicts = 0
+
+    def _get(self, key: tuple[str, str]) -> threading.RLock:
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(key, threading.RLock())
+        return lock
+
+    @contextmanager
+    def hold(self, symbol: str, account: str | None = None, timeout: float | None = None):
+        """with lock_manager.hold(symbol): ... (timeout 초과 시 LockTimeout)"""
+        account = account or self._account
+        lock = self._get((account, symbol))
+        started = time.perf_counter()
+
+        if not lock.acquire(blocking=False):
+            with self._guard:
+                self._contended += 1
+                self._waiting += 1
+            try:
+                ok = lock.acquire(timeout=timeout if timeout is not None else self._timeout)
+            finally:
+                with self._guard:
+                    self._waiting -= 1
+            if not ok:
+                with self._guard:
+                    self._timeouts += 1
+                raise LockTimeout(f"lock {account}:{symbol} not acquired within {timeout or self._timeout}s")
+
+        acquired_at = time.perf_counter()
+        wait = acquired_at - started
+        with self._guard:
+            self._acquired += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        observe_lock_wait(account, wait)
+
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - acquired_at
+            lock.release()
+            with self._guard:
+                self._hold_max = max(self._hold_max, held)
+
+    # ── 상태 전이 ────────────────────────────────────
+    def compare_and_set(self, state, expected: dict, changes: dict) -> bool:
+        """
+        state의 (account, symbol) 락 안에서 expected 필드가 모두 현재 값과 같으면 changes를 적용.
+        키는 "capital" 또는 "hedge.long.qty" 같은 경로
+        """
+        with self.hold(state["symbol"]):
+            for path, value in expected.items():
+                record, leaf = _resolve(state, path)
+                if record.get(leaf) != value:
+                    with self._guard:
+                        self._cas_conflicts += 1
+                    return False
+            for path, value in changes.items():
+                record, leaf = _resolve(state, path)
+                record[leaf] = value
+            return True
+
+    def transition(self, state, fields: tuple[str, ...], fn, retries: int = STATE_CAS_RETRIES) -> dict | None:
+        """
+        fields 현재 값을 읽어 fn(current) → changes(없으면 None = 전이 없음)를 계산하고 CAS로 적용.
+        그 사이 다른 작업이 값을 바꿨으면 다시 읽어 재계산. 반환: 적용된 changes
+        """
+        for _ in range(retries):
+            current = {}
+            for path in fields:
+                record, leaf = _resolve(state, path)
+                current[path] = record.get(leaf)
+            changes = fn(current)
+            if changes is None:
+                return None
+            if self.compare_and_set(state, current, changes):
+                return changes
+        raise StateConflict(f"{state['profile']}:{state['symbol']} {fields} changed {retries} times")
+
+    def stats(self) -> dict:
+        with self._guard:
+            return {
+                "keys": len(self._locks),
+                "acquired": self._acquired,
+                "contended": self._contended,
+                "waiting": self._waiting,
+                "timeouts": self._timeouts,
+                "wait_ms_avg": round(self._wait_total / self._acquired * 1000, 2) if self._acquired else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 2),
+                "hold_ms_max": round(self._hold_max * 1000, 2),
+                "cas_conflicts": self._cas_conflicts,
+            }
+
+
+lock_manager = LockManager()
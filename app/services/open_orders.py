@@ -0,0 +1,109 @@
+# app/services/open_orders.py
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# DELETE /fapi/v1/batchOrders 한 번에 취소 가능한 최대 주문 수
+CANCEL_BATCH_LIMIT = 10
+
+_CLOSED_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "EXPIRED_IN_MATCH", "REJECTED"}
+
+
+class OpenOrderBook:
+    """
+    심볼별 미체결 주문 장부.
+
+    - REST futures_get_open_orders 결과로 심볼 장부를 채우고(seed),
+      이후 User Data Stream ORDER_TRADE_UPDATE로 추가/삭제
+    - 스트림이 살아 있는 동안 seed된 심볼만 "확실한" 장부로 취급
+      (스트림이 끊기면 전부 무효 → 다음 정리 때 REST로 다시 seed)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._orders: dict[str, dict[int, dict]] = {}
+        self._synced: set[str] = set()
+        self._live = False
+        self.skipped = 0
+
+    # ── 스트림 상태 ──────────────────────────────────
+    def set_live(self, live: bool) -> None:
+        with self._lock:
+            self._live = live
+            if not live:
+                self._synced.clear()
+
+    # ── 반영 ────────────────────────────────────────
+    def seed(self, symbol: str, orders: list[dict]) -> None:
+        with self._lock:
+            self._orders[symbol] = {
+                o["orderId"]: {"reduce_only": bool(o.get("reduceOnly")), "type": o.get("type")}
+                for o in orders
+            }
+            if self._live:
+                self._synced.add(symbol)
+
+    def apply_order_update(self, event: dict) -> None:
+        o = event.get("o", {})
+        symbol, order_id = o.get("s"), o.get("i")
+        if symbol is None or order_id is None:
+            return
+        with self._lock:
+            book = self._orders.setdefault(symbol, {})
+            if o.get("X") in _CLOSED_STATUSES:
+                book.pop(order_id, None)
+            else:
+                book[order_id] = {"reduce_only": bool(o.get("R")), "type": o.get("o")}
+
+    def remove(self, symbol: str, order_ids: list[int]) -> None:
+        with self._lock:
+            book = self._orders.get(symbol, {})
+            for order_id in order_ids:
+                book.pop(order_id, None)
+
+    def invalidate(self, symbol: str) -> None:
+        with self._lock:
+            self._synced.discard(symbol)
+
+    # ── 조회 ────────────────────────────────────────
+    def reduce_only_ids(self, symbol: str) -> list[int] | None:
+        """확실한 장부면 reduceOnly 주문 ID 목록, 아니면 None (REST 조회 필요)"""
+        with self._lock:
+            if symbol not in self._synced:
+                return None
+            return [oid for oid, o in self._orders.get(symbol, {}).items() if o["reduce_only"]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "live": self._live,
+                "synced_symbols": len(self._synced),
+                "open_orders": sum(len(b) for b in self._orders.values()),
+                "skipped": self.skipped,
+            }
+
+
+open_order_book = OpenOrderBook()
+
+
+def cancel_orders_bulk(client, symbol: str, order_ids: list[int]) -> int:
+    """
+    multi-order cancel(DELETE batchOrders)로 CANCEL_BATCH_LIMIT개씩 취소.
+    반환: 취소 성공 수 (실패가 있으면 해당 심볼 장부는 무효 처리)
+    """
+    canceled = 0
+    for i in range(0, len(order_ids), CANCEL_BATCH_LIMIT):
+        chunk = order_ids[i:i + CANCEL_BATCH_LIMIT]
+        results = client.futures_cancel_orders(symbol=symbol, orderidlist=chunk)
+        done = [r["orderId"] for r in results if isinstance(r, dict) and "orderId" in r]
+        failed = [r for r in results if not (isinstance(r, dict) and "orderId" in r)]
+        canceled += len(done)
+        open_order_book.remove(symbol, done)
+        if failed:
+            # 이미 체결/취소된 주문(-2011) 등: 실제 상태를 모르므로 다음에 REST로 재확인
+            open_order_book.invalidate(symbol)
+            logger.warning("[Cleanup] %s %s cancels failed: %s", symbol, len(failed), failed)
+    return canceled
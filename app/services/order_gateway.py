@@ -0,0 +1,143 @@
+# app/services/order_gateway.py
+
+import logging
+from dataclasses import dataclass, field
+
+from binance.enums import ORDER_TYPE_MARKET
+
+from app.config import FEE_RATE, FILL_COMMISSION_WAIT
+from app.clients.mark_price_stream import get_mark_price
+from app.services.position_cache import position_cache
+from app.metrics import timed
+from app.logs import log_event
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@dataclass(slots=True)
+class Fill:
+    """시장가 주문 체결 결과 (RESULT 응답 기준)"""
+    order_id: int | None
+    symbol: str
+    side: str
+    position_side: str | None
+    status: str
+    avg_price: float
+    executed_qty: float
+    cum_quote: float
+    commission: float            # USDT 기준
+    commission_estimated: bool   # True면 FEE_RATE 기반 추정치
+    raw: dict = field(repr=False, default_factory=dict)
+
+
+@timed("order.submit")
+def submit_market_order(client, symbol: str, side: str, quantity, **params) -> Fill:
+    """
+    newOrderRespType=RESULT로 시장가 주문 → 응답 하나로 avgPrice/executedQty 확보.
+    (기존: create_order → futures_get_order → 실패 시 futures_mark_price)
+    """
+    order = client.futures_create_order(
+        symbol=symbol,
+        side=side,
+        type=ORDER_TYPE_MARKET,
+        quantity=quantity,
+        newOrderRespType="RESULT",
+        **params,
+    )
+    return parse_fill(client, symbol, order)
+
+
+def parse_fill(client, symbol: str, order: dict) -> Fill:
+    """
+    주문 응답(dict) → Fill.
+    - avgPrice가 비어 있는 예외 상황(미체결 응답)에서만 추가 조회
+    - 수수료: User Data Stream 체결 이벤트가 이미(또는 FILL_COMMISSION_WAIT 안에) 왔으면 실제값,
+      아니면 cumQuote * FEE_RATE 추정치 (commission_estimated=True → on_actual_commission / settle_commission으로 보정)
+    """
+    order_id = order.get("orderId")
+    avg_price = float(order.get("avgPrice") or 0.0)
+    executed_qty = float(order.get("executedQty") or 0.0)
+    cum_quote = float(order.get("cumQuote") or 0.0)
+
+    if avg_price <= 0:
+        avg_price, executed_qty, cum_quote = _refetch_fill(client, symbol, order_id, executed_qty)
+
+    if cum_quote <= 0:
+        cum_quote = avg_price * executed_qty
+
+    commission = cum_quote * FEE_RATE
+    estimated = True
+    if order_id is not None and position_cache.is_live():
+        # FILL_COMMISSION_WAIT=0이면 이미 도착한 이벤트만 확인 (기다리지 않음)
+        actual = _usdt_commission(position_cache.wait_for_fill(order_id, FILL_COMMISSION_WAIT))
+        if actual is not None:
+            commission = actual
+            estimated = False
+
+    fill = Fill(
+        order_id=order_id,
+        symbol=symbol,
+        side=order.get("side", ""),
+        position_side=order.get("positionSide"),
+        status=order.get("status", ""),
+        avg_price=avg_price,
+        executed_qty=executed_qty,
+        cum_quote=cum_quote,
+        commission=commission,
+        commission_estimated=estimated,
+        raw=order,
+    )
+    log_event(
+        logger, "fill", symbol=symbol, order_id=order_id, side=fill.side, position_side=fill.position_side,
+        status=fill.status, avg_price=avg_price, qty=executed_qty, commission=commission,
+        commission_estimated=estimated,
+    )
+    return fill
+
+
+def _usdt_commission(event: dict | None) -> float | None:
+    if event and event.get("status") == "FILLED" and event.get("commission_asset") in (None, "USDT"):
+        return event["commission"]
+    return None
+
+
+def settle_commission(fill: Fill) -> float:
+    """
+    추정 수수료로 만든 Fill을 그 사이 도착한 체결 이벤트의 실제값으로 갱신 (기다리지 않음).
+    청산 정산처럼 포지션 반영을 확인한 뒤 실수수료가 필요한 시점에 호출. 반환: 수수료(USDT)
+    """
+    if fill.commission_estimated and fill.order_id is not None:
+        actual = _usdt_commission(position_cache.get_fill(fill.order_id))
+        if actual is not None:
+            fill.commission = actual
+            fill.commission_estimated = False
+    return fill.commission
+
+
+def on_actual_commission(fill: Fill, fn) -> None:
+    """
+    추정 수수료로 기록한 진입 체결: 체결 이벤트가 도착하면 fn(실제 수수료)를 한 번 호출
+    (스트림이 없거나 이미 실제값이면 호출하지 않음)
+    """
+    if not fill.commission_estimated or fill.order_id is None or not position_cache.is_live():
+        return
+    def apply(event: dict) -> None:
+        actual = _usdt_commission(event)
+        if actual is not None:
+            fn(actual)
+
+    position_cache.on_fill(fill.order_id, apply)
+
+
+def _refetch_fill(client, symbol: str, order_id, executed_qty: float) -> tuple[float, float, float]:
+    try:
+        filled = client.futures_get_order(symbol=symbol, orderId=order_id)
+        avg = float(filled.get("avgPrice") or 0.0)
+        if avg > 0:
+            return avg, float(filled.get("executedQty") or executed_qty), float(filled.get("cumQuote") or 0.0)
+    except Exception as e:
+        logger.warning("[Fill] Failed to fetch avgPrice via orderId %s: %s", order_id, e)
+
+    mark = get_mark_price(client, symbol)
+    return mark, executed_qty, 0.0
@@ -0,0 +1,73 @@
+# app/services/pnl.py
+#
+# 청산 수익률 / 복리 규칙 (라이브 청산과 백테스트가 같은 식을 사용).
+# 상태(state)나 거래소에 의존하지 않는 순수 함수만 둔다.
+# 산술 연산만 쓰므로 entry/exit/leverage에 numpy 배열을 넣어도 그대로 동작한다.
+
+from app.config import FEE_RATE
+
+
+def price_change(entry_price, exit_price, long_exit: bool):
+    """가격 변화율 (레버리지 반영 전). 롱: exit/entry - 1, 숏: entry/exit - 1"""
+    if long_exit:
+        return exit_price / entry_price - 1.0
+    return entry_price / exit_price - 1.0
+
+
+def estimated_fee(leverage, fee_rate: float = FEE_RATE):
+    """실수수료를 모를 때 왕복 수수료 추정치 (증거금 대비): fee_rate * 레버리지 * 2"""
+    fee_per_side = fee_rate * leverage       # 한 쪽 수수료
+    return fee_per_side * 2                  # 진입 + 청산
+
+
+def exit_pnl(
+    entry_price: float,
+    exit_price: float,
+    position_qty: float,
+    leverage: int,
+    long_exit: bool,
+    entry_commission: float | None = None,
+    exit_commission: float | None = None,
+) -> tuple[float, float, float]:
+    """
+    청산 수익률 계산 (상태 변경 없음).
+        raw_pnl = 가격변화 × 레버리지
+        net_pnl = raw_pnl - (진입 수수료 + 청산 수수료) / 증거금
+    진입/청산 실제 수수료(USDT)를 모두 알면 실수수료 기준, 모르면 estimated_fee.
+    반환: (raw_pnl, total_fee, net_pnl) — 모두 증거금 대비 비율
+    """
+    # 레버리지 반영 (예: +1% * 5배 = +5%)
+    raw_pnl = price_change(entry_price, exit_price, long_exit) * leverage
+
+    margin = entry_price * position_qty / leverage
+    if exit_commission is not None and entry_commission is not None and margin > 0:
+        total_fee = (entry_commission + exit_commission) / margin   # 실제 체결 수수료
+    else:
+        total_fee = estimated_fee(leverage)
+    net_pnl = raw_pnl - total_fee            # 최종 수익률(배수 아님)
+    return raw_pnl, total_fee, net_pnl
+
+
+def realized_usdt(
+    entry_price: float,
+    exit_price: float,
+    qty: float,
+    long_exit: bool,
+    entry_commission: float | None = None,
+    exit_commission: float | None = None,
+    fee_rate: float = FEE_RATE,
+) -> tuple[float, float]:
+    """
+    체결 기준 실현손익(USDT): (청산가 - 진입가) × 수량 × 방향 - 진입 수수료 - 청산 수수료.
+    수수료를 모르는 쪽은 fee_rate × 체결금액 추정치. 반환: (실현손익, 수수료 합계)
+    """
+    gross = (exit_price - entry_price) * qty * (1.0 if long_exit else -1.0)
+    entry_fee = entry_commission if entry_commission is not None else entry_price * qty * fee_rate
+    exit_fee = exit_commission if exit_commission is not None else exit_price * qty * fee_rate
+    fees = entry_fee + exit_fee
+    return gross - fees, fees
+
+
+def compound(capital, net_pnl):
+    """복리 반영: capital × (1 + net_pnl) (use_initial_capital 프로필은 호출하지 않음)"""
+    return capital * (1.0 + net_pnl)
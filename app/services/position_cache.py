@@ -0,0 +1,185 @@
+# app/services/position_cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 보관할 최근 주문 체결 기록 수
+_FILL_KEEP = 2000
+
+
+class PositionCache:
+    """
+    User Data Stream 이벤트로 갱신되는 프로세스 내 포지션/체결 캐시.
+
+    - positions: (symbol, positionSide) -> {"qty", "entry_price", "unrealized_pnl", "updated_at"}
+      (one-way 모드는 positionSide="BOTH")
+    - fills: orderId -> {"status", "avg_price", "executed_qty", "commission", ...}
+    - 청산 확인은 wait_for()로 이벤트 도착 즉시 깨어남 (폴링 없음)
+    - on_fill(): 주문이 FILLED 되면 콜백 (추정 수수료 → 실제 수수료 보정용, 주문 경로는 기다리지 않음)
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._positions: dict[tuple[str, str], dict] = {}
+        self._symbol_updated: dict[str, float] = {}
+        self._fills: OrderedDict[int, dict] = OrderedDict()
+        self._fill_callbacks: OrderedDict[int, list] = OrderedDict()
+        self._live = False
+
+    # ── 스트림 상태 ──────────────────────────────────
+    def set_live(self, live: bool) -> None:
+        with self._cond:
+            self._live = live
+            self._cond.notify_all()
+
+    def is_live(self) -> bool:
+        return self._live
+
+    # ── 이벤트 반영 ──────────────────────────────────
+    def apply_account_update(self, event: dict) -> None:
+        now = time.time()
+        positions = event.get("a", {}).get("P", [])
+        with self._cond:
+            for p in positions:
+                symbol = p.get("s")
+                side = p.get("ps", "BOTH")
+                self._positions[(symbol, side)] = {
+                    "qty": float(p.get("pa", 0.0)),
+                    "entry_price": float(p.get("ep", 0.0)),
+                    "unrealized_pnl": float(p.get("up", 0.0)),
+                    "margin_type": p.get("mt"),
+                    "updated_at": now,
+                }
+                self._symbol_updated[symbol] = now
+            self._cond.notify_all()
+
+    def apply_order_update(self, event: dict) -> None:
+        o = event.get("o", {})
+        order_id = o.get("i")
+        if order_id is None:
+            return
+
+        with self._cond:
+            fill = self._fills.get(order_id)
+            if fill is None:
+                fill = {
+                    "symbol": o.get("s"),
+                    "side": o.get("S"),
+                    "position_side": o.get("ps"),
+                    "reduce_only": bool(o.get("R")),
+                    "commission": 0.0,
+                    "realized_pnl": 0.0,
+                }
+                self._fills[order_id] = fill
+                while len(self._fills) > _FILL_KEEP:
+                    self._fills.popitem(last=False)
+
+            fill["status"] = o.get("X")
+            fill["avg_price"] = float(o.get("ap", 0.0))
+            fill["executed_qty"] = float(o.get("z", 0.0))
+            # n/rp는 이번 체결분 값이므로 누적
+            if o.get("x") == "TRADE":
+                fill["commission"] += float(o.get("n", 0.0) or 0.0)
+                fill["commission_asset"] = o.get("N")
+                fill["realized_pnl"] += float(o.get("rp", 0.0) or 0.0)
+            fill["updated_at"] = time.time()
+            self._cond.notify_all()
+
+            callbacks = self._fill_callbacks.pop(order_id, ()) if fill["status"] == "FILLED" else ()
+            filled = dict(fill)
+
+        for fn in callbacks:
+            self._run_callback(fn, order_id, filled)
+
+    def on_fill(self, order_id, fn) -> None:
+        """
+        order_id가 FILLED 되면 fn(fill) 한 번 호출 (이미 FILLED면 바로 호출).
+        콜백은 이벤트를 반영한 스레드(스트림)에서 실행되므로 짧게 끝나야 함
+        """
+        with self._cond:
+            fill = self._fills.get(order_id)
+            if not fill or fill.get("status") != "FILLED":
+                self._fill_callbacks.setdefault(order_id, []).append(fn)
+                while len(self._fill_callbacks) > _FILL_KEEP:
+                    self._fill_callbacks.popitem(last=False)
+                return
+            filled = dict(fill)
+        self._run_callback(fn, order_id, filled)
+
+    @staticmethod
+    def _run_callback(fn, order_id, fill: dict) -> None:
+        try:
+            fn(fill)
+        except Exception:
+            logger.exception("[PositionCache] fill callback for order %s failed", order_id)
+
+    def seed_positions(self, positions: list[dict]) -> None:
+        """REST futures_position_information 결과로 캐시 초기화/보정"""
+        now = time.time()
+        with self._cond:
+            for p in positions:
+                symbol = p.get("symbol")
+                side = p.get("positionSide", "BOTH")
+                self._positions[(symbol, side)] = {
+                    "qty": float(p.get("positionAmt", 0.0)),
+                    "entry_price": float(p.get("entryPrice", 0.0)),
+                    "unrealized_pnl": float(p.get("unRealizedProfit", 0.0)),
+                    "margin_type": p.get("marginType"),
+                    "updated_at": now,
+                }
+                self._symbol_updated[symbol] = now
+            self._cond.notify_all()
+
+    # ── 조회 ────────────────────────────────────────
+    def side_amt(self, symbol: str, side: str) -> float:
+        pos = self._positions.get((symbol, side))
+        return pos["qty"] if pos else 0.0
+
+    def net_amt(self, symbol: str) -> float:
+        return sum(
+            pos["qty"] for (sym, _), pos in list(self._positions.items()) if sym == symbol
+        )
+
+    def get_fill(self, order_id) -> dict | None:
+        with self._cond:
+            fill = self._fills.get(order_id)
+            return dict(fill) if fill else None
+
+    def wait_for(self, symbol: str, predicate, timeout: float, since: float) -> bool:
+        """
+        since 이후에 도착한 symbol 포지션 이벤트 기준으로 predicate(cache)가 참이 될 때까지 대기.
+        스트림이 끊기거나 timeout이면 False (호출 측에서 REST로 확인)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if not self._live:
+                    return False
+                if self._symbol_updated.get(symbol, 0.0) >= since and predicate(self):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    def wait_for_fill(self, order_id, timeout: float) -> dict | None:
+        """주문이 FILLED 이벤트를 받을 때까지 대기 (수수료 확정용)"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                fill = self._fills.get(order_id)
+                if fill and fill.get("status") == "FILLED":
+                    return dict(fill)
+                remaining = deadline - time.monotonic()
+                if not self._live or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+
+# 프로세스 전역 캐시
+position_cache = PositionCache()
@@ -0,0 +1,103 @@
+# app/services/position_snapshot.py
+
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.services.position_cache import position_cache
+from app.services.account_config import leverage_cache
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_SIDES = ("LONG", "SHORT")
+
+
+class PositionSnapshot:
+    """
+    알림 1건 동안 쓰는 Hedge 포지션 스냅샷.
+
+    - fetch()로 futures_position_information 1회 조회
+    - 이후에는 REST 재조회 없이 주문 체결 결과(apply_entry / apply_close)로 직접 보정
+    - write_to_state()로 state["hedge"]에 반영
+    """
+
+    __slots__ = ("symbol", "sides")
+
+    def __init__(self, symbol: str, positions: list[dict]):
+        self.symbol = symbol
+        self.sides = {
+            side: {"qty": 0.0, "entry_price": 0.0, "unrealized_pnl": 0.0, "leverage": None, "margin_type": None}
+            for side in _SIDES
+        }
+        for p in positions:
+            if p.get("symbol") != symbol or p.get("positionSide") not in self.sides:
+                continue
+            self.sides[p["positionSide"]] = {
+                "qty": float(p.get("positionAmt", 0.0)),
+                "entry_price": float(p.get("entryPrice", 0.0)),
+                "unrealized_pnl": float(p.get("unRealizedProfit", 0.0)),
+                "leverage": int(p["leverage"]) if p.get("leverage") else None,
+                "margin_type": p.get("marginType"),
+            }
+
+    @classmethod
+    def fetch(cls, client, symbol: str) -> "PositionSnapshot":
+        positions = client.futures_position_information(symbol=symbol)
+        # 같은 결과로 이벤트 캐시도 보정 (추가 비용 없음)
+        position_cache.seed_positions(positions)
+        return cls.from_positions(symbol, positions)
+
+    @classmethod
+    def from_positions(cls, symbol: str, positions: list[dict]) -> "PositionSnapshot":
+        """이미 받아둔 positionRisk 결과로 생성 (배치 알림 prefetch)"""
+        snapshot = cls(symbol, positions)
+        leverage_cache.set(symbol, leverage=snapshot.leverage(), margin_type=snapshot.margin_type())
+        return snapshot
+
+    # ── 조회 ────────────────────────────────────────
+    def side_amt(self, side: str) -> float:
+        return self.sides[side]["qty"]
+
+    def any_open(self) -> bool:
+        return any(self.sides[side]["qty"] != 0.0 for side in _SIDES)
+
+    def leverage(self) -> int | None:
+        """거래소가 알려준 심볼 레버리지 (positionRisk에 없으면 None)"""
+        for side in _SIDES:
+            if self.sides[side]["leverage"]:
+                return self.sides[side]["leverage"]
+        return None
+
+    def margin_type(self) -> str | None:
+        for side in _SIDES:
+            if self.sides[side]["margin_type"]:
+                return self.sides[side]["margin_type"]
+        return None
+
+    # ── 체결 결과로 보정 ───────────────────────────────
+    def apply_entry(self, side: str, qty: float, price: float) -> None:
+        """추가 진입 체결분을 가중평균 진입가로 합산"""
+        s = self.sides[side]
+        old_qty = abs(s["qty"])
+        new_qty = old_qty + qty
+        if new_qty <= 0:
+            return
+        s["entry_price"] = (s["entry_price"] * old_qty + price * qty) / new_qty
+        s["qty"] = new_qty if side == "LONG" else -new_qty
+
+    def apply_close(self, side: str) -> None:
+        s = self.sides[side]
+        s["qty"] = 0.0
+        s["entry_price"] = 0.0
+        s["unrealized_pnl"] = 0.0
+
+    def write_to_state(self, state: dict) -> None:
+        now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+        for side in _SIDES:
+            s = self.sides[side]
+            target = state["hedge"][side.lower()]
+            target["qty"] = s["qty"]
+            target["entry_price"] = s["entry_price"]
+            target["unrealized_pnl"] = s["unrealized_pnl"]
+            target["update_time"] = now
@@ -0,0 +1,78 @@
+# app/services/prefetch.py
+
+import asyncio
+import logging
+import time
+
+from app.clients.binance_client import get_binance_client, async_client_available
+from app.services.symbol_rules import get_symbol_rules
+from app.services.position_cache import position_cache
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class MarketPrefetch:
+    """
+    배치 알림용 공유 데이터 (심볼 N개에 REST 2회).
+
+    - futures_position_information() 필터 없이 1회 → 전 심볼 포지션
+    - futures_mark_price() 심볼 없이 1회 → 전 심볼 마크가격
+    - 심볼 규칙은 캐시에서 확인 (없으면 exchange_info 1회 적재)
+    - fetch_async(): 이벤트 루프에서 비동기 Client로 두 조회를 동시에 await
+
+    심볼별 첫 작업에서만 사용하고, 그 뒤로는 각 서비스가 평소처럼 조회한다.
+    """
+
+    __slots__ = ("fetched_at", "_positions", "_marks")
+
+    def __init__(self, positions: list[dict], marks: list[dict]):
+        self.fetched_at = time.time()
+        self._positions: dict[str, list[dict]] = {}
+        for p in positions:
+            self._positions.setdefault(p.get("symbol"), []).append(p)
+        self._marks = {m["symbol"]: float(m["markPrice"]) for m in marks if m.get("markPrice")}
+
+    @classmethod
+    def fetch(cls, symbols: list[str], client=None) -> "MarketPrefetch":
+        client = client or get_binance_client()
+        cls._load_rules(symbols)
+        positions = client.futures_position_information()
+        marks = client.futures_mark_price()
+        position_cache.seed_positions(positions)
+        return cls(positions, marks)
+
+    @classmethod
+    async def fetch_async(cls, symbols: list[str]) -> "MarketPrefetch":
+        """
+        fetch()의 비동기 버전 (배치 웹훅 핸들러에서 await).
+        포지션 / 마크가격은 aiohttp Client로 동시에, 심볼 규칙 적재(동기)는 스레드에서 함께 진행.
+        비동기 Client를 못 쓰는 환경(인프로세스 가짜 거래소 등)이면 fetch()를 스레드에서 실행.
+        """
+        if not async_client_available():
+            return await asyncio.to_thread(cls.fetch, symbols)
+
+        client = await get_binance_client(async_=True)
+        positions, marks, _ = await asyncio.gather(
+            client.futures_position_information(),
+            client.futures_mark_price(),
+            asyncio.to_thread(cls._load_rules, symbols),
+        )
+        position_cache.seed_positions(positions)
+        return cls(positions, marks)
+
+    @staticmethod
+    def _load_rules(symbols: list[str]) -> None:
+        # 규칙 캐시가 비었거나 만료면 여기서 한 번만 적재 (알 수 없는 심볼은 주문 단계에서 400)
+        for symbol in symbols:
+            try:
+                get_symbol_rules(symbol)
+            except Exception as e:
+                logger.warning("[Prefetch] No symbol rules for %s: %s", symbol, e)
+
+    def positions(self, symbol: str) -> list[dict]:
+        """positionRisk 형식 행 (열린 포지션이 없으면 빈 리스트)"""
+        return self._positions.get(symbol, [])
+
+    def mark_price(self, symbol: str) -> float | None:
+        return self._marks.get(symbol)
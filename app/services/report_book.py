@@ -0,0 +1,184 @@
+# app/services/report_book.py
+
+import json
+import secrets
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+
+def period_date(now: datetime | None = None) -> str:
+    """리포트 기준일 (Asia/Seoul 09:00 기준으로 하루가 바뀜)"""
+    now = now or datetime.now(ZoneInfo("Asia/Seoul"))
+    if now.hour >= 9:
+        return now.strftime("%Y-%m-%d")
+    prev = now - timedelta(days=1)
+    return prev.strftime("%Y-%m-%d")
+
+
+def cumulative_return(current_capital: float, initial_capital: float) -> float:
+    if initial_capital == 0:
+        return 0.0
+    return round(((current_capital / initial_capital) - 1.0) * 100, 2)
+
+
+def _render(content) -> bytes:
+    # JSONResponse.render와 같은 직렬화 (캐시한 bytes를 그대로 응답)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match 헤더가 etag와 일치하는지 (RFC 9110 약한 비교).
+    - 쉼표로 구분된 여러 ETag, W/ 접두어, "*" 처리
+    """
+    if not if_none_match:
+        return False
+    target = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == target:
+            return True
+    return False
+
+
+# 집계 대상 원시 값 순서: trades, long, short, capital, initial_capital, daily_pnl
+_FIELDS = 6
+
+
+class ReportBook:
+    """
+    profile별 리포트 행/집계 캐시.
+
+    - save_state(상태 변경 후 항상 호출)마다 해당 profile:symbol 행 하나만 다시 만들고
+      profile 집계는 이전 행 값을 빼고 새 값을 더하는 식으로 갱신 (전체 재계산 없음)
+    - 값이 바뀔 때만 버전 증가 → ETag = 부팅 nonce + 버전 + 기준일, 변경이 없으면 304
+      (버전 카운터는 재시작하면 0부터 다시 세므로 nonce로 이전 프로세스의 ETag와 구분)
+    - /report?all=true 응답 본문은 profile 버전별로 한 번만 직렬화해서 재사용
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boot = secrets.token_hex(4)                  # 프로세스(인스턴스)별 ETag 접두어
+        self._rows: dict[str, dict[str, dict]] = {}        # profile → symbol → 행 (period 제외)
+        self._raw: dict[str, dict[str, tuple]] = {}        # profile → symbol → 집계용 원시 값
+        self._totals: dict[str, list[float]] = {}          # profile → 원시 값 합계
+        self._versions: dict[str, int] = {}                # profile → 버전
+        self._row_versions: dict[tuple[str, str], int] = {}
+        self._version = 0                                  # 전체 버전 (summary)
+        self._rendered: dict[str, tuple[str, bytes]] = {}  # profile → (etag, 본문)
+        self._summary: tuple[str, dict] | None = None
+
+    # ── 갱신 ────────────────────────────────────────
+    def update(self, profile: str, symbol: str, state: dict) -> None:
+        capital = float(state.get("capital", 0.0))
+        initial = float(state.get("initial_capital", 1.0))
+        raw = (
+            int(state.get("trade_count", 0)),
+            int(state.get("long_count", 0)),
+            int(state.get("short_count", 0)),
+            capital,
+            initial,
+            float(state.get("daily_pnl", 0.0)),
+        )
+        row = {
+            "total_trades":     raw[0],
+            "long_entries":     raw[1],
+            "short_entries":    raw[2],
+            "현재_자본($)":     round(capital, 2),
+            "복리_수익률(%)":    cumulative_return(capital, initial),
+            "daily_pnl(%)":     round(raw[5], 2),
+            "initial_capital":  round(initial, 2),
+            "last_reset":       state.get("last_reset", None),
+        }
+
+        with self._lock:
+            rows = self._rows.setdefault(profile, {})
+            raws = self._raw.setdefault(profile, {})
+            if raws.get(symbol) == raw and rows.get(symbol) == row:
+                return  # 변경 없음 → ETag 유지
+
+            totals = self._totals.setdefault(profile, [0.0] * _FIELDS)
+            old = raws.get(symbol)
+            for i in range(_FIELDS):
+                totals[i] += raw[i] - (old[i] if old is not None else 0.0)
+
+            rows[symbol] = row
+            raws[symbol] = raw
+            self._version += 1
+            self._versions[profile] = self._version
+            self._row_versions[(profile, symbol)] = self._version
+
+    # ── 조회 ────────────────────────────────────────
+    def symbols(self, profile: str) -> list[str]:
+        with self._lock:
+            return list(self._rows.get(profile, {}))
+
+    def report(self, profile: str, symbol: str, period: str) -> tuple[str, dict] | None:
+        """단일 심볼 리포트 (etag, 본문), 없으면 None"""
+        with self._lock:
+            row = self._rows.get(profile, {}).get(symbol)
+            if row is None:
+                return None
+            etag = f'"{self._boot}-{profile}:{symbol}-{self._row_versions[(profile, symbol)]}-{period}"'
+        return etag, {"profile": profile, "symbol": symbol, "period": period, **row}
+
+    def report_all(self, profile: str, period: str) -> tuple[str, bytes, int]:
+        """profile 전체 리포트 (etag, 직렬화된 본문, 심볼 수) — 버전이 같으면 캐시 재사용"""
+        with self._lock:
+            rows = self._rows.get(profile, {})
+            etag = f'"{self._boot}-{profile}-{self._versions.get(profile, 0)}-{period}"'
+            cached = self._rendered.get(profile)
+            if cached is not None and cached[0] == etag:
+                return etag, cached[1], len(rows)
+
+            reports = [
+                {"profile": profile, "symbol": sym, "period": period, **row}
+                for sym, row in rows.items()
+            ]
+            body = _render({"profile": profile, "reports": reports})
+            self._rendered[profile] = (etag, body)
+            return etag, body, len(rows)
+
+    def summary(self, period: str) -> tuple[str, dict]:
+        """profile별 집계 + 전체 합계 (etag, 본문) — O(profile 수)"""
+        with self._lock:
+            etag = f'"{self._boot}-summary-{self._version}-{period}"'
+            if self._summary is not None and self._summary[0] == etag:
+                return self._summary
+
+            profiles = {p: self._aggregate(len(self._rows[p]), t) for p, t in self._totals.items()}
+            grand = [sum(t[i] for t in self._totals.values()) for i in range(_FIELDS)]
+            body = {
+                "period": period,
+                "profiles": profiles,
+                "total": self._aggregate(sum(len(r) for r in self._rows.values()), grand),
+            }
+            self._summary = (etag, body)
+            return self._summary
+
+    @staticmethod
+    def _aggregate(count: int, totals: list[float]) -> dict:
+        trades, longs, shorts, capital, initial, daily = totals
+        return {
+            "symbols":          count,
+            "total_trades":     int(trades),
+            "long_entries":     int(longs),
+            "short_entries":    int(shorts),
+            "현재_자본($)":     round(capital, 2),
+            "initial_capital":  round(initial, 2),
+            "복리_수익률(%)":    cumulative_return(capital, initial),
+            "daily_pnl_sum(%)": round(daily, 2),
+            "daily_pnl_avg(%)": round(daily / count, 2) if count else 0.0,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "profiles": len(self._rows),
+                "symbols": sum(len(r) for r in self._rows.values()),
+                "version": self._version,
+            }
+
+
+report_book = ReportBook()
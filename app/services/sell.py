@@ -1,36 +1,45 @@
+import functools
 import logging
-import math
-from fastapi import HTTPException
-from binance.enums import SIDE_SELL, ORDER_TYPE_MARKET
+from binance.enums import SIDE_SELL
 from binance.exceptions import BinanceAPIException
 from app.clients.binance_client import get_binance_client
-from app.config import DRY_RUN, TRADE_LEVERAGE, BUY_PCT
+from app.clients.mark_price_stream import get_mark_price
+from app.config import DRY_RUN, TRADE_LEVERAGE
 from app.state import get_state
+from app.services.sizing import entry_quantity
+from app.services.order_gateway import submit_market_order, on_actual_commission
+from app.services.account_config import ensure_leverage
+from app.metrics import timed, span
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+@timed("sell.total")
 def execute_sell(
     symbol: str,
     leverage: int | None = None,
     use_initial_capital: bool = False,
-    profile : str = "webhook1"
+    profile : str = "webhook1",
+    mark_price: float | None = None,
 ) -> dict:
     """
     - use_initial_capital=True: state['initial_capital'] 기준 사이징 (/webhook2,3)
     - use_initial_capital=False: state['capital'] 기준 사이징(복리, /webhook)
     - profile: "webhook1" | "webhook2" | "webhook3"
+    - mark_price: 배치 알림에서 미리 받아둔 마크가격 (없으면 REST 조회)
     """
     client = get_binance_client()
     state = get_state(symbol, profile)
 
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] SELL {symbol}")
+        logger.info("[DRY_RUN] SELL %s", symbol)
         return {"skipped": "dry_run"}
 
     # 레버리지 설정 (우선순위: 인자 > 글로벌 설정)
     leverage_to_use = leverage or TRADE_LEVERAGE
-    client.futures_change_leverage(symbol=symbol, leverage=leverage_to_use)
+    # 거래소 값과 같으면 호출 생략 (레버리지 캐시)
+    with span("sell.leverage"):
+        ensure_leverage(client, symbol, leverage_to_use)
 
     # ⬇️ 핵심: 사이징 기준 자본 선택
     base_capital = (
@@ -40,55 +49,23 @@ def execute_sell(
     )
     
     # 수량 계산
-    mark_price = float(client.futures_mark_price(symbol=symbol)["markPrice"])
-    allocation = base_capital * BUY_PCT * leverage_to_use
-    raw_qty = allocation / mark_price
+    if mark_price is None:
+        mark_price = get_mark_price(client, symbol)
 
-    # 거래소 LOT_SIZE 규칙에 맞춰 수량 보정
-    info = client.futures_exchange_info()
-    sym_info = next(s for s in info["symbols"] if s["symbol"] == symbol)
-    lot_f = next(f for f in sym_info["filters"] if f["filterType"] == "LOT_SIZE")
-    step = float(lot_f["stepSize"])
-    min_qty = float(lot_f["minQty"])
-    qty_prec = int(round(-math.log10(step), 0)) if step > 0 else 0
+    # 거래소 LOT_SIZE / MIN_NOTIONAL 규칙에 맞춰 수량 보정 (캐시된 심볼 규칙 사용)
+    qty, qty_str = entry_quantity(symbol, base_capital, leverage_to_use, mark_price)
 
-    qty = math.floor(raw_qty / step) * step
-    if qty < min_qty:
-        raise HTTPException(status_code=400, detail=f"Qty {qty} < minQty {min_qty}")
-
-    qty_str = f"{qty:.{qty_prec}f}"
-
-    # 시장가 숏 진입
-    order = client.futures_create_order(
-        symbol=symbol,
-        side=SIDE_SELL,
-        type=ORDER_TYPE_MARKET,
-        quantity=qty_str
-    )
-
-    # 주문 상세 재조회 → avgPrice 보정
-    order_id = order.get("orderId")
-    try:
-        filled_order = client.futures_get_order(symbol=symbol, orderId=order_id)
-        entry = float(filled_order.get("avgPrice") or mark_price)
-    except Exception as e:
-        logger.warning(f"[SELL] Failed to fetch avgPrice via orderId {order_id}: {e}")
-        entry = mark_price
+    # 시장가 숏 진입 (RESULT 응답으로 체결가/수량/수수료 한 번에 확보)
+    fill = submit_market_order(client, symbol, SIDE_SELL, qty_str)
+    entry = fill.avg_price or mark_price
+    qty = fill.executed_qty or qty
 
     logger.info(
-        f"[SELL] {profile}:{symbol} {qty}@{entry} "
-        f"(base={'initial_capital' if use_initial_capital else 'capital'})"
+        "[SELL] %s:%s %s@%s (base=%s)",
+        profile, symbol, qty, entry, "initial_capital" if use_initial_capital else "capital",
     )
 
-    # 상태 저장 (진입 정보 및 카운트)
-    state.update({
-        "entry_price":   entry,
-        "position_qty":  -qty,
-        "current_price": entry,
-        "position_side": "short",
-        "leverage":      leverage_to_use,
-        "short_count":   state.get("short_count", 0) + 1,
-        "trade_count":   state.get("trade_count", 0) + 1
-    })
-
-    return {"sell": {"filled": qty, "entry": entry}}
\ No newline at end of file
+    # 상태 저장 (진입 정보 및 카운트), 추정 수수료면 체결 이벤트 도착 시 실제값으로 보정
+    recorded = state.record_entry(False, entry, qty, leverage_to_use, fill.commission, fill.order_id)
+    on_actual_commission(fill, functools.partial(state.correct_entry_commission, fill.order_id))
+    return {"sell": recorded}
\ No newline at end of file
@@ -0,0 +1,13 @@
+# app/services/sizing.py
+
+from app.config import BUY_PCT
+from app.services.symbol_rules import round_qty
+
+
+def entry_quantity(symbol: str, base_capital: float, leverage: int, mark_price: float) -> tuple[float, str]:
+    """
+    진입 수량 = base_capital * BUY_PCT * leverage / mark_price
+    (LOT_SIZE / MIN_NOTIONAL 보정 포함, 반환: (qty, 주문용 문자열))
+    """
+    allocation = base_capital * BUY_PCT * leverage
+    return round_qty(symbol, allocation / mark_price, mark_price)
@@ -1,51 +1,260 @@
+import dataclasses
+import functools
 import logging
 import time
 from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
 from app.clients.binance_client import get_binance_client
-from app.config import DRY_RUN, POLL_INTERVAL, MAX_WAIT, FEE_RATE
+from app.clients.mark_price_stream import get_mark_price
+from app.config import DRY_RUN, POLL_INTERVAL, MAX_WAIT, TRADE_LEVERAGE, REVERSAL_MODE
 from app.services.buy import execute_buy
 from app.services.sell import execute_sell
 from app.state import get_state
+from app.services.position_cache import position_cache
+from app.services.open_orders import open_order_book, cancel_orders_bulk
+from app.services.order_gateway import submit_market_order, parse_fill, settle_commission, on_actual_commission, Fill
+from app.services.account_config import ensure_leverage, account_config
+from app.services.sizing import entry_quantity
+from app.services.pnl import exit_pnl, compound
+from app.services.locks import lock_manager
+from app.services.symbol_rules import get_symbol_rules
+from app.metrics import timed
+from app.logs import log_event
+from app.trade_ledger import trade_ledger
+from app.services.prefetch import MarketPrefetch
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def _wait_for(symbol: str, target_amt: float) -> bool:
-    client = get_binance_client()
+def _target_reached(current: float, target_amt: float) -> bool:
+    if target_amt > 0 and current > 0:
+        return True
+    if target_amt < 0 and current < 0:
+        return True
+    if target_amt == 0 and current == 0:
+        return True
+    return False
+
+
+@timed("switch.wait_for")
+def _wait_for(symbol: str, target_amt: float, since: float | None = None) -> bool:
+    """
+    포지션이 target_amt 방향(0이면 청산)에 도달할 때까지 대기.
+    - User Data Stream이 살아 있으면 since(주문 전송 시각) 이후 이벤트로 즉시 확인
+    - 스트림이 없거나 끊기면 남은 시간 동안 REST 폴링
+    """
     start = time.time()
-    while time.time() - start < MAX_WAIT:
+
+    if since is not None and position_cache.is_live():
+        if position_cache.wait_for(
+            symbol,
+            lambda cache: _target_reached(cache.net_amt(symbol), target_amt),
+            MAX_WAIT,
+            since,
+        ):
+            return True
+
+    client = get_binance_client()
+    while True:
         positions = client.futures_position_information(symbol=symbol)
         current = next(
             (float(p["positionAmt"]) for p in positions if p["symbol"] == symbol),
             0.0
         )
-        if target_amt > 0 and current > 0:
-            return True
-        if target_amt < 0 and current < 0:
-            return True
-        if target_amt == 0 and current == 0:
+        if _target_reached(current, target_amt):
             return True
+        if time.time() - start >= MAX_WAIT:
+            break
         time.sleep(POLL_INTERVAL)
-    logger.warning(f"Switch timeout: target {target_amt}, current {current}")
+    logger.warning("Switch timeout: target %s, current %s", target_amt, current)
     return False
 
 
+@timed("switch.cancel_reduceonly")
 def _cancel_open_reduceonly_orders(symbol: str):
+    """
+    reduceOnly 미체결 주문 일괄 취소.
+    - User Data Stream으로 유지되는 미체결 장부가 있으면 REST 조회 생략, 취소할 게 없으면 호출 0회
+    - 취소는 multi-order cancel로 10개씩 묶어서 전송
+    """
     client = get_binance_client()
-    open_orders = client.futures_get_open_orders(symbol=symbol)
-    for order in open_orders:
-        if order.get("reduceOnly"):
-            client.futures_cancel_order(symbol=symbol, orderId=order["orderId"])
-            logger.info(f"[Cleanup] Canceled reduceOnly order {order['orderId']}")
+    order_ids = open_order_book.reduce_only_ids(symbol)
+    if order_ids is None:
+        open_orders = client.futures_get_open_orders(symbol=symbol)
+        open_order_book.seed(symbol, open_orders)
+        order_ids = [o["orderId"] for o in open_orders if o.get("reduceOnly")]
+
+    if not order_ids:
+        open_order_book.skipped += 1
+        return
+
+    canceled = cancel_orders_bulk(client, symbol, order_ids)
+    logger.info("[Cleanup] Canceled %s/%s reduceOnly orders on %s", canceled, len(order_ids), symbol)
+
+
+def _split_fill(fill: Fill, close_qty: float) -> tuple[Fill, Fill]:
+    """순수량(net) 주문 체결 1건을 청산분 / 진입분으로 나눔 (수수료는 수량 비례)"""
+    executed = fill.executed_qty
+    close_part = min(close_qty, executed)
+    entry_part = executed - close_part
+    ratio = close_part / executed if executed > 0 else 1.0
+
+    close = dataclasses.replace(
+        fill,
+        executed_qty=close_part,
+        cum_quote=fill.avg_price * close_part,
+        commission=fill.commission * ratio,
+    )
+    entry = dataclasses.replace(
+        fill,
+        executed_qty=entry_part,
+        cum_quote=fill.avg_price * entry_part,
+        commission=fill.commission - close.commission,
+    )
+    return close, entry
+
+
+def _submit_reversal_batch(
+    client, symbol: str, side: str, close_str: str, entry_str: str
+) -> tuple[Fill, Fill] | None:
+    """
+    batchOrders 1회로 [reduceOnly 청산, 반대 방향 진입] 전송 후 다리(leg)별 체결 파싱.
+    배치 내 주문 처리 순서는 보장되지 않으므로, 진입이 먼저 체결돼 reduceOnly가
+    거부된 경우에는 같은 수량을 한 번 더 보내 목표 수량을 맞춘다.
+    두 다리 모두 거부되면(체결 없음) None → 호출 측이 기존 순차 방식으로 진행
+    """
+    orders = [
+        {"symbol": symbol, "side": side, "type": ORDER_TYPE_MARKET, "quantity": close_str,
+         "reduceOnly": "true", "newOrderRespType": "RESULT"},
+        {"symbol": symbol, "side": side, "type": ORDER_TYPE_MARKET, "quantity": entry_str,
+         "newOrderRespType": "RESULT"},
+    ]
+    close_raw, entry_raw = client.futures_place_batch_order(batchOrders=orders)
+
+    if "code" in entry_raw:
+        if "code" in close_raw:
+            logger.warning(
+                "[Reversal] %s batch rejected (%s / %s), falling back to sequential",
+                symbol, close_raw.get('msg'), entry_raw.get('msg'),
+            )
+            return None
+        # 청산만 체결 → 진입은 단건으로 재시도
+        logger.warning("[Reversal] %s entry leg rejected (%s), resubmitting", symbol, entry_raw.get('msg'))
+        return parse_fill(client, symbol, close_raw), submit_market_order(client, symbol, side, entry_str)
+
+    entry = parse_fill(client, symbol, entry_raw)
+    if "code" in close_raw:
+        logger.warning("[Reversal] %s close leg rejected (%s), topping up", symbol, close_raw.get('msg'))
+        return submit_market_order(client, symbol, side, close_str), entry
+    return parse_fill(client, symbol, close_raw), entry
+
+
+@timed("switch.reversal")
+def _reverse_position(
+    client,
+    symbol: str,
+    action: str,
+    current_amt: float,
+    profile: str,
+    leverage: int | None,
+    use_initial_capital: bool,
+    mark_price: float | None = None,
+) -> dict | None:
+    """
+    REVERSAL_MODE=batch | net: 청산 + 반대 진입을 한 번의 요청으로 처리 (반전 구간 최소화).
+    - batch: futures_place_batch_order로 두 주문을 동시에 전송
+    - net  : One-way 모드에서만, |현재수량| + 진입수량 단일 주문 (Hedge 모드면 batch로 대체)
+    진입 수량은 청산 전에 정해야 하므로, 복리 프로필은 마크가격 기준 청산 후 자본 추정치로 계산.
+    주문 전 단계에서 실패하면 None → 호출 측이 기존 순차 방식으로 진행
+    """
+    state = get_state(symbol, profile)
+    side = SIDE_BUY if action == "BUY" else SIDE_SELL
+    long_exit = current_amt > 0
+    close_qty = abs(current_amt)
+    leverage_to_use = leverage or TRADE_LEVERAGE
+
+    try:
+        ensure_leverage(client, symbol, leverage_to_use)
+        if mark_price is None:
+            mark_price = get_mark_price(client, symbol)
+
+        if use_initial_capital:
+            base_capital = state.get("initial_capital", 0.0)
+        else:
+            _, _, est_pnl = exit_pnl(
+                state.get("entry_price", 0.0) or mark_price, mark_price, close_qty,
+                state.get("leverage", 1), long_exit,
+            )
+            base_capital = state.get("capital", 0.0) * (1.0 + est_pnl)
+        qty, qty_str = entry_quantity(symbol, base_capital, leverage_to_use, mark_price)
 
+        mode = REVERSAL_MODE
+        if mode == "net" and account_config.dual_side(client):
+            mode = "batch"
+    except Exception as e:
+        logger.warning("[Reversal] %s:%s falling back to sequential: %s", profile, symbol, e)
+        return None
+
+    precision = get_symbol_rules(symbol).qty_precision
+    close_str = f"{close_qty:.{precision}f}"
+
+    sent_at = time.time()
+    if mode == "net":
+        fill = submit_market_order(client, symbol, side, f"{close_qty + qty:.{precision}f}")
+        close_fill, entry_fill = _split_fill(fill, close_qty)
+    else:
+        legs = _submit_reversal_batch(client, symbol, side, close_str, qty_str)
+        if legs is None:
+            return None
+        close_fill, entry_fill = legs
+
+    entry_qty = entry_fill.executed_qty or qty
+    _wait_for(symbol, entry_qty if action == "BUY" else -entry_qty, since=sent_at)
+    _cancel_open_reduceonly_orders(symbol)
+
+    # 포지션 반영 확인 후: 그 사이 도착한 체결 이벤트의 실제 수수료로 교체 (net은 한 주문을 다시 나눔)
+    if mode == "net":
+        settle_commission(fill)
+        close_fill, entry_fill = _split_fill(fill, close_qty)
+    else:
+        settle_commission(close_fill)
+        settle_commission(entry_fill)
+
+    pnl_percent = _update_capital_after_exit(
+        symbol,
+        long_exit=long_exit,
+        exit_price=close_fill.avg_price,
+        exit_commission=close_fill.commission,
+        profile=profile,
+        use_initial_capital=use_initial_capital,
+    )
+    # net 주문의 진입분은 주문 id로 실제 수수료를 나눌 수 없으므로 보정 대상에서 제외
+    entry_order_id = entry_fill.order_id if mode != "net" else None
+    entry = state.record_entry(
+        action == "BUY", entry_fill.avg_price or mark_price, entry_qty, leverage_to_use, entry_fill.commission,
+        entry_order_id,
+    )
+    if entry_order_id is not None:
+        on_actual_commission(entry_fill, functools.partial(state.correct_entry_commission, entry_order_id))
+    logger.info(
+        "[Reversal:%s] %s:%s closed %s@%s → %s %s@%s",
+        mode, profile, symbol, close_qty, close_fill.avg_price, action, entry_qty, entry["entry"],
+    )
+    return {
+        action.lower(): entry,
+        "close": {"exit_price": close_fill.avg_price, "pnl": pnl_percent},
+        "reversal_mode": mode,
+    }
 
+
+@timed("switch.total")
 def switch_position(
     symbol: str,
     action: str,
     profile: str = "webhook1",
     leverage: int | None = None,
     use_initial_capital: bool = False,  # ← /webhook2 전용 플래그
+    prefetch: MarketPrefetch | None = None,
 ) -> dict:
     """
     profile 단위로 상태 분리:
@@ -56,15 +265,21 @@ def switch_position(
     use_initial_capital=True 이면:
       - 포지션 사이징 시 initial_capital만 사용
       - 청산 후 capital 갱신(복리) 금지
+
+    prefetch가 있으면 포지션/마크가격을 REST 대신 배치 prefetch 결과로 사용
     """
     client = get_binance_client()
     state = get_state(symbol, profile)
 
     if DRY_RUN:
-        logger.info(f"[DRY_RUN] switch_position {action} {symbol}")
+        logger.info("[DRY_RUN] switch_position %s %s", action, symbol)
         return {"skipped": "dry_run"}
 
-    positions = client.futures_position_information(symbol=symbol)
+    if prefetch is not None:
+        positions = prefetch.positions(symbol)
+    else:
+        positions = client.futures_position_information(symbol=symbol)
+    mark_price = prefetch.mark_price(symbol) if prefetch is not None else None
     current_amt = next(
         (float(p["positionAmt"]) for p in positions if p["symbol"] == symbol),
         0.0
@@ -73,48 +288,42 @@ def switch_position(
     # === BUY_STOP : 롱 청산 ===
     if action.upper() == "BUY_STOP" and current_amt > 0:
         _cancel_open_reduceonly_orders(symbol)
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_SELL,
-            type=ORDER_TYPE_MARKET,
-            quantity=abs(current_amt),
-            reduceOnly=True
+        sent_at = time.time()
+        fill = submit_market_order(
+            client, symbol, SIDE_SELL, abs(current_amt), reduceOnly=True
         )
-        _wait_for(symbol, 0.0)
+        _wait_for(symbol, 0.0, since=sent_at)
         _cancel_open_reduceonly_orders(symbol)
 
-        exit_price = _get_exit_price(client, symbol, order)
         pnl_percent = _update_capital_after_exit(
             symbol, 
             long_exit=True, 
-            exit_price=exit_price,
+            exit_price=fill.avg_price,
+            exit_commission=settle_commission(fill),
             profile=profile,
             use_initial_capital=use_initial_capital
         )
-        return {"done": "buy_stop", "exit_price": exit_price, "pnl": pnl_percent}
+        return {"done": "buy_stop", "exit_price": fill.avg_price, "pnl": pnl_percent}
 
     # === SELL_STOP : 숏 청산 ===
     if action.upper() == "SELL_STOP" and current_amt < 0:
         _cancel_open_reduceonly_orders(symbol)
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_BUY,
-            type=ORDER_TYPE_MARKET,
-            quantity=abs(current_amt),
-            reduceOnly=True
+        sent_at = time.time()
+        fill = submit_market_order(
+            client, symbol, SIDE_BUY, abs(current_amt), reduceOnly=True
         )
-        _wait_for(symbol, 0.0)
+        _wait_for(symbol, 0.0, since=sent_at)
         _cancel_open_reduceonly_orders(symbol)
 
-        exit_price = _get_exit_price(client, symbol, order)
         pnl_percent = _update_capital_after_exit(
             symbol,
             long_exit=False,
-            exit_price=exit_price,
+            exit_price=fill.avg_price,
+            exit_commission=settle_commission(fill),
             profile=profile,
             use_initial_capital=use_initial_capital
         )
-        return {"done": "sell_stop", "exit_price": exit_price, "pnl": pnl_percent}
+        return {"done": "sell_stop", "exit_price": fill.avg_price, "pnl": pnl_percent}
 
     # === BUY : 롱 진입(필요 시 숏 청산 후 스위치) ===
     if action.upper() == "BUY":
@@ -123,23 +332,28 @@ def switch_position(
 
         _cancel_open_reduceonly_orders(symbol)
 
+        if current_amt < 0 and REVERSAL_MODE != "sequential":
+            # 숏 청산 + 롱 진입을 한 번의 요청으로 (실패 시 기존 순차 방식)
+            res = _reverse_position(
+                client, symbol, "BUY", current_amt, profile, leverage, use_initial_capital, mark_price
+            )
+            if res is not None:
+                return res
+
         if current_amt < 0:
             # 먼저 숏 청산
-            order = client.futures_create_order(
-                symbol=symbol,
-                side=SIDE_BUY,
-                type=ORDER_TYPE_MARKET,
-                quantity=abs(current_amt),
-                reduceOnly=True
+            sent_at = time.time()
+            fill = submit_market_order(
+                client, symbol, SIDE_BUY, abs(current_amt), reduceOnly=True
             )
-            _wait_for(symbol, 0.0)
+            _wait_for(symbol, 0.0, since=sent_at)
             _cancel_open_reduceonly_orders(symbol)
 
-            exit_price = _get_exit_price(client, symbol, order)
             _update_capital_after_exit(
                 symbol,
                 long_exit=False,
-                exit_price=exit_price,
+                exit_price=fill.avg_price,
+                exit_commission=settle_commission(fill),
                 profile=profile,
                 use_initial_capital=use_initial_capital
             )
@@ -149,7 +363,8 @@ def switch_position(
             symbol,
             leverage=leverage,
             use_initial_capital=use_initial_capital,
-            profile=profile
+            profile=profile,
+            mark_price=mark_price,
         )
 
     # === SELL : 숏 진입(필요 시 롱 청산 후 스위치) ===
@@ -159,23 +374,28 @@ def switch_position(
 
         _cancel_open_reduceonly_orders(symbol)
 
+        if current_amt > 0 and REVERSAL_MODE != "sequential":
+            # 롱 청산 + 숏 진입을 한 번의 요청으로 (실패 시 기존 순차 방식)
+            res = _reverse_position(
+                client, symbol, "SELL", current_amt, profile, leverage, use_initial_capital, mark_price
+            )
+            if res is not None:
+                return res
+
         if current_amt > 0:
             # 먼저 롱 청산
-            order = client.futures_create_order(
-                symbol=symbol,
-                side=SIDE_SELL,
-                type=ORDER_TYPE_MARKET,
-                quantity=current_amt,
-                reduceOnly=True
+            sent_at = time.time()
+            fill = submit_market_order(
+                client, symbol, SIDE_SELL, current_amt, reduceOnly=True
             )
-            _wait_for(symbol, 0.0)
+            _wait_for(symbol, 0.0, since=sent_at)
             _cancel_open_reduceonly_orders(symbol)
 
-            exit_price = _get_exit_price(client, symbol, order)
             _update_capital_after_exit(
                 symbol,
                 long_exit=True,
-                exit_price=exit_price,
+                exit_price=fill.avg_price,
+                exit_commission=settle_commission(fill),
                 profile=profile,
                 use_initial_capital=use_initial_capital
             )
@@ -185,25 +405,18 @@ def switch_position(
             symbol,
             leverage=leverage,
             use_initial_capital=use_initial_capital,
-            profile=profile
+            profile=profile,
+            mark_price=mark_price,
         )
 
-    logger.error(f"Unknown action for switch: {action}")
+    logger.error("Unknown action for switch: %s", action)
     return {"skipped": "unknown_action"}
 
 
-def _get_exit_price(client, symbol: str, order: dict) -> float:
-    """주문 ID 기반으로 청산 평균 체결가(avgPrice) 조회"""
-    order_id = order.get("orderId")
-    try:
-        filled_order = client.futures_get_order(symbol=symbol, orderId=order_id)
-        return float(
-            filled_order.get("avgPrice")
-            or client.futures_mark_price(symbol=symbol)["markPrice"]
-        )
-    except Exception as e:
-        logger.warning(f"[Exit] Failed to fetch avgPrice: {e}")
-        return float(client.futures_mark_price(symbol=symbol)["markPrice"])
+# 청산 정산이 읽고 바꾸는 state 필드
+_EXIT_FIELDS = (
+    "entry_price", "position_qty", "leverage", "entry_commission", "entry_order_id", "entry_time", "capital", "daily_pnl",
+)
 
 
 def _update_capital_after_exit(
@@ -211,13 +424,16 @@ def _update_capital_after_exit(
     long_exit: bool,
     exit_price: float,
     profile: str = "webhook1",
-    use_initial_capital: bool = False
+    use_initial_capital: bool = False,
+    exit_commission: float | None = None,
 ) -> float:
     """
     포지션 청산 후 PnL 계산 및 상태 업데이트.
     - 수익률 계산 시 거래 수수료 포함:
         raw_pnl = (가격변화 × 레버리지)
-        net_pnl = raw_pnl - (FEE_RATE * 레버리지 * 2)   # 왕복 수수료
+        net_pnl = raw_pnl - (진입 수수료 + 청산 수수료) / 증거금
+      진입/청산 실제 수수료(USDT)를 모두 알면 실수수료 기준,
+      모르면 기존 추정식 (FEE_RATE * 레버리지 * 2) 사용
 
     - use_initial_capital=True:
         capital 미변경(복리 금지), PnL/로그만 기록
@@ -227,56 +443,55 @@ def _update_capital_after_exit(
     """
     state = get_state(symbol, profile)
     try:
-        entry_price = state.get("entry_price", 0.0)
-        position_qty = abs(state.get("position_qty", 0.0))
-        leverage = state.get("leverage", 1)
-
-        if entry_price == 0 or position_qty == 0:
-            logger.warning(f"[{symbol}] No entry_price or qty found. Skipping capital update.")
-            return 0.0
-
-        # 가격 변화로 인한 PnL (레버리지 반영 전)
-        if long_exit:
-            price_change = (exit_price / entry_price - 1.0)
-        else:
-            price_change = (entry_price / exit_price - 1.0)
-
-        # 레버리지 반영
-        raw_pnl = price_change * leverage  # 예: +1% * 5배 = +5%
-        
-        # 거래 수수료(왕복) 반영
-        fee_per_side = FEE_RATE * leverage       # 한 쪽 수수료
-        total_fee = fee_per_side * 2             # 진입 + 청산
-        net_pnl = raw_pnl - total_fee            # 최종 수익률(배수 아님)
-
-        if use_initial_capital:
-            # /webhook2, /wehbook3: 복리 금지
-            logger.info(
-                f"[{profile}:{symbol}] Exit @ {exit_price:.4f}, Entry @ {entry_price:.4f}, "
-                f"RawPnL {raw_pnl*100:.2f}% - Fee {total_fee*100:.2f}% = Net {net_pnl*100:.2f}% "
-                f"(NO compounding)"
-            )
-        else:
-            # /webhook: 기존 복리
-            capital_before = state["capital"]
-            state["capital"] = capital_before * (1.0 + net_pnl)
-            logger.info(
-                f"[{profile}:{symbol}] Exit @ {exit_price:.4f}, Entry @ {entry_price:.4f}, "
-                f"RawPnL {raw_pnl*100:.2f}% - Fee {total_fee*100:.2f}% = Net {net_pnl*100:.2f}%"
-            )
-            logger.info(
-                f"[{profile}:{symbol}] Capital ${capital_before:.2f} "
-                f"→ ${state['capital']:.2f}"
+        pnl = {}
+
+        def settle(cur: dict) -> dict | None:
+            # 진입 정보가 이미 비었으면(다른 작업이 먼저 정산) 전이 없음
+            if not cur["entry_price"] or not cur["position_qty"]:
+                return None
+            pnl["entry"], pnl["capital"] = cur["entry_price"], cur["capital"]
+            pnl["cur"] = cur
+            pnl["raw"], pnl["fee"], pnl["net"] = exit_pnl(
+                cur["entry_price"], exit_price, abs(cur["position_qty"]), cur["leverage"], long_exit,
+                cur["entry_commission"], exit_commission,
             )
+            changes = {
+                "daily_pnl": (cur["daily_pnl"] or 0.0) + pnl["net"] * 100.0,
+                "entry_price": 0.0,
+                "position_qty": 0.0,
+                "position_side": None,
+                "entry_commission": None,
+                "entry_order_id": None,
+            }
+            if not use_initial_capital:
+                # /webhook: 기존 복리
+                changes["capital"] = compound(cur["capital"], pnl["net"])
+            return changes
+
+        # 읽은 진입/자본 값이 그대로일 때만 한 번에 반영 (같은 포지션 이중 정산 방지)
+        changes = lock_manager.transition(state, _EXIT_FIELDS, settle)
+        if changes is None:
+            logger.warning("[%s] No entry_price or qty found. Skipping capital update.", symbol)
+            return 0.0
 
-        # 공통 후처리
-        state["daily_pnl"] = state.get("daily_pnl", 0.0) + net_pnl * 100.0
-        state["entry_price"] = 0.0
-        state["position_qty"] = 0.0
-        state["position_side"] = None
-
-        return net_pnl * 100.0
+        # /webhook2, /wehbook3(use_initial_capital): 복리 금지 → capital 그대로
+        log_event(
+            logger, "pnl", profile=profile, symbol=symbol, exit_price=exit_price, entry_price=pnl["entry"],
+            raw_pct=round(pnl["raw"] * 100, 4), fee_pct=round(pnl["fee"] * 100, 4),
+            net_pct=round(pnl["net"] * 100, 4), capital_before=pnl["capital"], capital_after=state["capital"],
+            compounding=not use_initial_capital,
+        )
+        # 청산 원장에 한 행 (진입/청산 체결, 수수료, 레버리지, 청산 전후 capital)
+        cur = pnl["cur"]
+        trade_ledger.record(
+            profile, symbol, "long" if long_exit else "short",
+            entry_price=pnl["entry"], exit_price=exit_price, qty=cur["position_qty"], leverage=cur["leverage"],
+            raw_pnl=pnl["raw"], fee_pnl=pnl["fee"], net_pnl=pnl["net"],
+            capital_before=pnl["capital"], capital_after=state["capital"], compounding=not use_initial_capital,
+            entry_fee=cur["entry_commission"], exit_fee=exit_commission, entry_time=cur["entry_time"],
+        )
+        return pnl["net"] * 100.0
 
     except Exception:
-        logger.exception(f"[{profile}:{symbol}] Failed to update capital after exit")
+        logger.exception("[%s:%s] Failed to update capital after exit", profile, symbol)
         return 0.0
\ No newline at end of file
@@ -2,15 +2,22 @@
 
 import logging
 import time
-from datetime import datetime
-from zoneinfo import ZoneInfo
-
-from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
+from binance.enums import SIDE_BUY, SIDE_SELL
 
 from app.clients.binance_client import get_binance_client
-from app.config import DRY_RUN, POLL_INTERVAL, MAX_WAIT, FEE_RATE
+from app.config import DRY_RUN, POLL_INTERVAL, MAX_WAIT
 from app.state import get_state
+from app.services.position_cache import position_cache
+from app.services.order_gateway import submit_market_order, settle_commission
+from app.services.position_snapshot import PositionSnapshot
+from app.services.account_config import ensure_leverage, account_config
 from app.services.hedge_orders import execute_hedge_entry
+from app.services.pnl import exit_pnl, compound
+from app.services.locks import lock_manager
+from app.metrics import timed, span
+from app.logs import log_event
+from app.trade_ledger import trade_ledger
+from app.services.prefetch import MarketPrefetch
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -18,15 +25,6 @@ logger.setLevel(logging.INFO)
 VALID_ACTIONS = {"BUY", "SELL", "BUY_STOP", "SELL_STOP"}
 
 
-def _ensure_hedge_mode(client) -> None:
-    try:
-        mode = client.futures_get_position_mode()
-        if not mode.get("dualSidePosition"):
-            client.futures_change_position_mode(dualSidePosition=True)
-    except Exception as e:
-        logger.warning("ensure_hedge_mode failed: %s", e)
-
-
 def _get_positions(client, symbol: str) -> list[dict]:
     return client.futures_position_information(symbol=symbol)
 
@@ -39,20 +37,23 @@ def _side_amt(positions: list[dict], symbol: str, side: str) -> float:
     return 0.0
 
 
-def _any_open(positions: list[dict], symbol: str) -> bool:
-    return _side_amt(positions, symbol, "LONG") != 0.0 or _side_amt(positions, symbol, "SHORT") != 0.0
-
-
-def _enforce_leverage_policy_state_based(client, symbol: str, requested_leverage: int, profile: str) -> dict | None:
+@timed("hedge.leverage_policy")
+def _enforce_leverage_policy_state_based(
+    client,
+    symbol: str,
+    requested_leverage: int,
+    profile: str,
+    snapshot: PositionSnapshot,
+) -> dict | None:
     """
     ✅ state 기반 레버리지 정책 (네가 원한 방식)
     - 포지션이 없으면: requested_leverage를 state에 저장하고 거래소에 set 시도
     - 포지션이 있으면: state에 저장된 leverage를 "고정값"으로 사용하고 요청값은 무시
       (읽기 기반 정책 제거: positions에서 leverage가 안 내려오는 환경 대응)
+    - 포지션 유무는 호출 측에서 받은 snapshot 기준 (추가 REST 없음)
     """
     state = get_state(symbol, profile)
-    positions = _get_positions(client, symbol)
-    has_open = _any_open(positions, symbol)
+    has_open = snapshot.any_open()
 
     saved = int(state.get("hedge_symbol_leverage", 0) or 0)
 
@@ -62,15 +63,17 @@ def _enforce_leverage_policy_state_based(client, symbol: str, requested_leverage
         state["leverage"] = requested_leverage  # (호환/로그용)
 
         # 거래소 세팅 시도 (실패하면 거래 자체를 막는 게 안전)
+        # 이미 같은 값이면 레버리지 캐시로 호출 생략
         try:
-            client.futures_change_leverage(symbol=symbol, leverage=requested_leverage)
+            ensure_leverage(client, symbol, requested_leverage)
         except Exception as e:
             return {"skipped": f"failed_to_set_leverage:{e}"}
 
         return None
 
     # ✅ 포지션이 열려있으면: saved leverage가 기준
-    # saved가 비어있으면(서버 재시작 등) 요청 leverage로 복구
+    # (STATE_DB_PATH 설정 시 재시작 후에도 state에서 복구됨)
+    # saved가 비어있으면(영속화 미사용 + 서버 재시작 등) 요청 leverage로 복구
     if saved <= 0:
         state["hedge_symbol_leverage"] = requested_leverage
         state["leverage"] = requested_leverage
@@ -82,82 +85,56 @@ def _enforce_leverage_policy_state_based(client, symbol: str, requested_leverage
 
     # (선택) 거래소에도 saved로 보정 세팅 시도 — 실패해도 주문은 진행 가능하니 warning만
     try:
-        client.futures_change_leverage(symbol=symbol, leverage=saved)
+        ensure_leverage(client, symbol, saved)
     except Exception as e:
-        logger.warning(f"[{profile}:{symbol}] futures_change_leverage failed while open (continue): {e}")
+        logger.warning("[%s:%s] futures_change_leverage failed while open (continue): %s", profile, symbol, e)
 
     return None
 
 
-def _wait_for_side_close(symbol: str, position_side: str) -> bool:
-    client = get_binance_client()
+@timed("hedge.wait_side_close")
+def _wait_for_side_close(symbol: str, position_side: str, since: float | None = None) -> bool:
+    """
+    position_side 포지션이 0이 될 때까지 대기.
+    - User Data Stream이 살아 있으면 since(주문 전송 시각) 이후 ACCOUNT_UPDATE로 즉시 확인
+    - 스트림이 없거나 끊기면 남은 시간 동안 REST 폴링
+    """
     start = time.time()
-    while time.time() - start < MAX_WAIT:
+
+    if since is not None and position_cache.is_live():
+        if position_cache.wait_for(
+            symbol,
+            lambda cache: cache.side_amt(symbol, position_side) == 0.0,
+            MAX_WAIT,
+            since,
+        ):
+            return True
+
+    client = get_binance_client()
+    while True:
         positions = _get_positions(client, symbol)
         amt = _side_amt(positions, symbol, position_side)
         if amt == 0.0:
             return True
+        if time.time() - start >= MAX_WAIT:
+            break
         time.sleep(POLL_INTERVAL)
     logger.warning("Close timeout: %s %s", symbol, position_side)
     return False
 
 
-def _get_exit_price(client, symbol: str, order: dict) -> float:
-    order_id = order.get("orderId")
-    try:
-        filled = client.futures_get_order(symbol=symbol, orderId=order_id)
-        avg = filled.get("avgPrice")
-        if avg:
-            return float(avg)
-    except Exception as e:
-        logger.warning("[Exit] Failed to fetch avgPrice: %s", e)
-
-    return float(client.futures_mark_price(symbol=symbol)["markPrice"])
-
-
-def _sync_state_from_exchange(symbol: str, profile: str) -> None:
+def reconcile_state_from_exchange(symbol: str, profile: str) -> PositionSnapshot:
+    """
+    명시적 재동기화: 거래소 포지션을 다시 읽어 state["hedge"]에 반영 (REST 1회).
+    평소 흐름은 스냅샷 + 체결 결과로 state를 맞추고, 청산 확인 실패 등
+    스냅샷을 믿을 수 없을 때만 호출한다.
+    """
     client = get_binance_client()
     state = get_state(symbol, profile)
 
-    positions = client.futures_position_information(symbol=symbol)
-
-    long_qty = 0.0
-    long_entry = 0.0
-    long_u = 0.0
-
-    short_qty = 0.0
-    short_entry = 0.0
-    short_u = 0.0
-
-    for p in positions:
-        if p.get("symbol") != symbol:
-            continue
-
-        ps = p.get("positionSide")
-        amt = float(p.get("positionAmt", 0.0))
-        entry = float(p.get("entryPrice", 0.0))
-        upnl = float(p.get("unRealizedProfit", 0.0))
-
-        if ps == "LONG":
-            long_qty = amt
-            long_entry = entry
-            long_u = upnl
-        elif ps == "SHORT":
-            short_qty = amt  # 보통 음수
-            short_entry = entry
-            short_u = upnl
-
-    now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-
-    state["hedge"]["long"]["qty"] = long_qty
-    state["hedge"]["long"]["entry_price"] = long_entry
-    state["hedge"]["long"]["unrealized_pnl"] = long_u
-    state["hedge"]["long"]["update_time"] = now
-
-    state["hedge"]["short"]["qty"] = short_qty
-    state["hedge"]["short"]["entry_price"] = short_entry
-    state["hedge"]["short"]["unrealized_pnl"] = short_u
-    state["hedge"]["short"]["update_time"] = now
+    snapshot = PositionSnapshot.fetch(client, symbol)
+    snapshot.write_to_state(state)
+    return snapshot
 
 
 def _apply_compounding_after_exit(
@@ -167,43 +144,73 @@ def _apply_compounding_after_exit(
     exit_price: float,
     use_initial_capital: bool,
     leverage: int,
+    exit_commission: float | None = None,
 ) -> float:
     """
     exit_side 별 수익률 계산 + (복리모드면) capital 갱신.
-    net_pnl = raw_pnl - 왕복수수료(FEE_RATE * leverage * 2)
+    net_pnl = raw_pnl - (누적 진입 수수료 + 청산 수수료) / 증거금
+      (실수수료를 모르면 왕복수수료 추정치 FEE_RATE * leverage * 2)
     반환: pnl_percent(%)
     """
     state = get_state(symbol, profile)
+    side = "hedge.long" if exit_side == "LONG" else "hedge.short"
+    pnl = {}
 
-    if exit_side == "LONG":
-        entry = float(state["hedge"]["long"]["entry_price"])
+    def settle(cur: dict) -> dict | None:
+        entry = float(cur[f"{side}.entry_price"] or 0.0)
         if entry <= 0:
-            return 0.0
-        price_change = (exit_price / entry - 1.0)
-    else:
-        entry = float(state["hedge"]["short"]["entry_price"])
-        if entry <= 0:
-            return 0.0
-        price_change = (entry / exit_price - 1.0)
-
-    raw_pnl = price_change * leverage
-    total_fee = (FEE_RATE * leverage) * 2
-    net_pnl = raw_pnl - total_fee
-
-    if not use_initial_capital:
-        before = float(state.get("capital", 0.0))
-        state["capital"] = before * (1.0 + net_pnl)
-
-    state["daily_pnl"] = state.get("daily_pnl", 0.0) + net_pnl * 100.0
-    return net_pnl * 100.0
-
-
+            return None
+
+        # 누적 진입 수수료가 없으면(0) 추정치 사용
+        entry_commission = float(cur[f"{side}.entry_commission"] or 0.0)
+        pnl["entry"], pnl["capital"] = entry, float(cur["capital"] or 0.0)
+        pnl["qty"], pnl["entry_fee"] = abs(float(cur[f"{side}.qty"] or 0.0)), entry_commission or None
+        pnl["raw"], pnl["fee"], pnl["net"] = exit_pnl(
+            entry, exit_price, pnl["qty"], leverage, exit_side == "LONG",
+            entry_commission if entry_commission > 0 else None, exit_commission,
+        )
+        # 청산한 방향의 진입 정보를 비움 → 같은 청산을 두 번 정산하면 두 번째는 entry <= 0으로 전이 없음
+        changes = {
+            "daily_pnl": (cur["daily_pnl"] or 0.0) + pnl["net"] * 100.0,
+            f"{side}.entry_price": 0.0,
+            f"{side}.qty": 0.0,
+            f"{side}.unrealized_pnl": 0.0,
+            f"{side}.entry_commission": 0.0,
+            f"{side}.entry_order_ids": (),
+        }
+        if not use_initial_capital:
+            changes["capital"] = compound(float(cur["capital"] or 0.0), pnl["net"])
+        return changes
+
+    # 읽은 진입/수수료/자본 값이 그대로일 때만 한 번에 반영
+    fields = (f"{side}.entry_price", f"{side}.qty", f"{side}.entry_commission", "capital", "daily_pnl")
+    if lock_manager.transition(state, fields, settle) is None:
+        return 0.0
+
+    log_event(
+        logger, "pnl", profile=profile, symbol=symbol, position_side=exit_side, exit_price=exit_price,
+        entry_price=pnl["entry"], raw_pct=round(pnl["raw"] * 100, 4), fee_pct=round(pnl["fee"] * 100, 4),
+        net_pct=round(pnl["net"] * 100, 4), capital_before=pnl["capital"], capital_after=state["capital"],
+        compounding=not use_initial_capital,
+    )
+    trade_ledger.record(
+        profile, symbol, exit_side.lower(),
+        entry_price=pnl["entry"], exit_price=exit_price, qty=pnl["qty"], leverage=leverage,
+        raw_pnl=pnl["raw"], fee_pnl=pnl["fee"], net_pnl=pnl["net"],
+        capital_before=pnl["capital"], capital_after=float(state["capital"]), compounding=not use_initial_capital,
+        entry_fee=pnl["entry_fee"], exit_fee=exit_commission,
+    )
+    return pnl["net"] * 100.0
+
+
+@timed("hedge.total")
 def switch_position_hedge(
     symbol: str,
     action: str,
     leverage: int,
     profile: str,
     use_initial_capital: bool,
+    prefetch: MarketPrefetch | None = None,
 ) -> dict:
     client = get_binance_client()
 
@@ -214,108 +221,84 @@ def switch_position_hedge(
     if action not in VALID_ACTIONS:
         return {"skipped": "unknown_action"}
 
-    _ensure_hedge_mode(client)
+    # 계정 설정 캐시로 확인 (Client 생성 시 이미 보장, 알림마다 조회하지 않음)
+    account_config.ensure_hedge_mode(client)
+
+    # ✅ 알림 1건당 포지션 조회는 이 한 번뿐 (이후는 체결 결과로 보정)
+    with span("hedge.snapshot"):
+        if prefetch is not None:
+            # 배치 알림: 전 심볼 1회 조회 결과 재사용
+            snapshot = PositionSnapshot.from_positions(symbol, prefetch.positions(symbol))
+        else:
+            snapshot = PositionSnapshot.fetch(client, symbol)
+    state = get_state(symbol, profile)
+    snapshot.write_to_state(state)
 
     # ✅ state 기반 레버리지 정책 적용
     # - 포지션 없으면: 요청 leverage 고정 + 거래소 set
     # - 포지션 있으면: state leverage로 강제(요청 leverage 무시)
     if action in ("BUY", "SELL"):
-        policy = _enforce_leverage_policy_state_based(client, symbol, leverage, profile)
+        policy = _enforce_leverage_policy_state_based(client, symbol, leverage, profile, snapshot)
         if policy is not None:
             return policy
 
         # enforce에서 state["leverage"]를 saved로 맞춰놨으니 여기서 최종 leverage를 다시 가져옴
-        state = get_state(symbol, profile)
         leverage = int(state.get("hedge_symbol_leverage", leverage))
     else:
         # STOP은 레버리지 정책과 무관하게 청산 진행
-        state = get_state(symbol, profile)
         # PnL 계산용으로는 state leverage를 쓰는 게 더 일관적
         leverage = int(state.get("hedge_symbol_leverage", leverage))
         state["leverage"] = leverage
 
-    # ✅ BUY: LONG 추가진입 (스킵 없음)
-    if action == "BUY":
-        res = execute_hedge_entry(
-            symbol=symbol,
-            position_side="LONG",
-            leverage=leverage,
-            profile=profile,
-            use_initial_capital=use_initial_capital,
-        )
-        _sync_state_from_exchange(symbol, profile)
-        return res
-
-    # ✅ SELL: SHORT 추가진입 (스킵 없음)
-    if action == "SELL":
+    # ✅ BUY: LONG 추가진입 / SELL: SHORT 추가진입 (스킵 없음)
+    if action in ("BUY", "SELL"):
+        position_side = "LONG" if action == "BUY" else "SHORT"
         res = execute_hedge_entry(
             symbol=symbol,
-            position_side="SHORT",
+            position_side=position_side,
             leverage=leverage,
             profile=profile,
             use_initial_capital=use_initial_capital,
+            mark_price=prefetch.mark_price(symbol) if prefetch is not None else None,
         )
-        _sync_state_from_exchange(symbol, profile)
+        entry = res["entry"]
+        snapshot.apply_entry(position_side, entry["qty"], entry["avg_price"])
+        snapshot.write_to_state(state)
         return res
 
-    # STOP 처리 전에 최신 포지션 동기화
-    _sync_state_from_exchange(symbol, profile)
-    positions = _get_positions(client, symbol)
-
-    # ✅ BUY_STOP: LONG만 청산
+    # ✅ BUY_STOP: LONG만 청산 / SELL_STOP: SHORT만 청산
     if action == "BUY_STOP":
-        long_amt = _side_amt(positions, symbol, "LONG")
-        if long_amt <= 0:
+        position_side, close_side = "LONG", SIDE_SELL
+        amt = snapshot.side_amt("LONG")
+        if amt <= 0:
             return {"skipped": "no_long_position"}
-
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_SELL,
-            type=ORDER_TYPE_MARKET,
-            quantity=str(abs(long_amt)),
-            positionSide="LONG",
-        )
-        _wait_for_side_close(symbol, "LONG")
-        exit_price = _get_exit_price(client, symbol, order)
-
-        pnl = _apply_compounding_after_exit(
-            symbol=symbol,
-            profile=profile,
-            exit_side="LONG",
-            exit_price=exit_price,
-            use_initial_capital=use_initial_capital,
-            leverage=leverage,
-        )
-
-        _sync_state_from_exchange(symbol, profile)
-        return {"done": "buy_stop", "exit_price": exit_price, "pnl": pnl}
-
-    # ✅ SELL_STOP: SHORT만 청산
-    if action == "SELL_STOP":
-        short_amt = _side_amt(positions, symbol, "SHORT")
-        if short_amt >= 0:
+    else:
+        position_side, close_side = "SHORT", SIDE_BUY
+        amt = snapshot.side_amt("SHORT")
+        if amt >= 0:
             return {"skipped": "no_short_position"}
 
-        order = client.futures_create_order(
-            symbol=symbol,
-            side=SIDE_BUY,
-            type=ORDER_TYPE_MARKET,
-            quantity=str(abs(short_amt)),
-            positionSide="SHORT",
-        )
-        _wait_for_side_close(symbol, "SHORT")
-        exit_price = _get_exit_price(client, symbol, order)
-
-        pnl = _apply_compounding_after_exit(
-            symbol=symbol,
-            profile=profile,
-            exit_side="SHORT",
-            exit_price=exit_price,
-            use_initial_capital=use_initial_capital,
-            leverage=leverage,
-        )
-
-        _sync_state_from_exchange(symbol, profile)
-        return {"done": "sell_stop", "exit_price": exit_price, "pnl": pnl}
+    sent_at = time.time()
+    fill = submit_market_order(
+        client, symbol, close_side, str(abs(amt)), positionSide=position_side
+    )
+    closed = _wait_for_side_close(symbol, position_side, since=sent_at)
+
+    pnl = _apply_compounding_after_exit(
+        symbol=symbol,
+        profile=profile,
+        exit_side=position_side,
+        exit_price=fill.avg_price,
+        use_initial_capital=use_initial_capital,
+        leverage=leverage,
+        exit_commission=settle_commission(fill),
+    )
+
+    if closed:
+        snapshot.apply_close(position_side)
+        snapshot.write_to_state(state)
+    else:
+        # 청산 확인 실패 → 거래소 기준으로 다시 맞춤
+        reconcile_state_from_exchange(symbol, profile)
 
-    return {"skipped": "unknown_action"}
\ No newline at end of file
+    return {"done": action.lower(), "exit_price": fill.avg_price, "pnl": pnl}
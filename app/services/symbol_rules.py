@@ -0,0 +1,157 @@
+# app/services/symbol_rules.py
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+
+from app.clients.binance_client import get_binance_client
+from app.config import SYMBOL_RULES_TTL, SYMBOL_RULES_MISS_TTL
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolRules:
+    """exchange_info 필터를 주문 시점에 바로 쓸 수 있게 미리 계산해 둔 값"""
+    symbol: str
+    step_size: float
+    min_qty: float
+    max_qty: float          # LOT_SIZE / MARKET_LOT_SIZE 중 작은 값 (0이면 제한 없음)
+    qty_precision: int
+    tick_size: float
+    price_precision: int
+    min_notional: float
+
+
+# symbol -> SymbolRules (통째로 교체하므로 읽기 쪽은 락 불필요)
+_rules: dict[str, SymbolRules] = {}
+_loaded_at: float | None = None  # 마지막 적재 시각 (time.monotonic), None이면 아직 적재 전
+_load_lock = threading.Lock()
+
+
+def _precision(step: float) -> int:
+    return int(round(-math.log10(step), 0)) if step > 0 else 0
+
+
+def _parse_symbol(sym_info: dict) -> SymbolRules:
+    filters = {f["filterType"]: f for f in sym_info.get("filters", [])}
+
+    lot_f = filters.get("LOT_SIZE", {})
+    step = float(lot_f.get("stepSize", 0.0))
+
+    # 시장가 주문은 MARKET_LOT_SIZE 상한도 받음
+    max_qtys = [
+        float(f["maxQty"]) for f in (lot_f, filters.get("MARKET_LOT_SIZE", {}))
+        if float(f.get("maxQty", 0.0)) > 0
+    ]
+
+    price_f = filters.get("PRICE_FILTER", {})
+    tick = float(price_f.get("tickSize", 0.0))
+
+    # 선물은 MIN_NOTIONAL.notional, 현물 형식은 minNotional
+    notional_f = filters.get("MIN_NOTIONAL", {})
+    min_notional = float(notional_f.get("notional", notional_f.get("minNotional", 0.0)))
+
+    return SymbolRules(
+        symbol=sym_info["symbol"],
+        step_size=step,
+        min_qty=float(lot_f.get("minQty", 0.0)),
+        max_qty=min(max_qtys, default=0.0),
+        qty_precision=_precision(step),
+        tick_size=tick,
+        price_precision=_precision(tick),
+        min_notional=min_notional,
+    )
+
+
+def load_symbol_rules(client=None) -> int:
+    """
+    futures_exchange_info를 한 번 받아 심볼별 규칙 인덱스를 새로 만든다.
+    (기동 시 + 백그라운드 TTL 갱신에서 호출)
+    반환: 적재된 심볼 수
+    """
+    client = client or get_binance_client()
+    with _load_lock:
+        return _load(client)
+
+
+def _load(client) -> int:
+    """_load_lock을 잡은 상태에서 호출"""
+    global _rules, _loaded_at
+
+    info = client.futures_exchange_info()
+    rules = {}
+    for sym_info in info.get("symbols", []):
+        try:
+            rules[sym_info["symbol"]] = _parse_symbol(sym_info)
+        except (KeyError, ValueError) as e:
+            logger.warning("[SymbolRules] Failed to parse %s: %s", sym_info.get('symbol'), e)
+
+    _rules = rules
+    _loaded_at = time.monotonic()
+    logger.info("[SymbolRules] Loaded rules for %s symbols.", len(rules))
+    return len(rules)
+
+
+def refresh_symbol_rules() -> None:
+    """스케줄러용: 실패해도 기존 규칙은 그대로 유지"""
+    try:
+        load_symbol_rules()
+    except Exception as e:
+        logger.warning("[SymbolRules] Refresh failed, keeping previous rules: %s", e)
+
+
+def get_symbol_rules(symbol: str) -> SymbolRules:
+    """
+    심볼 규칙 O(1) 조회.
+    - 아직 적재 전이거나 TTL 초과 / 신규 상장 심볼이면 그때만 한 번 다시 적재
+    - 모르는 심볼은 마지막 적재 후 SYMBOL_RULES_MISS_TTL 동안 다시 적재하지 않고 바로 거부
+      (잘못된 심볼 알림이 올 때마다 exchange_info 전체를 받지 않도록)
+    - 여러 스레드가 동시에 다시 적재하려 하면 한 번만 받고, 기다린 쪽은 그 결과를 사용
+    """
+    seen = _loaded_at
+    rules = _rules.get(symbol)
+    if seen is not None:
+        age = time.monotonic() - seen
+        expired = age > SYMBOL_RULES_TTL * 2
+        if rules is not None and not expired:
+            return rules
+        if rules is None and not expired and age < SYMBOL_RULES_MISS_TTL:
+            raise HTTPException(status_code=400, detail=f"Unknown symbol {symbol}")
+
+    with _load_lock:
+        # 락을 기다리는 동안 다른 스레드가 이미 다시 적재했으면 생략
+        if _loaded_at == seen:
+            _load(get_binance_client())
+    rules = _rules.get(symbol)
+    if rules is None:
+        raise HTTPException(status_code=400, detail=f"Unknown symbol {symbol}")
+    return rules
+
+
+def round_qty(symbol: str, raw_qty: float, price: float) -> tuple[float, str]:
+    """
+    LOT_SIZE / MARKET_LOT_SIZE / MIN_NOTIONAL 규칙에 맞춰 수량 보정.
+    최대 수량을 넘으면 maxQty로 줄임 (거래소 거부 대신 상한으로 주문)
+    반환: (qty, 주문용 문자열)
+    """
+    rules = get_symbol_rules(symbol)
+
+    if rules.max_qty and raw_qty > rules.max_qty:
+        logger.warning("[SymbolRules] %s qty %s > maxQty %s, clamping", symbol, raw_qty, rules.max_qty)
+        raw_qty = rules.max_qty
+    qty = math.floor(raw_qty / rules.step_size) * rules.step_size if rules.step_size > 0 else raw_qty
+    if qty < rules.min_qty:
+        raise HTTPException(status_code=400, detail=f"Qty {qty} < minQty {rules.min_qty}")
+    if rules.min_notional and qty * price < rules.min_notional:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Notional {qty * price:.4f} < minNotional {rules.min_notional}",
+        )
+
+    return qty, f"{qty:.{rules.qty_precision}f}"
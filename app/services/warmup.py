@@ -0,0 +1,129 @@
+# app/services/warmup.py
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.clients.binance_client import get_binance_client
+from app.config import WARMUP_CONNECTIONS, WARMUP_RETRY_INTERVAL
+from app.services.account_config import leverage_cache, account_config
+from app.services.position_cache import position_cache
+from app.services.symbol_rules import load_symbol_rules
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# symbolConfig(CROSSED/ISOLATED) → positionRisk/스트림 표기(cross/isolated)
+_MARGIN_TYPES = {"CROSSED": "cross", "ISOLATED": "isolated"}
+
+
+class Warmup:
+    """
+    기동 시 준비 단계 (첫 알림이 콜드 스타트 비용을 내지 않도록).
+
+    필수 단계 (실패하면 not ready, WARMUP_RETRY_INTERVAL 후 재시도):
+      client        : Client 생성 (ping + Hedge Mode 보장)
+      position_mode : 포지션 모드 / 멀티에셋 모드 확인 (account_config 캐시)
+      symbol_rules  : exchange_info 적재
+    선택 단계 (실패해도 ready, 첫 주문에서 평소처럼 조회):
+      positions     : 전 심볼 포지션 → 포지션 캐시
+      leverage      : symbolConfig → 레버리지/마진타입 캐시
+      connections   : 커넥션 풀 예열 (동시 ping)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.ready = False
+        self.attempts = 0
+        self.steps: dict[str, dict] = {}
+        self.ready_at: float | None = None
+
+    def _step(self, name: str, fn, required: bool) -> bool:
+        started = time.perf_counter()
+        try:
+            detail = fn()
+        except Exception as e:
+            self.steps[name] = {"ok": False, "required": required, "error": str(e),
+                                "ms": round((time.perf_counter() - started) * 1000, 1)}
+            log = logger.error if required else logger.warning
+            log("[Warmup] %s failed: %s", name, e)
+            return False
+        self.steps[name] = {"ok": True, "required": required, "detail": detail,
+                            "ms": round((time.perf_counter() - started) * 1000, 1)}
+        return True
+
+    def run_once(self) -> bool:
+        self.attempts += 1
+        client = None
+
+        def build_client():
+            nonlocal client
+            client = get_binance_client()
+            return None
+
+        ok = self._step("client", build_client, required=True)
+        ok = ok and self._step("position_mode", lambda: account_config.refresh(client), True)
+        ok = ok and self._step("symbol_rules", lambda: {"symbols": load_symbol_rules(client)}, True)
+        if not ok:
+            return False
+
+        self._step("positions", lambda: _warm_positions(client), required=False)
+        self._step("leverage", lambda: _warm_leverage(client), required=False)
+        self._step("connections", lambda: _warm_connections(client), required=False)
+
+        with self._lock:
+            self.ready = True
+            self.ready_at = time.time()
+        total = sum(s["ms"] for s in self.steps.values())
+        logger.info("[Warmup] Ready after %.0fms (attempt %s).", total, self.attempts)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.run_once():
+                return
+            self._stop.wait(WARMUP_RETRY_INTERVAL)
+
+    def start(self) -> None:
+        """백그라운드 스레드에서 실행 (/health는 바로 응답, /ready는 완료 후 200)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "attempts": self.attempts, "ready_at": self.ready_at, "steps": self.steps}
+
+
+def _warm_positions(client) -> dict:
+    positions = client.futures_position_information()
+    position_cache.seed_positions(positions)
+    return {"open": sum(1 for p in positions if float(p.get("positionAmt", 0.0)) != 0.0)}
+
+
+def _warm_leverage(client) -> dict:
+    configs = client.futures_symbol_config()
+    for c in configs:
+        leverage_cache.set(
+            c["symbol"],
+            leverage=c.get("leverage"),
+            margin_type=_MARGIN_TYPES.get(c.get("marginType"), c.get("marginType")),
+        )
+    return {"symbols": len(configs)}
+
+
+def _warm_connections(client) -> dict:
+    """커넥션 풀에 WARMUP_CONNECTIONS개 keep-alive 연결을 미리 맺어 둠 (TLS 핸드셰이크 선지불)"""
+    with ThreadPoolExecutor(max_workers=WARMUP_CONNECTIONS, thread_name_prefix="warmup") as pool:
+        list(pool.map(lambda _: client.futures_ping(), range(WARMUP_CONNECTIONS)))
+    return {"connections": WARMUP_CONNECTIONS}
+
+
+warmup = Warmup()
@@ -1,73 +1,306 @@
 # app/state.py
+import logging
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-monitor_states: dict[str, dict] = {}
+from app.config import STATE_DB_PATH, STATE_FLUSH_INTERVAL, STATE_SNAPSHOT_EVERY
+from app.state_store import StateStore
+from app.services.report_book import report_book
+from app.services.locks import lock_manager
+from app.logs import log_event
+
+logger = logging.getLogger(__name__)
+
+# STATE_DB_PATH가 설정된 경우에만 사용 (init_state_store)
+_store: StateStore | None = None
+
 
 def _make_key(symbol: str, profile: str) -> str:
+    # 저널/스냅샷 저장 키 (레코드 생성 시 한 번만 만듦)
     return f"{profile}:{symbol}"
 
 
-def _default_state(symbol: str, profile: str) -> dict:
-    now_str = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-    return {
-        "profile": profile,
-        "symbol": symbol,
-
-        # 공통 자본
-        "capital": 50.0,          # 복리용(웹훅5: compounding)
-        "initial_capital": 50.0,  # 고정자본용(웹훅6: no compounding)
-
-        # ===== 기존 webhook1~4 호환 필드(유지) =====
-        "entry_price": 0.0,
-        "position_qty": 0.0,
-        "position_side": None,
-        "entry_time": "",
-
-        "current_price": 0.0,
-        "pnl": 0.0,
-        "daily_pnl": 0.0,
-
-        "trade_count": 0,
-        "long_count": 0,
-        "short_count": 0,
-
-        "leverage": 1,
-        "last_reset": now_str,
-
-        # ===== webhook5/6 (Hedge) 전용 필드 =====
-        # 거래소 동기화용(진짜 포지션 상태)
-        "hedge": {
-            "long": {
-                "qty": 0.0,         # Binance positionAmt (LONG는 +)
-                "entry_price": 0.0, # Binance entryPrice
-                "unrealized_pnl": 0.0,
-                "update_time": "",  # 마지막 동기화 시각(Asia/Seoul 문자열)
-            },
-            "short": {
-                "qty": 0.0,         # Binance positionAmt (SHORT는 -로 내려오는 경우 많음)
-                "entry_price": 0.0,
-                "unrealized_pnl": 0.0,
-                "update_time": "",
+def _now_str() -> str:
+    return datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class _Record:
+    """
+    __slots__ dataclass 레코드를 기존 dict 호출부와 호환시키는 view.
+    state["capital"], state.get(...), state.update({...}), state["hedge"]["long"]["qty"] 그대로 동작.
+    선언되지 않은 키는 extra dict에 보관 (예전 스냅샷/임시 필드 호환).
+    """
+
+    __slots__ = ()
+    _FIELDS: dict[str, None] = {}  # 선언 필드 (순서 유지 + O(1) 포함 검사)
+
+    def __getitem__(self, key: str):
+        if key in self._FIELDS:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key in self._FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS or (self.extra is not None and key in self.extra)
+
+    def get(self, key: str, default=None):
+        if key in self._FIELDS:
+            return getattr(self, key)
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def update(self, values: dict | None = None, **kwargs) -> None:
+        for key, value in (values or {}).items():
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def keys(self) -> list[str]:
+        return [*self._FIELDS, *(self.extra or {})]
+
+    def to_dict(self) -> dict:
+        out = {}
+        for key in self._FIELDS:
+            value = getattr(self, key)
+            out[key] = value.to_dict() if isinstance(value, _Record) else value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    @classmethod
+    def _fields_of(cls) -> dict[str, None]:
+        return dict.fromkeys(f.name for f in fields(cls) if f.compare and f.name != "extra")
+
+
+@dataclass(slots=True, eq=False)
+class HedgeSide(_Record):
+    # 거래소 동기화용(진짜 포지션 상태)
+    qty: float = 0.0                # Binance positionAmt (LONG는 +, SHORT는 -로 내려오는 경우 많음)
+    entry_price: float = 0.0        # Binance entryPrice
+    unrealized_pnl: float = 0.0
+    entry_commission: float = 0.0   # 현재 포지션 누적 진입 수수료(USDT)
+    entry_order_ids: tuple = ()     # entry_commission에 들어간 진입 주문 id (청산 시 비움, 늦은 수수료 보정 대상 확인용)
+    update_time: str = ""           # 마지막 동기화 시각(Asia/Seoul 문자열)
+    last_order_qty: float | None = None
+    last_order_time: str | None = None
+    extra: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HedgeSide":
+        side = cls()
+        side.update(data)
+        return side
+
+
+@dataclass(slots=True, eq=False)
+class HedgeState(_Record):
+    long: HedgeSide = field(default_factory=HedgeSide)
+    short: HedgeSide = field(default_factory=HedgeSide)
+    extra: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HedgeState":
+        hedge = cls()
+        for key, value in data.items():
+            if key in ("long", "short") and isinstance(value, dict):
+                hedge[key] = HedgeSide.from_dict(value)
+            else:
+                hedge[key] = value
+        return hedge
+
+
+@dataclass(slots=True, eq=False)
+class SymbolState(_Record):
+    profile: str
+    symbol: str
+
+    # 공통 자본
+    capital: float = 50.0           # 복리용(웹훅5: compounding)
+    initial_capital: float = 50.0   # 고정자본용(웹훅6: no compounding)
+
+    # ===== 기존 webhook1~4 호환 필드(유지) =====
+    entry_price: float = 0.0
+    position_qty: float = 0.0
+    position_side: str | None = None
+    entry_time: str = ""
+    entry_commission: float | None = None  # 진입 체결 실수수료(USDT), 모르면 None
+    entry_order_id: int | None = None      # 진입 주문 id (추정 수수료 → 실제 수수료 보정 대상 확인용)
+
+    current_price: float = 0.0
+    pnl: float = 0.0
+    daily_pnl: float = 0.0
+
+    trade_count: int = 0
+    long_count: int = 0
+    short_count: int = 0
+
+    leverage: int = 1
+    last_reset: str = field(default_factory=_now_str)
+
+    # ===== webhook5/6 (Hedge) 전용 필드 =====
+    hedge: HedgeState = field(default_factory=HedgeState)
+
+    # 요청 레버리지 정책 확인용(“열려있으면 일치 강제”)
+    hedge_symbol_leverage: int = 1
+
+    # 추가진입 카운터(가드 넣을 때 유용)
+    hedge_long_add_count: int = 0
+    hedge_short_add_count: int = 0
+
+    extra: dict | None = None
+    key: str = field(default="", compare=False, repr=False)
+
+    def __post_init__(self):
+        self.key = _make_key(self.symbol, self.profile)
+
+    def record_entry(
+        self, long: bool, entry: float, qty: float, leverage: int, commission: float, order_id: int | None = None
+    ) -> dict:
+        """
+        one-way 진입 체결 기록 (execute_buy / execute_sell / 반전 주문 공통).
+        진입 정보 + 카운터를 CAS 전이 한 번으로 반영.
+        반환: 응답용 {"filled", "entry", "commission"}
+        """
+        counter = "long_count" if long else "short_count"
+        now = _now_str()
+        lock_manager.transition(
+            self,
+            (counter, "trade_count"),
+            lambda cur: {
+                "entry_price": entry,
+                "position_qty": qty if long else -qty,
+                "current_price": entry,
+                "position_side": "long" if long else "short",
+                "leverage": leverage,
+                "entry_commission": commission,
+                "entry_order_id": order_id,
+                "entry_time": now,
+                counter: cur[counter] + 1,
+                "trade_count": cur["trade_count"] + 1,
             },
-        },
+        )
+        return {"filled": qty, "entry": entry, "commission": commission}
+
+    def correct_entry_commission(self, order_id: int, actual: float) -> bool:
+        """체결 이벤트로 확인한 실제 진입 수수료 반영 후 저장 (그 사이 청산/재진입했으면 무시)"""
+        if not lock_manager.compare_and_set(self, {"entry_order_id": order_id}, {"entry_commission": actual}):
+            return False
+        save_state(self.symbol, self.profile)
+        return True
+
+    @classmethod
+    def from_dict(cls, symbol: str, profile: str, data: dict) -> "SymbolState":
+        """저장된 dict → 레코드 (예전 버전 스냅샷에 없는 필드는 기본값)"""
+        state = cls(profile=profile, symbol=symbol)
+        for key, value in data.items():
+            if key == "hedge" and isinstance(value, dict):
+                state.hedge = HedgeState.from_dict(value)
+            elif key not in ("profile", "symbol"):
+                state[key] = value
+        return state
+
+
+HedgeSide._FIELDS = HedgeSide._fields_of()
+HedgeState._FIELDS = HedgeState._fields_of()
+SymbolState._FIELDS = SymbolState._fields_of()
+
+
+class StateRegistry:
+    """
+    profile → symbol → SymbolState 2단 레지스트리.
+    조회에 문자열 키를 만들지 않고, profile별 심볼 열거는 O(해당 profile 심볼 수).
+    """
+
+    def __init__(self):
+        self._profiles: dict[str, dict[str, SymbolState]] = {}
+
+    def get(self, symbol: str, profile: str) -> SymbolState:
+        states = self._profiles.get(profile)
+        if states is None:
+            states = self._profiles.setdefault(profile, {})
+        state = states.get(symbol)
+        if state is None:
+            state = self.add(SymbolState(profile=profile, symbol=symbol))
+        return state
 
-        # 요청 레버리지 정책 확인용(“열려있으면 일치 강제”)
-        "hedge_symbol_leverage": 1,
+    def find(self, symbol: str, profile: str) -> SymbolState | None:
+        return self._profiles.get(profile, {}).get(symbol)
 
-        # 추가진입 카운터(가드 넣을 때 유용)
-        "hedge_long_add_count": 0,
-        "hedge_short_add_count": 0,
-    }
+    def add(self, state: SymbolState) -> SymbolState:
+        state = self._profiles.setdefault(state.profile, {}).setdefault(state.symbol, state)
+        report_book.update(state.profile, state.symbol, state)
+        return state
 
+    def symbols(self, profile: str) -> list[str]:
+        return list(self._profiles.get(profile, {}))
 
-def get_state(symbol: str, profile: str = "default") -> dict:
-    key = _make_key(symbol, profile)
-    if key not in monitor_states:
-        monitor_states[key] = _default_state(symbol, profile)
-    return monitor_states[key]
+    def profiles(self) -> list[str]:
+        return list(self._profiles)
+
+    def __len__(self) -> int:
+        return sum(len(states) for states in self._profiles.values())
+
+
+registry = StateRegistry()
+
+
+def get_state(symbol: str, profile: str = "default") -> SymbolState:
+    return registry.get(symbol, profile)
 
 
 def list_symbols(profile: str) -> list[str]:
-    prefix = f"{profile}:"
-    return [k.split(":", 1)[1] for k in monitor_states.keys() if k.startswith(prefix)]
\ No newline at end of file
+    return registry.symbols(profile)
+
+
+def init_state_store() -> None:
+    """
+    기동 시 1회: 디스크의 snapshot+journal로 registry 복구 후 writer 시작.
+    STATE_DB_PATH 미설정이면 아무 것도 하지 않음(메모리 전용).
+    """
+    global _store
+    if not STATE_DB_PATH or _store is not None:
+        return
+
+    _store = StateStore(STATE_DB_PATH, STATE_FLUSH_INTERVAL, STATE_SNAPSHOT_EVERY)
+    for key, data in _store.load().items():
+        profile, symbol = key.split(":", 1)
+        registry.add(SymbolState.from_dict(symbol, profile, data))
+    _store.start()
+
+
+def close_state_store() -> None:
+    global _store
+    if _store is not None:
+        _store.stop()
+        _store = None
+
+
+def state_store_stats() -> dict | None:
+    """저널 writer 상태 (영속화 비활성이면 None)"""
+    return _store.stats() if _store is not None else None
+
+
+def save_state(symbol: str, profile: str = "default") -> None:
+    """상태 변경 후 호출: 리포트 캐시 갱신 + state 이벤트 + 저널에 비동기로 기록 (영속화 비활성 시 저널 생략)"""
+    state = registry.find(symbol, profile)
+    if state is None:
+        return
+    report_book.update(profile, symbol, state)
+    log_event(
+        logger, "state", profile=profile, symbol=symbol, capital=state.capital, daily_pnl=state.daily_pnl,
+        position_side=state.position_side, position_qty=state.position_qty, entry_price=state.entry_price,
+        hedge_long_qty=state.hedge.long.qty, hedge_short_qty=state.hedge.short.qty, trade_count=state.trade_count,
+    )
+    if _store is not None:
+        _store.append(state.key, state.to_dict())
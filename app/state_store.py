@@ -0,0 +1,119 @@
+# app/state_store.py
+
+import json
+import logging
+import sqlite3
+
+from app.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class StateStore:
+    """
+    상태 레지스트리 영속화: SQLite(WAL) 위의 append-only 저널 + 주기적 스냅샷.
+
+    - journal(seq, key, body): 상태 변경 시점의 state 전체를 JSON으로 추가만 함
+    - snapshot(key, body, seq): 저널을 key별 최신값으로 압축한 결과
+    - 기동 시 snapshot 적재 후 그 이후 저널만 재생 → 재시작 시간은 거래 이력과 무관
+    - 쓰기는 BatchWriter 스레드가 배치로 모아 한 트랜잭션으로 커밋(fsync 배치)
+      → 주문 경로는 큐에 넣기만 하고 디스크를 기다리지 않음
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.2, snapshot_every: int = 1000):
+        self._path = path
+        self._snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self._writer = BatchWriter("state-store", self._connect, self._commit, flush_interval)
+
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS journal (
+                seq  INTEGER PRIMARY KEY AUTOINCREMENT,
+                key  TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshot (
+                key  TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                seq  INTEGER NOT NULL
+            );
+            """
+        )
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: 커밋마다 fsync하지 않고 체크포인트 시점에 동기화
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ── 복구 ────────────────────────────────────────
+    def load(self) -> dict[str, dict]:
+        """snapshot + 이후 저널 재생 결과 {key: state}"""
+        conn = self._connect()
+        try:
+            states: dict[str, dict] = {}
+            last_seq = 0
+            for key, body, seq in conn.execute("SELECT key, body, seq FROM snapshot"):
+                states[key] = json.loads(body)
+                last_seq = max(last_seq, seq)
+
+            replayed = 0
+            for key, body in conn.execute(
+                "SELECT key, body FROM journal WHERE seq > ? ORDER BY seq", (last_seq,)
+            ):
+                states[key] = json.loads(body)
+                replayed += 1
+        finally:
+            conn.close()
+
+        self._since_snapshot = replayed
+        logger.info("[StateStore] Restored %s states (%s journal entries replayed).", len(states), replayed)
+        return states
+
+    # ── 쓰기 ────────────────────────────────────────
+    def append(self, key: str, state: dict) -> None:
+        """주문 경로에서 호출: 직렬화만 하고 큐에 넣음"""
+        self._writer.put((key, json.dumps(state, ensure_ascii=False, default=str)))
+
+    def start(self) -> None:
+        self._writer.start()
+
+    def stop(self) -> None:
+        self._writer.stop()
+
+    def stats(self) -> dict:
+        return self._writer.stats()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list[tuple[str, str]]) -> None:
+        with conn:
+            conn.executemany("INSERT INTO journal (key, body) VALUES (?, ?)", batch)
+        self._since_snapshot += len(batch)
+
+        if self._since_snapshot >= self._snapshot_every:
+            try:
+                self._compact(conn)
+            except sqlite3.Error:
+                # 저널은 이미 커밋됨 → 압축은 다음 배치에서 다시 시도
+                logger.exception("[StateStore] Journal compaction failed")
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        """저널을 key별 최신값으로 snapshot에 합치고 저널 비우기"""
+        with conn:
+            max_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM journal").fetchone()[0]
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO snapshot (key, body, seq)
+                SELECT j.key, j.body, j.seq FROM journal j
+                JOIN (SELECT key, MAX(seq) AS seq FROM journal WHERE seq <= ? GROUP BY key) last
+                  ON j.key = last.key AND j.seq = last.seq
+                """,
+                (max_seq,),
+            )
+            conn.execute("DELETE FROM journal WHERE seq <= ?", (max_seq,))
+        self._since_snapshot = 0
+        logger.info("[StateStore] Compacted journal into snapshot (seq<=%s).", max_seq)
@@ -0,0 +1,268 @@
+# app/trade_ledger.py
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from app.batch_writer import BatchWriter
+from app.config import LEDGER_FLUSH_INTERVAL
+from app.services.pnl import realized_usdt
+from app.services.report_book import period_date
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# 원장 행 컬럼 순서 (record → INSERT)
+_COLUMNS = (
+    "ts", "period", "profile", "symbol", "side",
+    "entry_time", "entry_price", "exit_price", "qty", "leverage",
+    "entry_fee", "exit_fee", "raw_pnl", "fee_pnl", "net_pnl", "pnl_usdt",
+    "capital_before", "capital_after", "compounding",
+)
+
+_INSERT_TRADE = f"INSERT INTO trades ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+# 청산 1건 → (기준일, profile, symbol) 롤업 누적
+_UPSERT_DAILY = """
+INSERT INTO daily (period, profile, symbol, trades, wins, net_pct, pnl_usdt, fees_usdt)
+VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (period, profile, symbol) DO UPDATE SET
+    trades    = trades + 1,
+    wins      = wins + excluded.wins,
+    net_pct   = net_pct + excluded.net_pct,
+    pnl_usdt  = pnl_usdt + excluded.pnl_usdt,
+    fees_usdt = fees_usdt + excluded.fees_usdt
+"""
+
+# /ledger/pnl group by 허용 키 (SQL에 그대로 들어가므로 화이트리스트)
+GROUP_KEYS = ("period", "profile", "symbol")
+
+
+class TradeLedger:
+    """
+    청산 거래 원장: SQLite(WAL) append-only trades 테이블 + 일별 롤업(daily).
+
+    - 청산이 확정되면(_update_capital_after_exit / _apply_compounding_after_exit) record()로 한 행 추가
+      → 주문 경로는 큐에 넣기만 하고, BatchWriter 스레드가 배치로 trades INSERT + daily UPSERT를 한 트랜잭션에 커밋
+    - pnl_usdt는 체결 기준 실현손익: (청산가 - 진입가) × 수량 × 방향 - 진입 수수료 - 청산 수수료
+      (수수료를 모르는 쪽은 FEE_RATE × 체결금액 추정치)
+    - 기간/심볼/profile별 PnL 조회는 daily 롤업(기준일 × profile × 심볼 한 행)만 읽음
+      → trades가 수백만 행이어도 조회 비용은 기간 내 (profile, 심볼) 조합 수에 비례
+    - 개별 거래 조회는 (profile, symbol) 인덱스 + id 기준 키셋 페이지네이션
+    - 읽기는 스레드별 읽기 전용 연결 (WAL이라 writer와 서로 막지 않음)
+    """
+
+    def __init__(self, flush_interval: float = LEDGER_FLUSH_INTERVAL):
+        self._flush_interval = flush_interval
+        self._path: str | None = None
+        self._writer: BatchWriter | None = None
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return self._path is not None
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect(read_only=True)
+        return conn
+
+    # ── 수명 ────────────────────────────────────────
+    def start(self, path: str) -> None:
+        if self._writer is not None:
+            return
+        self._path = path
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS trades (
+                id             INTEGER PRIMARY KEY,
+                ts             INTEGER NOT NULL,   -- 청산 시각 (epoch ms)
+                period         TEXT    NOT NULL,   -- 리포트 기준일 (KST 09:00 기준)
+                profile        TEXT    NOT NULL,
+                symbol         TEXT    NOT NULL,
+                side           TEXT    NOT NULL,   -- long / short
+                entry_time     TEXT,
+                entry_price    REAL    NOT NULL,
+                exit_price     REAL    NOT NULL,
+                qty            REAL    NOT NULL,
+                leverage       INTEGER NOT NULL,
+                entry_fee      REAL,               -- USDT (모르면 NULL)
+                exit_fee       REAL,               -- USDT (모르면 NULL)
+                raw_pnl        REAL    NOT NULL,   -- 증거금 대비 비율
+                fee_pnl        REAL    NOT NULL,
+                net_pnl        REAL    NOT NULL,
+                pnl_usdt       REAL    NOT NULL,   -- 체결 기준 실현손익 (수수료 차감)
+                capital_before REAL    NOT NULL,
+                capital_after  REAL    NOT NULL,
+                compounding    INTEGER NOT NULL
+            );
+            -- 인덱스 끝에 rowid(id)가 붙으므로 (profile, symbol) 조회는 id 역순 정렬 없이 페이지네이션
+            CREATE INDEX IF NOT EXISTS ix_trades_profile_symbol ON trades (profile, symbol);
+            CREATE INDEX IF NOT EXISTS ix_trades_period ON trades (period);
+            CREATE TABLE IF NOT EXISTS daily (
+                period    TEXT    NOT NULL,
+                profile   TEXT    NOT NULL,
+                symbol    TEXT    NOT NULL,
+                trades    INTEGER NOT NULL,
+                wins      INTEGER NOT NULL,
+                net_pct   REAL    NOT NULL,   -- 청산별 순수익률(%) 합
+                pnl_usdt  REAL    NOT NULL,
+                fees_usdt REAL    NOT NULL,   -- 모르는 수수료는 추정치 포함
+                PRIMARY KEY (period, profile, symbol)
+            ) WITHOUT ROWID;
+            """
+        )
+        conn.close()
+
+        self._writer = BatchWriter("trade-ledger", self._connect, self._commit, self._flush_interval)
+        self._writer.start()
+        logger.info("[Ledger] Opened trade ledger at %s.", path)
+
+    def stop(self) -> None:
+        if self._writer is not None:
+            self._writer.stop()
+
+    # ── 쓰기 ────────────────────────────────────────
+    def record(
+        self,
+        profile: str,
+        symbol: str,
+        side: str,
+        entry_price: float,
+        exit_price: float,
+        qty: float,
+        leverage: int,
+        raw_pnl: float,
+        fee_pnl: float,
+        net_pnl: float,
+        capital_before: float,
+        capital_after: float,
+        compounding: bool,
+        entry_fee: float | None = None,
+        exit_fee: float | None = None,
+        entry_time: str | None = None,
+    ) -> None:
+        """
+        주문 경로에서 호출: 청산 1건을 큐에 넣음 (원장 비활성이면 무시).
+        entry_fee / exit_fee: 실제 체결 수수료(USDT), 모르면 None (pnl_usdt에는 추정치 반영)
+        """
+        if self._writer is None:
+            return
+        qty = abs(qty)
+        pnl_usdt, fees = realized_usdt(entry_price, exit_price, qty, side == "long", entry_fee, exit_fee)
+        now = datetime.now(ZoneInfo("Asia/Seoul"))
+        period = period_date(now)
+        row = (
+            int(now.timestamp() * 1000), period, profile, symbol, side,
+            entry_time or None, entry_price, exit_price, qty, int(leverage),
+            entry_fee, exit_fee, raw_pnl, fee_pnl, net_pnl, pnl_usdt,
+            capital_before, capital_after, int(compounding),
+        )
+        daily = (period, profile, symbol, int(net_pnl > 0), net_pnl * 100.0, pnl_usdt, fees)
+        self._writer.put((row, daily))
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, batch: list[tuple[tuple, tuple]]) -> None:
+        with conn:
+            conn.executemany(_INSERT_TRADE, [row for row, _ in batch])
+            conn.executemany(_UPSERT_DAILY, [daily for _, daily in batch])
+
+    # ── 조회 ────────────────────────────────────────
+    @staticmethod
+    def _where(start: str | None, end: str | None, profile: str | None, symbol: str | None) -> tuple[str, list]:
+        clauses, params = [], []
+        if start:
+            clauses.append("period >= ?")
+            params.append(start)
+        if end:
+            clauses.append("period <= ?")
+            params.append(end)
+        if profile:
+            clauses.append("profile = ?")
+            params.append(profile)
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def pnl(
+        self,
+        by: str = "period",
+        start: str | None = None,
+        end: str | None = None,
+        profile: str | None = None,
+        symbol: str | None = None,
+    ) -> list[dict]:
+        """daily 롤업을 by(period / profile / symbol)별로 합산. start/end는 기준일(YYYY-MM-DD, 포함)"""
+        if by not in GROUP_KEYS:
+            raise ValueError(f"by must be one of {GROUP_KEYS}")
+        where, params = self._where(start, end, profile, symbol)
+        rows = self._reader().execute(
+            f"SELECT {by}, SUM(trades), SUM(wins), SUM(net_pct), SUM(pnl_usdt), SUM(fees_usdt) "
+            f"FROM daily{where} GROUP BY {by} ORDER BY {by}",
+            params,
+        ).fetchall()
+        return [self._aggregate(by, *row) for row in rows]
+
+    @staticmethod
+    def _aggregate(by: str, key: str, trades: int, wins: int, net_pct: float, pnl_usdt: float, fees: float) -> dict:
+        return {
+            by:             key,
+            "trades":       trades,
+            "wins":         wins,
+            "win_rate(%)":  round(wins / trades * 100, 2) if trades else 0.0,
+            "net_pct_sum":  round(net_pct, 4),
+            "net_pct_avg":  round(net_pct / trades, 4) if trades else 0.0,
+            "pnl_usdt":     round(pnl_usdt, 4),
+            "fees_usdt":    round(fees, 4),
+        }
+
+    def trades(
+        self,
+        profile: str | None = None,
+        symbol: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        before_id: int | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """개별 청산 거래 (최신순). 다음 페이지는 마지막 행 id를 before_id로"""
+        where, params = self._where(start, end, profile, symbol)
+        if before_id is not None:
+            where += (" AND " if where else " WHERE ") + "id < ?"
+            params.append(before_id)
+        cur = self._reader().execute(
+            f"SELECT id, {', '.join(_COLUMNS)} FROM trades{where} ORDER BY id DESC LIMIT ?",
+            [*params, limit],
+        )
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def summary(self, period: str) -> dict:
+        """기준일 하루의 profile별 실현 PnL + 전체 합계 (일일 리포트용, 상태 스캔 없음)"""
+        profiles = {row.pop("profile"): row for row in self.pnl("profile", start=period, end=period)}
+        total = next(iter(self.pnl("period", start=period, end=period)), None)
+        if total is not None:
+            total.pop("period")
+        return {"period": period, "profiles": profiles, "total": total}
+
+    def stats(self) -> dict:
+        """원장 활성 여부 + writer 상태 (healthy=False면 최근 커밋 실패, last_error 참고)"""
+        if self._writer is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._writer.stats()}
+
+
+trade_ledger = TradeLedger()
@@ -0,0 +1,315 @@
+# benchmarks/webhook_bench.py
+"""
+웹훅 → 주문 경로 end-to-end 벤치마크 (가짜 거래소 사용, 실거래 호출 없음).
+
+    python -m benchmarks.webhook_bench --streams 4 --rounds 3 --latency 0.02 --out bench.json
+    python -m benchmarks.webhook_bench --baseline bench_prev.json   # 이전 커밋 결과와 비교
+
+측정 항목 (시나리오별):
+- alert_to_order_ms: 웹훅 POST 전송 → 가짜 거래소에 첫 주문 도착까지 (p50/p99/max)
+- alert_to_done_ms : 웹훅 POST 전송 → 작업 완료(/jobs/{id})까지
+- alerts_per_sec   : 시나리오 전체 처리량
+- rest_calls_per_alert / endpoints_per_alert: 알림 1건당 거래소 REST 호출 수
+- loop_lag_ms      : 서버 이벤트 루프 지연 (10ms 주기 sleep의 초과 시간)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# app 모듈 import 전에 설정 고정 (실거래/디스크/스트림 비활성)
+os.environ.setdefault("DRY_RUN", "false")
+os.environ["USER_STREAM_ENABLED"] = "false"
+os.environ["STATE_DB_PATH"] = ""
+os.environ.setdefault("EXCHANGE_BACKEND", "fake")
+
+import aiohttp
+import uvicorn
+
+from app.clients.binance_client import set_binance_client
+from app.clients.fake_binance import FakeBinanceClient, attach_position_cache
+from app.main import app
+from app.services.position_cache import position_cache
+from app.services.open_orders import open_order_book
+
+
+# webhook1~4: one-way 스위칭 / webhook5~6: hedge
+_ONE_WAY = ("/webhook", "/webhook2", "/webhook3", "/webhook4")
+_HEDGE = ("/webhook5", "/webhook6")
+
+_LAG_INTERVAL = 0.01
+_DONE = {"done", "error", "superseded"}
+
+
+class _RecordingExchange(FakeBinanceClient):
+    """주문이 거래소에 도착한 시각을 심볼별로 기록하는 가짜 거래소"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.order_times: dict[str, list[float]] = {}
+        self._times_lock = threading.Lock()
+
+    def _record(self, symbol: str) -> None:
+        with self._times_lock:
+            self.order_times.setdefault(symbol, []).append(time.perf_counter())
+
+    def futures_create_order(self, **params) -> dict:
+        self._record(params["symbol"])
+        return super().futures_create_order(**params)
+
+    def futures_place_batch_order(self, **params) -> list[dict]:
+        orders = params["batchOrders"]
+        if isinstance(orders, str):
+            orders = json.loads(orders)
+        for o in orders:
+            self._record(o["symbol"])
+        return super().futures_place_batch_order(**params)
+
+    def first_order_after(self, symbol: str, since: float) -> float | None:
+        with self._times_lock:
+            for t in self.order_times.get(symbol, ()):
+                if t >= since:
+                    return t
+        return None
+
+
+# ── 시나리오 ──────────────────────────────────────────
+def _scenarios(streams: int, rounds: int, burst: int) -> dict[str, list[dict]]:
+    """시나리오 이름 → 동시에 도는 스트림 목록 (스트림마다 고유 심볼, 알림은 순차)"""
+    counter = iter(range(100000))
+
+    def stream(path: str, actions: list[str]) -> dict:
+        return {"path": path, "symbol": f"B{next(counter):04d}USDT", "actions": actions}
+
+    return {
+        # 롱↔숏 반전 반복 후 청산
+        "reversal": [
+            stream(_ONE_WAY[i % len(_ONE_WAY)], ["BUY", "SELL"] * rounds + ["SELL_STOP"])
+            for i in range(streams)
+        ],
+        # 진입 직후 STOP
+        "stop_after_entry": [
+            stream(_ONE_WAY[i % len(_ONE_WAY)], ["BUY", "BUY_STOP", "SELL", "SELL_STOP"] * rounds)
+            for i in range(streams)
+        ],
+        # hedge 양방향 진입/청산
+        "hedge": [
+            stream(_HEDGE[i % len(_HEDGE)], ["BUY", "SELL", "BUY_STOP", "SELL_STOP"] * rounds)
+            for i in range(streams)
+        ],
+        # 여러 심볼에 동시에 몰리는 신호
+        "burst": [
+            stream(_ONE_WAY[i % len(_ONE_WAY)], ["BUY", "BUY_STOP"])
+            for i in range(burst)
+        ],
+    }
+
+
+# ── 서버 ──────────────────────────────────────────────
+class _LoopLagProbe:
+    def __init__(self):
+        self.samples: list[float] = []
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(_LAG_INTERVAL)
+            self.samples.append(max(0.0, loop.time() - started - _LAG_INTERVAL))
+
+
+def _start_server(port: int, probe: _LoopLagProbe) -> uvicorn.Server:
+    async def start_probe():
+        asyncio.get_running_loop().create_task(probe.run())
+
+    app.add_event_handler("startup", start_probe)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-server", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+# ── 실행 ──────────────────────────────────────────────
+async def _send(session: aiohttp.ClientSession, base: str, path: str, symbol: str, action: str,
+                leverage: int) -> str:
+    payload = {"symbol": symbol, "action": action, "alert_id": uuid.uuid4().hex}
+    if path in _HEDGE:
+        payload["leverage"] = leverage
+    async with session.post(f"{base}{path}", json=payload) as resp:
+        body = await resp.json()
+        if resp.status != 200:
+            raise RuntimeError(f"{path} {action} {symbol}: HTTP {resp.status} {body}")
+        return body["job_id"]
+
+
+async def _wait_job(session: aiohttp.ClientSession, base: str, job_id: str) -> dict:
+    while True:
+        async with session.get(f"{base}/jobs/{job_id}") as resp:
+            record = await resp.json()
+        if record.get("status") in _DONE:
+            return record
+        await asyncio.sleep(0.002)
+
+
+async def _run_stream(session, base, exchange: _RecordingExchange, stream: dict, leverage: int,
+                      samples: list[dict]) -> None:
+    for action in stream["actions"]:
+        sent = time.perf_counter()
+        job_id = await _send(session, base, stream["path"], stream["symbol"], action, leverage)
+        record = await _wait_job(session, base, job_id)
+        done = time.perf_counter()
+        ordered = exchange.first_order_after(stream["symbol"], sent)
+        samples.append({
+            "action": action,
+            "status": record["status"],
+            "to_order": (ordered - sent) if ordered is not None and ordered <= done else None,
+            "to_done": done - sent,
+        })
+
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return round(values[idx] * 1000, 3)
+
+
+def _summary(values: list[float]) -> dict:
+    return {"p50": _pct(values, 0.50), "p99": _pct(values, 0.99), "max": _pct(values, 1.0), "n": len(values)}
+
+
+async def _run_scenario(name: str, streams: list[dict], base: str, exchange: _RecordingExchange,
+                        probe: _LoopLagProbe, leverage: int) -> dict:
+    samples: list[dict] = []
+    exchange.reset_calls()
+    probe.samples.clear()
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(
+            _run_stream(session, base, exchange, s, leverage, samples) for s in streams
+        ))
+    elapsed = time.perf_counter() - started
+
+    alerts = len(samples)
+    calls = dict(exchange.calls)
+    total_calls = sum(calls.values())
+    return {
+        "alerts": alerts,
+        "streams": len(streams),
+        "duration_s": round(elapsed, 3),
+        "alerts_per_sec": round(alerts / elapsed, 2) if elapsed else None,
+        "errors": sum(1 for s in samples if s["status"] == "error"),
+        "alert_to_order_ms": _summary([s["to_order"] for s in samples if s["to_order"] is not None]),
+        "alert_to_done_ms": _summary([s["to_done"] for s in samples]),
+        "rest_calls_per_alert": round(total_calls / alerts, 3) if alerts else None,
+        "endpoints_per_alert": {k: round(v / alerts, 3) for k, v in sorted(calls.items())} if alerts else {},
+        "loop_lag_ms": _summary(list(probe.samples)),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _compare(current: dict, baseline: dict) -> None:
+    """시나리오별 주요 지표를 baseline 대비 출력"""
+    keys = (("alert_to_order_ms", "p50"), ("alert_to_order_ms", "p99"),
+            ("alert_to_done_ms", "p99"), ("alerts_per_sec", None), ("rest_calls_per_alert", None))
+    print(f"\nvs baseline {baseline.get('commit')}:")
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        parts = []
+        for key, sub in keys:
+            now, prev = result.get(key), base.get(key)
+            if sub:
+                now, prev = (now or {}).get(sub), (prev or {}).get(sub)
+            if now is None or prev is None:
+                continue
+            label = f"{key}.{sub}" if sub else key
+            delta = (now - prev) / prev * 100 if prev else 0.0
+            parts.append(f"{label}={now} ({delta:+.1f}%)")
+        print(f"  {name}: " + ", ".join(parts))
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="webhook end-to-end benchmark (fake exchange)")
+    parser.add_argument("--streams", type=int, default=4, help="시나리오당 동시 스트림 수")
+    parser.add_argument("--rounds", type=int, default=3, help="스트림당 알림 패턴 반복 횟수")
+    parser.add_argument("--burst", type=int, default=32, help="burst 시나리오 동시 심볼 수")
+    parser.add_argument("--scenarios", default="reversal,stop_after_entry,hedge,burst")
+    parser.add_argument("--latency", type=float, default=0.02, help="가짜 거래소 호출당 지연(초)")
+    parser.add_argument("--fill-delay", type=float, default=0.0, help="포지션 반영 지연(초)")
+    parser.add_argument("--partial-fill", type=float, default=1.0)
+    parser.add_argument("--leverage", type=int, default=5, help="webhook5/6 payload leverage")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--out", default="bench_result.json")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    wanted = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    scenarios = {k: v for k, v in _scenarios(args.streams, args.rounds, args.burst).items() if k in wanted}
+
+    exchange = _RecordingExchange(
+        prices={s["symbol"]: 100.0 for streams in scenarios.values() for s in streams},
+        latency=args.latency,
+        fill_delay=args.fill_delay,
+        partial_fill=args.partial_fill,
+    )
+    attach_position_cache(exchange, position_cache, open_order_book)
+    set_binance_client(exchange)
+
+    probe = _LoopLagProbe()
+    server = _start_server(args.port, probe)
+    base = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    try:
+        for name, streams in scenarios.items():
+            results[name] = asyncio.run(
+                _run_scenario(name, streams, base, exchange, probe, args.leverage)
+            )
+            r = results[name]
+            print(
+                f"{name:17s} alerts={r['alerts']:4d} {r['alerts_per_sec']:8.2f}/s "
+                f"order p50={r['alert_to_order_ms']['p50']}ms p99={r['alert_to_order_ms']['p99']}ms "
+                f"rest/alert={r['rest_calls_per_alert']} lag_max={r['loop_lag_ms']['max']}ms "
+                f"errors={r['errors']}"
+            )
+    finally:
+        server.should_exit = True
+
+    output = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": vars(args),
+        "scenarios": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\nwrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            _compare(output, json.load(f))
+    return output
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+import sqlite3
+import time
+
+from app.batch_writer import BatchWriter
+
+
+def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _writer(tmp_path, commit, **kwargs):
+    path = str(tmp_path / "w.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (v INTEGER NOT NULL)")
+    conn.close()
+    return path, BatchWriter("test", lambda: sqlite3.connect(path, check_same_thread=False), commit,
+                             flush_interval=0.01, retry_delay=0.01, **kwargs)
+
+
+def _insert(conn, batch):
+    with conn:
+        conn.executemany("INSERT INTO t (v) VALUES (?)", [(v,) for v in batch])
+
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_batches_are_committed_and_flushed_on_stop(tmp_path):
+    path, writer = _writer(tmp_path, _insert)
+    writer.start()
+    for v in range(50):
+        writer.put(v)
+    writer.stop()
+    assert _count(path) == 50
+    assert writer.stats()["written"] == 50 and writer.stats()["healthy"]
+
+
+def test_transient_failure_is_retried(tmp_path):
+    calls = []
+
+    def flaky(conn, batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        _insert(conn, batch)
+
+    path, writer = _writer(tmp_path, flaky)
+    writer.start()
+    writer.put(1)
+    _wait(lambda: writer.stats()["written"] == 1)
+    writer.stop()
+
+    stats = writer.stats()
+    assert _count(path) == 1
+    assert stats["errors"] == 1 and stats["dropped"] == 0 and stats["healthy"]
+    assert "database is locked" in stats["last_error"]
+
+
+def test_poison_batch_is_dropped_and_writer_keeps_running(tmp_path):
+    path, writer = _writer(tmp_path, _insert, retries=2)
+    writer.start()
+    writer.put(None)  # NOT NULL 위반 → 매번 실패
+    _wait(lambda: writer.stats()["dropped"] == 1)
+    assert not writer.stats()["healthy"] and writer.stats()["running"]
+
+    writer.put(7)
+    _wait(lambda: writer.stats()["written"] == 1)
+    writer.stop()
+    assert _count(path) == 1
+    assert writer.stats()["healthy"]
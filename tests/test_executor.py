@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+
+from app.services.executor import ExecutorFull, SymbolExecutor
+from app.services.ingest import coalescable
+
+
+@pytest.fixture
+def executor():
+    ex = SymbolExecutor(max_workers=2, max_pending=8, result_keep=100)
+    yield ex
+    ex.shutdown(wait=True)
+
+
+def _block(executor, key):
+    """key 워커를 잡아 두는 작업 (이후 제출은 대기열에 쌓임)"""
+    started, release = threading.Event(), threading.Event()
+
+    def run():
+        started.set()
+        release.wait(5)
+        return "blocker"
+
+    executor.submit(key, run)
+    assert started.wait(5)
+    return release
+
+
+def _record(log, name):
+    return lambda: log.append(name) or name
+
+
+def test_same_direction_entry_is_superseded(executor):
+    log = []
+    release = _block(executor, "k")
+    first = executor.submit("k", _record(log, "buy1"), tag=("webhook1", "BUY"), coalesce=True)
+    second = executor.submit("k", _record(log, "buy2"), tag=("webhook1", "BUY"), coalesce=True)
+    release.set()
+
+    assert second.future.result(5) == "buy2"
+    assert first.future.result(5) == {"skipped": "superseded", "by": second.job_id}
+    assert log == ["buy2"]
+    assert executor.get_result(first.job_id)["status"] == "superseded"
+    assert executor.stats()["superseded"] == 1
+
+
+def test_stop_is_never_superseded(executor):
+    log = []
+    release = _block(executor, "k")
+    jobs = [
+        executor.submit("k", _record(log, action), tag=("webhook1", action),
+                        coalesce=coalescable(action, hedge=False, enabled=True))
+        for action in ("BUY_STOP", "SELL_STOP", "SELL_STOP")
+    ]
+    release.set()
+
+    for job in jobs:
+        job.future.result(5)
+    assert log == ["BUY_STOP", "SELL_STOP", "SELL_STOP"]
+
+
+def test_opposite_direction_is_not_superseded(executor):
+    log = []
+    release = _block(executor, "k")
+    executor.submit("k", _record(log, "sell"), tag=("webhook1", "SELL"), coalesce=True)
+    last = executor.submit("k", _record(log, "buy"), tag=("webhook1", "BUY"), coalesce=True)
+    release.set()
+
+    last.future.result(5)
+    assert log == ["sell", "buy"]
+
+
+def test_only_latest_job_of_the_same_group_is_replaced(executor):
+    log = []
+    release = _block(executor, "k")
+    # webhook1 BUY 뒤에 다른 신호(SELL)가 있으면 새 BUY는 앞의 BUY를 대체하지 않음
+    executor.submit("k", _record(log, "w1-buy"), tag=("webhook1", "BUY"), coalesce=True)
+    executor.submit("k", _record(log, "w1-sell"), tag=("webhook1", "SELL"), coalesce=True)
+    # 다른 profile의 같은 action은 별개
+    executor.submit("k", _record(log, "w2-buy"), tag=("webhook2", "BUY"), coalesce=True)
+    last = executor.submit("k", _record(log, "w1-buy2"), tag=("webhook1", "BUY"), coalesce=True)
+    release.set()
+
+    last.future.result(5)
+    assert log == ["w1-buy", "w1-sell", "w2-buy", "w1-buy2"]
+
+
+def test_full_queue_rejects_without_dropping_queued_jobs():
+    ex = SymbolExecutor(max_workers=1, max_pending=1, result_keep=100)
+    try:
+        log = []
+        release = _block(ex, "k")
+        queued = ex.submit("k", _record(log, "sell"), tag=("webhook1", "SELL"), coalesce=True)
+        with pytest.raises(ExecutorFull):
+            ex.submit("k", _record(log, "buy"), tag=("webhook1", "BUY"), coalesce=True)
+        release.set()
+
+        assert queued.future.result(5) == "sell"
+        assert log == ["sell"]
+        assert ex.stats()["superseded"] == 0
+    finally:
+        ex.shutdown(wait=True)
+
+
+def test_replacing_counts_the_freed_slot():
+    ex = SymbolExecutor(max_workers=1, max_pending=1, result_keep=100)
+    try:
+        release = _block(ex, "k")
+        ex.submit("k", lambda: "buy1", tag=("webhook1", "BUY"), coalesce=True)
+        job = ex.submit("k", lambda: "buy2", tag=("webhook1", "BUY"), coalesce=True)
+        release.set()
+        assert job.future.result(5) == "buy2"
+    finally:
+        ex.shutdown(wait=True)
+
+
+@pytest.mark.parametrize(
+    "action, hedge, expected",
+    [
+        ("BUY", False, True),
+        ("SELL", False, True),
+        ("BUY_STOP", False, False),
+        ("SELL_STOP", False, False),
+        ("BUY", True, False),
+        ("SELL_STOP", True, False),
+    ],
+)
+def test_coalescable(action, hedge, expected):
+    assert coalescable(action, hedge=hedge, enabled=True) is expected
+    assert coalescable(action, hedge=hedge, enabled=False) is False
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+pytest.importorskip("binance")
+
+from app.clients.fake_binance import FakeBinanceClient, serve_user_stream  # noqa: E402
+from app.clients.user_stream import UserDataStream  # noqa: E402
+from app.clients.ws import StreamThread  # noqa: E402
+from app.services.position_cache import PositionCache  # noqa: E402
+
+PORT = 9199
+
+
+def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.fixture
+def fake_stream():
+    fake = FakeBinanceClient(dual_side=False)
+    ready = threading.Event()
+    handle = {}
+
+    async def main():
+        server = asyncio.create_task(serve_user_stream(fake, port=PORT))
+        handle["loop"], handle["server"] = asyncio.get_running_loop(), server
+        ready.set()
+        try:
+            await server
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield fake
+    handle["loop"].call_soon_threadsafe(handle["server"].cancel)
+    thread.join(5)
+
+
+def test_stream_base_requires_hooks():
+    class Incomplete(StreamThread):
+        async def _url(self) -> str:
+            return "ws://unused"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_user_stream_receives_fake_exchange_events(fake_stream):
+    cache = PositionCache()
+    stream = UserDataStream(client=fake_stream, base_url=f"ws://127.0.0.1:{PORT}/ws", cache=cache)
+    stream.start()
+    try:
+        assert _wait(lambda: stream.connected)
+        time.sleep(0.1)  # 서버 쪽 구독 등록
+
+        order = fake_stream.futures_create_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity="0.01")
+        assert _wait(lambda: cache.net_amt("BTCUSDT") == pytest.approx(0.01))
+        assert _wait(lambda: cache.get_fill(order["orderId"]) is not None)
+
+        connects = stream.connects
+        fake_stream.expire_listen_key()
+        assert _wait(lambda: stream.connects > connects, timeout=10)
+    finally:
+        stream.stop()
@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("binance")
+
+from app.services import hedge_orders  # noqa: E402
+from app.services.order_gateway import Fill  # noqa: E402
+from app.state import SymbolState  # noqa: E402
+
+
+@pytest.fixture
+def hedge(monkeypatch):
+    """거래소 없이 execute_hedge_entry 실행: 체결은 추정 수수료, 보정 콜백과 저장 호출은 기록"""
+    state = SymbolState(profile="webhook5", symbol="BTCUSDT")
+    callbacks, saved, order_ids = [], [], iter(range(100, 200))
+
+    def submit(client, symbol, side, qty, **params):
+        return Fill(next(order_ids), symbol, side, params["positionSide"], "FILLED",
+                    60000.0, 0.01, 600.0, 0.24, True)
+
+    monkeypatch.setattr(hedge_orders, "get_binance_client", lambda: None)
+    monkeypatch.setattr(hedge_orders, "get_state", lambda symbol, profile: state)
+    monkeypatch.setattr(hedge_orders, "save_state", lambda symbol, profile: saved.append(symbol))
+    monkeypatch.setattr(hedge_orders, "entry_quantity", lambda *a: (0.01, "0.01"))
+    monkeypatch.setattr(hedge_orders, "submit_market_order", submit)
+    monkeypatch.setattr(hedge_orders, "on_actual_commission", lambda fill, fn: callbacks.append(fn))
+
+    def enter():
+        hedge_orders.execute_hedge_entry("BTCUSDT", "LONG", 2, "webhook5", False, mark_price=60000.0)
+        return callbacks[-1]
+
+    return state, enter, saved
+
+
+def _close_long(state):
+    # switching_hedge 청산 정산과 같이 진입 정보를 비움
+    state["hedge"]["long"].update(entry_price=0.0, qty=0.0, entry_commission=0.0, entry_order_ids=())
+
+
+def test_late_commission_corrects_current_entry(hedge):
+    state, enter, saved = hedge
+    correct_first = enter()
+    enter()
+    correct_first(0.12)
+    assert state["hedge"]["long"]["entry_commission"] == pytest.approx(0.36)
+    assert saved == ["BTCUSDT"]
+
+
+def test_late_commission_after_reentry_is_ignored(hedge):
+    state, enter, saved = hedge
+    correct_old = enter()
+    _close_long(state)
+    enter()
+    correct_old(0.12)  # 청산 전 진입 주문의 늦은 이벤트
+    assert state["hedge"]["long"]["entry_commission"] == pytest.approx(0.24)
+    assert saved == []
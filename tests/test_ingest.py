@@ -0,0 +1,70 @@
+import pytest
+
+from app.services.ingest import AlertDeduper
+
+
+@pytest.fixture(autouse=True)
+def _fixed_clock(monkeypatch):
+    # 시간 버킷 경계에 걸려 결과가 바뀌지 않도록 고정
+    monkeypatch.setattr("app.services.ingest.time.time", lambda: 1000.0)
+
+
+def _submit(deduper, profile, symbol, action, alert_id=None, hedge=False, job_id="job"):
+    """웹훅 경로와 같은 순서: check → (중복 아니면) remember. 중복이면 원래 job_id, 실행되면 None"""
+    key = deduper.fingerprint(profile, symbol, action, alert_id, hedge=hedge)
+    original = deduper.check(key)
+    if original is None:
+        deduper.remember(key, job_id)
+    return original
+
+
+def test_repeated_signal_within_window_is_duplicate():
+    deduper = AlertDeduper(window=60)
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY", job_id="j1") is None
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY", job_id="j2") == "j1"
+    assert deduper.stats()["duplicates"] == 1
+
+
+def test_buy_stop_buy_executes_every_signal():
+    deduper = AlertDeduper(window=60)
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY", job_id="j1") is None
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY_STOP", job_id="j2") is None
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY", job_id="j3") is None
+    assert deduper.stats()["duplicates"] == 0
+
+
+def test_action_change_is_per_profile_and_symbol():
+    deduper = AlertDeduper(window=60)
+    _submit(deduper, "webhook1", "BTCUSDT", "BUY", job_id="j1")
+    _submit(deduper, "webhook2", "BTCUSDT", "BUY_STOP", job_id="j2")
+    _submit(deduper, "webhook1", "ETHUSDT", "BUY_STOP", job_id="j3")
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY") == "j1"
+
+
+def test_hedge_add_ons_are_not_deduped_without_alert_id():
+    deduper = AlertDeduper(window=60)
+    assert deduper.fingerprint("webhook5", "BTCUSDT", "BUY", None, hedge=True) is None
+    assert _submit(deduper, "webhook5", "BTCUSDT", "BUY", hedge=True, job_id="j1") is None
+    assert _submit(deduper, "webhook5", "BTCUSDT", "BUY", hedge=True, job_id="j2") is None
+    # alert_id 재전송은 hedge도 중복
+    assert _submit(deduper, "webhook5", "BTCUSDT", "BUY", "a1", hedge=True, job_id="j3") is None
+    assert _submit(deduper, "webhook5", "BTCUSDT", "BUY", "a1", hedge=True) == "j3"
+    # 청산은 판별 대상
+    assert deduper.fingerprint("webhook5", "BTCUSDT", "BUY_STOP", None, hedge=True) is not None
+
+
+def test_alert_id_retry_stays_duplicate_after_other_actions():
+    deduper = AlertDeduper(window=60)
+    _submit(deduper, "webhook1", "BTCUSDT", "BUY", "a1", job_id="j1")
+    _submit(deduper, "webhook1", "BTCUSDT", "BUY_STOP", job_id="j2")
+    assert _submit(deduper, "webhook1", "BTCUSDT", "BUY", "a1") == "j1"
+
+
+def test_fingerprint_uses_time_buckets(monkeypatch):
+    deduper = AlertDeduper(window=3)
+    monkeypatch.setattr("app.services.ingest.time.time", lambda: 100.0)
+    first = deduper.fingerprint("webhook1", "BTCUSDT", "BUY", None)
+    monkeypatch.setattr("app.services.ingest.time.time", lambda: 101.5)
+    assert deduper.fingerprint("webhook1", "BTCUSDT", "BUY", None) == first
+    monkeypatch.setattr("app.services.ingest.time.time", lambda: 102.0)
+    assert deduper.fingerprint("webhook1", "BTCUSDT", "BUY", None) != first
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from app.services.executor import symbol_key
+from app.services.locks import LockManager, LockTimeout, StateConflict
+from app.state import SymbolState
+
+_HEDGE_FIELDS = ("hedge.long.entry_price", "hedge.long.qty", "hedge.long.entry_commission", "capital", "daily_pnl")
+
+
+@pytest.fixture
+def locks():
+    return LockManager(timeout=0.2, account="acct")
+
+
+def _hedge_state(entry=100.0, qty=1.0):
+    state = SymbolState(profile="webhook5", symbol="BTCUSDT")
+    state["hedge"]["long"].update(entry_price=entry, qty=qty, entry_commission=0.05)
+    return state
+
+
+def _settle(calls):
+    """switching_hedge 청산 정산과 같은 모양: 진입 정보가 있으면 손익 반영 후 진입 정보를 비움"""
+    def fn(cur):
+        calls.append(dict(cur))
+        if (cur["hedge.long.entry_price"] or 0.0) <= 0:
+            return None
+        return {
+            "daily_pnl": cur["daily_pnl"] + 1.0,
+            "capital": cur["capital"] * 1.01,
+            "hedge.long.entry_price": 0.0,
+            "hedge.long.qty": 0.0,
+            "hedge.long.entry_commission": 0.0,
+        }
+    return fn
+
+
+def test_symbol_key_is_shared_across_profiles():
+    assert symbol_key("BTCUSDT", "acct") == "acct:BTCUSDT"
+    assert symbol_key("BTCUSDT", "acct") != symbol_key("ETHUSDT", "acct")
+
+
+def test_compare_and_set_applies_nested_paths(locks):
+    state = _hedge_state()
+    assert locks.compare_and_set(state, {"hedge.long.qty": 1.0}, {"hedge.long.qty": 2.0, "capital": 60.0})
+    assert state["hedge"]["long"]["qty"] == 2.0
+    assert state["capital"] == 60.0
+
+
+def test_compare_and_set_rejects_stale_read(locks):
+    state = _hedge_state()
+    assert not locks.compare_and_set(state, {"hedge.long.qty": 5.0}, {"capital": 0.0})
+    assert state["capital"] == 50.0
+    assert locks.stats()["cas_conflicts"] == 1
+
+
+def test_settlement_is_applied_once(locks):
+    state = _hedge_state()
+    calls = []
+    first = locks.transition(state, _HEDGE_FIELDS, _settle(calls))
+    second = locks.transition(state, _HEDGE_FIELDS, _settle(calls))
+
+    assert first is not None and second is None
+    assert state["daily_pnl"] == 1.0
+    assert state["capital"] == pytest.approx(50.5)
+    assert state["hedge"]["long"]["entry_price"] == 0.0
+    assert state["hedge"]["long"]["qty"] == 0.0
+
+
+def test_concurrent_settlements_apply_once(locks):
+    state = _hedge_state()
+    barrier = threading.Barrier(4)
+    results = []
+
+    def run():
+        barrier.wait()
+        results.append(locks.transition(state, _HEDGE_FIELDS, _settle([])))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert sum(r is not None for r in results) == 1
+    assert state["daily_pnl"] == 1.0
+
+
+def test_transition_recomputes_after_conflict(locks):
+    state = _hedge_state()
+    calls = []
+
+    def fn(cur):
+        calls.append(cur["capital"])
+        if len(calls) == 1:
+            state["capital"] = 70.0  # 읽은 뒤 다른 경로가 capital을 바꿈
+        return {"capital": cur["capital"] + 1.0}
+
+    assert locks.transition(state, ("capital",), fn) == {"capital": 71.0}
+    assert calls == [50.0, 70.0]
+    assert state["capital"] == 71.0
+
+
+def test_transition_gives_up_after_retries(locks):
+    state = _hedge_state()
+
+    def fn(cur):
+        state["capital"] = cur["capital"] + 1.0  # 매번 충돌
+        return {"capital": 0.0}
+
+    with pytest.raises(StateConflict):
+        locks.transition(state, ("capital",), fn, retries=3)
+    assert locks.stats()["cas_conflicts"] == 3
+
+
+def test_hold_times_out_and_is_reentrant(locks):
+    held, release = threading.Event(), threading.Event()
+
+    def owner():
+        with locks.hold("BTCUSDT"):
+            with locks.hold("BTCUSDT"):  # 같은 스레드 재진입
+                held.set()
+                release.wait(5)
+
+    t = threading.Thread(target=owner)
+    t.start()
+    assert held.wait(5)
+    with pytest.raises(LockTimeout):
+        with locks.hold("BTCUSDT", timeout=0.05):
+            pass
+    with locks.hold("ETHUSDT", timeout=0.05):  # 다른 심볼은 영향 없음
+        pass
+    release.set()
+    t.join(5)
+    assert locks.stats()["timeouts"] == 1
+
+
+def test_hold_max_keeps_longest_hold_across_threads(locks):
+    def run(symbol, seconds):
+        with locks.hold(symbol):
+            time.sleep(seconds)
+
+    threads = [threading.Thread(target=run, args=(f"S{i}", 0.05 if i == 0 else 0.0)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert locks.stats()["hold_ms_max"] >= 50
@@ -0,0 +1,73 @@
+from app.services.position_cache import PositionCache
+from app.state import SymbolState
+
+
+def _order_event(order_id, status, execution="TRADE", commission="0.02", qty="0.01"):
+    return {"e": "ORDER_TRADE_UPDATE", "o": {
+        "s": "BTCUSDT", "S": "BUY", "i": order_id, "x": execution, "X": status, "ap": "60000", "z": qty,
+        "n": commission, "N": "USDT", "ps": "BOTH", "R": False,
+    }}
+
+
+def _account_event(amt):
+    return {"e": "ACCOUNT_UPDATE", "a": {"P": [{"s": "BTCUSDT", "pa": str(amt), "ep": "60000", "up": "0", "ps": "BOTH"}]}}
+
+
+def test_account_updates_drive_net_amount():
+    cache = PositionCache()
+    cache.apply_account_update(_account_event(0.5))
+    assert cache.net_amt("BTCUSDT") == 0.5
+    cache.apply_account_update(_account_event(0))
+    assert cache.net_amt("BTCUSDT") == 0.0
+
+
+def test_fill_commission_accumulates_partial_trades():
+    cache = PositionCache()
+    cache.apply_order_update(_order_event(1, "PARTIALLY_FILLED", commission="0.01", qty="0.005"))
+    cache.apply_order_update(_order_event(1, "FILLED", commission="0.015", qty="0.01"))
+    fill = cache.get_fill(1)
+    assert fill["status"] == "FILLED" and fill["commission"] == 0.025
+
+
+def test_on_fill_fires_once_when_filled():
+    cache = PositionCache()
+    seen = []
+    cache.on_fill(7, seen.append)
+    cache.apply_order_update(_order_event(7, "PARTIALLY_FILLED"))
+    assert seen == []
+    cache.apply_order_update(_order_event(7, "FILLED"))
+    cache.apply_order_update(_order_event(7, "FILLED", execution="CALCULATED", commission="0"))
+    assert len(seen) == 1 and seen[0]["commission"] == 0.04
+
+    late = []
+    cache.on_fill(7, late.append)  # 이미 FILLED → 바로 호출
+    assert len(late) == 1
+
+
+def test_wait_for_fill_without_timeout_does_not_block():
+    cache = PositionCache()
+    cache.set_live(True)
+    assert cache.wait_for_fill(3, 0) is None
+    cache.apply_order_update(_order_event(3, "FILLED"))
+    assert cache.wait_for_fill(3, 0)["commission"] == 0.02
+
+
+def test_entry_commission_corrected_only_for_same_entry():
+    state = SymbolState(profile="webhook1", symbol="BTCUSDT")
+    state.record_entry(True, 60000.0, 0.01, 2, 0.24, order_id=11)
+    assert state.correct_entry_commission(11, 0.12)
+    assert state["entry_commission"] == 0.12
+
+    state.record_entry(False, 61000.0, 0.01, 2, 0.24, order_id=12)
+    assert not state.correct_entry_commission(11, 0.5)  # 이전 진입의 늦은 이벤트
+    assert state["entry_commission"] == 0.24
+
+
+def test_entry_commission_correction_is_saved(monkeypatch):
+    saved = []
+    monkeypatch.setattr("app.state.save_state", lambda symbol, profile: saved.append((profile, symbol)))
+    state = SymbolState(profile="webhook1", symbol="BTCUSDT")
+    state.record_entry(True, 60000.0, 0.01, 2, 0.24, order_id=11)
+    state.correct_entry_commission(11, 0.12)
+    state.correct_entry_commission(12, 0.5)
+    assert saved == [("webhook1", "BTCUSDT")]
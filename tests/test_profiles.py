@@ -0,0 +1,20 @@
+from app import backtest
+from app.config import TRADE_LEVERAGE
+from app.profiles import PROFILES
+
+
+def test_backtest_reads_live_profiles():
+    assert backtest.PROFILES is PROFILES
+
+
+def test_one_way_job_kwargs_carry_leverage_and_sizing():
+    assert PROFILES["webhook1"].job_kwargs() == {"leverage": TRADE_LEVERAGE, "use_initial_capital": False}
+    assert PROFILES["webhook2"].job_kwargs() == {"leverage": 5, "use_initial_capital": True}
+    assert PROFILES["webhook3"].job_kwargs() == {"leverage": 2, "use_initial_capital": True}
+    assert PROFILES["webhook4"].job_kwargs() == {"leverage": 2, "use_initial_capital": False}
+
+
+def test_hedge_job_kwargs_leave_leverage_to_the_alert():
+    for name in ("webhook5", "webhook6"):
+        assert PROFILES[name].hedge
+        assert "leverage" not in PROFILES[name].job_kwargs()
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("binance")
+
+from app.clients.rate_limiter import (  # noqa: E402
+    AsyncRateLimitedClient, RateLimitedClient, RateLimiter, capture_async_response,
+)
+
+
+class _Response:
+    def __init__(self, used):
+        self.headers = {"X-MBX-USED-WEIGHT-1M": str(used)}
+
+
+class _Session:
+    def __init__(self):
+        self.hooks = {"response": []}
+
+
+class _HttpClient:
+    """requests 세션이 있는 Client: 응답마다 hook을 부르고 공유 response를 덮어씀"""
+
+    def __init__(self):
+        self.session = _Session()
+        self.response = None
+
+    def futures_account(self, used, after=None):
+        response = _Response(used)
+        for hook in self.session.hooks["response"]:
+            hook(response)
+        self.response = response
+        if after is not None:
+            after()
+        return {}
+
+
+class _SharedClient:
+    """세션 없이 client.response만 있는 Client (인프로세스 가짜 거래소 모양)"""
+
+    def __init__(self):
+        self.response = None
+
+    def futures_account(self, used, during=None):
+        self.response = _Response(used)
+        if during is not None:
+            during()
+        return {}
+
+
+def test_hooked_client_uses_own_response():
+    limiter = RateLimiter()
+    client = _HttpClient()
+    proxy = RateLimitedClient(client, limiter)
+
+    # 이 호출의 응답(100)을 받은 직후 다른 스레드의 요청이 공유 response를 2000으로 덮어씀
+    def other():
+        t = threading.Thread(target=client.futures_account, args=(2000,))
+        t.start()
+        t.join(5)
+
+    proxy.futures_account(100, after=other)
+    assert limiter.stats()["used_weight_1m"] == 100
+
+
+def test_shared_response_is_read_when_alone():
+    limiter = RateLimiter()
+    proxy = RateLimitedClient(_SharedClient(), limiter)
+    proxy.futures_account(300)
+    stats = limiter.stats()
+    assert stats["used_weight_1m"] == 300
+    assert stats["header_skips"] == 0
+
+
+def test_shared_response_is_skipped_when_calls_overlap():
+    limiter = RateLimiter()
+    proxy = RateLimitedClient(_SharedClient(), limiter)
+
+    # 첫 호출 도중 두 번째 호출이 시작/종료 → 두 호출 모두 공유 response가 자기 것인지 알 수 없음
+    def overlap():
+        t = threading.Thread(target=proxy.futures_account, args=(2000,))
+        t.start()
+        t.join(5)
+
+    proxy.futures_account(100, during=overlap)
+    stats = limiter.stats()
+    assert stats["used_weight_1m"] == 0
+    assert stats["header_skips"] == 2
+
+
+class _AsyncClient:
+    """aiohttp trace가 요청마다 capture_async_response를 부르는 AsyncClient 모양"""
+
+    def __init__(self):
+        self.response = None
+
+    async def futures_account(self, used, delay):
+        response = _Response(used)
+        await capture_async_response(None, None, SimpleNamespace(response=response))
+        self.response = response
+        await asyncio.sleep(delay)
+        return {}
+
+
+def test_async_client_uses_each_tasks_own_response():
+    limiter = RateLimiter()
+    proxy = AsyncRateLimitedClient(_AsyncClient(), limiter)
+
+    async def run():
+        # 먼저 받은 응답(100)의 호출이 늦게 끝나도 나중 응답(50)으로 보정되지 않음
+        await asyncio.gather(proxy.futures_account(100, 0.05), proxy.futures_account(50, 0.0))
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert stats["used_weight_1m"] == 100
+    assert stats["header_skips"] == 0
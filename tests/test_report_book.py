@@ -0,0 +1,60 @@
+import json
+
+from app.services.report_book import ReportBook, etag_matches
+
+PERIOD = "2026-01-02"
+
+
+def _state(capital=55.0, trades=1):
+    return {"capital": capital, "initial_capital": 50.0, "trade_count": trades, "long_count": trades,
+            "short_count": 0, "daily_pnl": 1.5, "last_reset": "2026-01-01"}
+
+
+def test_etag_matches_lists_weak_and_wildcard():
+    etag = '"abc-1"'
+    assert etag_matches('"abc-1"', etag)
+    assert etag_matches('"zzz", "abc-1"', etag)
+    assert etag_matches('W/"abc-1"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abc-2", W/"abc-10"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+
+
+def test_etag_changes_only_when_values_change():
+    book = ReportBook()
+    book.update("webhook1", "BTCUSDT", _state())
+    first, _ = book.report("webhook1", "BTCUSDT", PERIOD)
+
+    book.update("webhook1", "BTCUSDT", _state())
+    assert book.report("webhook1", "BTCUSDT", PERIOD)[0] == first
+
+    book.update("webhook1", "BTCUSDT", _state(capital=60.0))
+    assert book.report("webhook1", "BTCUSDT", PERIOD)[0] != first
+    assert book.report("webhook1", "BTCUSDT", "2026-01-03")[0] != book.report("webhook1", "BTCUSDT", PERIOD)[0]
+
+
+def test_etags_differ_across_restarts():
+    # 재시작 후 버전 카운터가 같은 값이 되어도 이전 프로세스의 ETag와 겹치지 않음
+    before, after = ReportBook(), ReportBook()
+    for book in (before, after):
+        book.update("webhook1", "BTCUSDT", _state())
+    assert before.report("webhook1", "BTCUSDT", PERIOD)[0] != after.report("webhook1", "BTCUSDT", PERIOD)[0]
+    assert before.report_all("webhook1", PERIOD)[0] != after.report_all("webhook1", PERIOD)[0]
+    assert before.summary(PERIOD)[0] != after.summary(PERIOD)[0]
+
+
+def test_report_all_and_summary_aggregate_incrementally():
+    book = ReportBook()
+    book.update("webhook1", "BTCUSDT", _state(capital=55.0, trades=1))
+    book.update("webhook1", "ETHUSDT", _state(capital=45.0, trades=2))
+    book.update("webhook1", "ETHUSDT", _state(capital=50.0, trades=3))
+
+    etag, body, count = book.report_all("webhook1", PERIOD)
+    assert count == 2
+    assert [r["symbol"] for r in json.loads(body)["reports"]] == ["BTCUSDT", "ETHUSDT"]
+    assert book.report_all("webhook1", PERIOD)[1] is body  # 버전이 같으면 직렬화 재사용
+
+    _, summary = book.summary(PERIOD)
+    assert summary["profiles"]["webhook1"]["total_trades"] == 4
+    assert summary["total"]["현재_자본($)"] == 105.0
@@ -0,0 +1,48 @@
+from app.state import SymbolState
+
+
+def test_record_entry_long_and_short():
+    state = SymbolState(profile="webhook1", symbol="BTCUSDT")
+
+    assert state.record_entry(True, 100.0, 0.5, 3, 0.02) == {"filled": 0.5, "entry": 100.0, "commission": 0.02}
+    assert (state["position_qty"], state["position_side"], state["leverage"]) == (0.5, "long", 3)
+    assert state["entry_commission"] == 0.02
+
+    state.record_entry(False, 90.0, 0.5, 3, 0.01)
+    assert (state["position_qty"], state["position_side"], state["entry_price"]) == (-0.5, "short", 90.0)
+    assert (state["long_count"], state["short_count"], state["trade_count"]) == (1, 1, 2)
+    assert state["entry_time"]
+
+
+def test_record_entry_is_one_transition(monkeypatch):
+    from app.services.locks import lock_manager
+
+    calls = []
+    original = lock_manager.compare_and_set
+    monkeypatch.setattr(lock_manager, "compare_and_set", lambda *a: calls.append(a) or original(*a))
+    state = SymbolState(profile="webhook1", symbol="BTCUSDT")
+    state.record_entry(True, 100.0, 0.5, 3, 0.02, order_id=7)
+
+    assert len(calls) == 1
+    assert calls[0][2]["entry_order_id"] == 7 and calls[0][2]["trade_count"] == 1
+
+
+def test_record_view_is_dict_compatible():
+    state = SymbolState(profile="webhook5", symbol="ETHUSDT")
+    state.update({"capital": 70.0}, legacy_flag=True)
+    state["hedge"]["long"]["qty"] = 1.5
+
+    assert state["capital"] == 70.0
+    assert state.get("legacy_flag") is True and "legacy_flag" in state
+    assert state.get("missing", "x") == "x"
+    assert state.to_dict()["hedge"]["long"]["qty"] == 1.5
+
+
+def test_from_dict_round_trip_keeps_unknown_fields():
+    state = SymbolState(profile="webhook5", symbol="ETHUSDT")
+    state["hedge"]["short"].update(entry_price=2000.0, qty=-0.1)
+    state["old_field"] = 1
+
+    restored = SymbolState.from_dict("ETHUSDT", "webhook5", state.to_dict())
+    assert restored.to_dict() == state.to_dict()
+    assert restored.key == "webhook5:ETHUSDT"
@@ -0,0 +1,15 @@
+from app.state_store import StateStore
+
+
+def test_journal_replay_and_compaction(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path, flush_interval=0.01, snapshot_every=3)
+    store.start()
+    for i in range(4):
+        store.append("webhook1:BTCUSDT", {"capital": 50.0 + i})
+    store.append("webhook2:ETHUSDT", {"capital": 10.0})
+    store.stop()
+    assert store.stats()["written"] == 5
+
+    restored = StateStore(path).load()
+    assert restored == {"webhook1:BTCUSDT": {"capital": 53.0}, "webhook2:ETHUSDT": {"capital": 10.0}}
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("binance")
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.services import symbol_rules  # noqa: E402
+
+_INFO = {
+    "symbols": [{
+        "symbol": "BTCUSDT",
+        "filters": [
+            {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "1000"},
+            {"filterType": "MARKET_LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "120"},
+            {"filterType": "PRICE_FILTER", "tickSize": "0.10"},
+            {"filterType": "MIN_NOTIONAL", "notional": "100"},
+        ],
+    }]
+}
+
+
+class _Client:
+    def __init__(self):
+        self.calls = 0
+
+    def futures_exchange_info(self):
+        self.calls += 1
+        return _INFO
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = _Client()
+    monkeypatch.setattr(symbol_rules, "get_binance_client", lambda: fake)
+    monkeypatch.setattr(symbol_rules, "_rules", {})
+    monkeypatch.setattr(symbol_rules, "_loaded_at", None)
+    symbol_rules.load_symbol_rules(fake)
+    fake.calls = 0
+    return fake
+
+
+def test_unknown_symbol_does_not_reload_within_miss_ttl(client):
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            symbol_rules.get_symbol_rules("NOPEUSDT")
+    assert client.calls == 0
+
+
+def test_unknown_symbol_reloads_after_miss_ttl(client, monkeypatch):
+    monkeypatch.setattr(symbol_rules, "SYMBOL_RULES_MISS_TTL", 0.0)
+    with pytest.raises(HTTPException):
+        symbol_rules.get_symbol_rules("NOPEUSDT")
+    assert client.calls == 1
+
+
+def test_first_lookup_loads_regardless_of_host_uptime(monkeypatch):
+    fake = _Client()
+    monkeypatch.setattr(symbol_rules, "get_binance_client", lambda: fake)
+    monkeypatch.setattr(symbol_rules, "_rules", {})
+    monkeypatch.setattr(symbol_rules, "_loaded_at", None)
+    monkeypatch.setattr(symbol_rules.time, "monotonic", lambda: 1.0)  # 막 부팅한 호스트
+    assert symbol_rules.get_symbol_rules("BTCUSDT").symbol == "BTCUSDT"
+    assert fake.calls == 1
+
+
+def test_concurrent_misses_load_once(client, monkeypatch):
+    monkeypatch.setattr(symbol_rules, "SYMBOL_RULES_MISS_TTL", 0.0)
+    barrier = threading.Barrier(6)
+    slow = client.futures_exchange_info
+
+    def futures_exchange_info():
+        time.sleep(0.05)
+        return slow()
+
+    client.futures_exchange_info = futures_exchange_info
+
+    def run():
+        barrier.wait()
+        with pytest.raises(HTTPException):
+            symbol_rules.get_symbol_rules("NEWUSDT")
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert client.calls == 1
+
+
+def test_round_qty_clamps_to_market_max_qty(client):
+    assert symbol_rules.get_symbol_rules("BTCUSDT").max_qty == 120.0
+    qty, qty_str = symbol_rules.round_qty("BTCUSDT", 500.0, 100.0)
+    assert qty <= 120.0 and qty_str.startswith("1")
+
+    with pytest.raises(HTTPException):
+        symbol_rules.round_qty("BTCUSDT", 0.5, 100.0)  # notional 50 < 100
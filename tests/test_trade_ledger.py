@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from app.services.pnl import realized_usdt
+from app.trade_ledger import TradeLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    book = TradeLedger(flush_interval=0.01)
+    book.start(str(tmp_path / "ledger.db"))
+    yield book
+    book.stop()
+
+
+def _record(ledger, profile="webhook1", symbol="BTCUSDT", side="long", entry=100.0, exit=110.0, qty=2.0,
+            entry_fee=0.1, exit_fee=0.1, net=0.05):
+    ledger.record(
+        profile, symbol, side, entry_price=entry, exit_price=exit, qty=qty, leverage=2,
+        raw_pnl=net, fee_pnl=0.0, net_pnl=net, capital_before=50.0, capital_after=52.5,
+        compounding=True, entry_fee=entry_fee, exit_fee=exit_fee,
+    )
+
+
+def _flush(ledger, count):
+    deadline = time.monotonic() + 5
+    while ledger.stats()["written"] < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_realized_usdt_from_fills():
+    assert realized_usdt(100.0, 110.0, 2.0, True, 0.1, 0.1) == pytest.approx((19.8, 0.2))
+    assert realized_usdt(100.0, 110.0, 2.0, False, 0.1, 0.1) == pytest.approx((-20.2, 0.2))
+    # 모르는 수수료는 fee_rate × 체결금액
+    pnl, fees = realized_usdt(100.0, 100.0, 1.0, True, None, 0.05, fee_rate=0.001)
+    assert fees == pytest.approx(0.15) and pnl == pytest.approx(-0.15)
+
+
+def test_pnl_usdt_is_realized_from_fills(ledger):
+    _record(ledger)
+    _record(ledger, side="short", entry=100.0, exit=90.0, qty=1.0, entry_fee=0.05, exit_fee=0.05)
+    _flush(ledger, 2)
+
+    trades = ledger.trades()
+    assert [t["pnl_usdt"] for t in trades] == pytest.approx([9.9, 19.8])
+    [row] = ledger.pnl("symbol")
+    assert row["pnl_usdt"] == pytest.approx(29.7)
+    assert row["fees_usdt"] == pytest.approx(0.3)
+    assert row["trades"] == 2 and row["wins"] == 2
+
+
+def test_rollups_group_by_profile_and_page_trades(ledger):
+    _record(ledger, profile="webhook1", net=0.05)
+    _record(ledger, profile="webhook2", net=-0.02, exit=95.0)
+    _record(ledger, profile="webhook2", symbol="ETHUSDT", net=0.01)
+    _flush(ledger, 3)
+
+    by_profile = {row["profile"]: row for row in ledger.pnl("profile")}
+    assert by_profile["webhook2"]["trades"] == 2 and by_profile["webhook2"]["wins"] == 1
+
+    first = ledger.trades(limit=2)
+    rest = ledger.trades(before_id=first[-1]["id"], limit=2)
+    assert len(first) == 2 and len(rest) == 1
+    assert ledger.trades(profile="webhook2", symbol="ETHUSDT")[0]["symbol"] == "ETHUSDT"
+
+
+def test_stats_report_writer_health(tmp_path):
+    book = TradeLedger()
+    assert book.stats() == {"enabled": False}
+    book.start(str(tmp_path / "ledger.db"))
+    try:
+        stats = book.stats()
+        assert stats["enabled"] and stats["running"] and stats["healthy"]
+    finally:
+        book.stop()